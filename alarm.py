@@ -178,7 +178,11 @@ class AlarmCog(commands.Cog):
         return await utils.load_json(ALARM_CONFIG_PATH, {})
 
     async def save_config(self, data):
-        await utils.save_json(ALARM_CONFIG_PATH, data)
+        async with utils.json_transaction(ALARM_CONFIG_PATH, {}) as tx:
+            tx.data = data
+
+    def edit_config(self):
+        return utils.json_transaction(ALARM_CONFIG_PATH, {})
 
     async def update_panel(self, guild):
         cfg = await self.get_config()
@@ -197,8 +201,8 @@ class AlarmCog(commands.Cog):
             pass
         embed, view = await self.make_panel_embed(guild)
         msg = await channel.send(embed=embed, view=view)
-        cfg["main_message_id"] = msg.id
-        await self.save_config(cfg)
+        async with self.edit_config() as tx:
+            tx.data["main_message_id"] = msg.id
 
     async def make_panel_embed(self, guild):
         cfg = await self.get_config()
@@ -240,12 +244,11 @@ class AlarmCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def alarmmain(self, interaction: Interaction):
-        if not await self.is_lead(interaction.user, interaction.guild):
+        if not (utils.is_authorized(interaction) or await self.is_lead(interaction.user, interaction.guild)):
             return await utils.send_permission_denied(interaction)
-        cfg = await self.get_config()
         channel = interaction.channel
-        cfg["main_channel_id"] = channel.id
-        await self.save_config(cfg)
+        async with self.edit_config() as tx:
+            tx.data["main_channel_id"] = channel.id
         await self.update_panel(interaction.guild)
         await utils.send_success(interaction, "Alarm-Panel aktualisiert!")
 
@@ -255,11 +258,10 @@ class AlarmCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def alarmlead(self, interaction: Interaction, user: discord.Member):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        cfg = await self.get_config()
-        cfg["lead_id"] = user.id
-        await self.save_config(cfg)
+        async with self.edit_config() as tx:
+            tx.data["lead_id"] = user.id
         await utils.send_success(interaction, f"AlarmLead gesetzt: {user.mention}")
         await self.update_panel(interaction.guild)
 
@@ -269,12 +271,13 @@ class AlarmCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def alarmlead_remove(self, interaction: Interaction, user: discord.Member):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        cfg = await self.get_config()
-        if cfg.get("lead_id") == user.id:
-            cfg["lead_id"] = None
-            await self.save_config(cfg)
+        async with self.edit_config() as tx:
+            was_lead = tx.data.get("lead_id") == user.id
+            if was_lead:
+                tx.data["lead_id"] = None
+        if was_lead:
             await utils.send_success(interaction, f"{user.mention} ist nicht mehr Lead.")
             await self.update_panel(interaction.guild)
         else:
@@ -286,7 +289,7 @@ class AlarmCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def alarmlead_info(self, interaction: Interaction):
-        if not await self.is_lead(interaction.user, interaction.guild):
+        if not (utils.is_authorized(interaction) or await self.is_lead(interaction.user, interaction.guild)):
             return await utils.send_permission_denied(interaction)
         cfg = await self.get_config()
         guild = interaction.guild
@@ -304,13 +307,12 @@ class AlarmCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def alarmusers_add(self, interaction: Interaction, role: discord.Role):
-        if not await self.is_lead(interaction.user, interaction.guild):
+        if not (utils.is_authorized(interaction) or await self.is_lead(interaction.user, interaction.guild)):
             return await utils.send_permission_denied(interaction)
-        cfg = await self.get_config()
-        user_role_ids = set(cfg.get("user_role_ids", []))
-        user_role_ids.add(role.id)
-        cfg["user_role_ids"] = list(user_role_ids)
-        await self.save_config(cfg)
+        async with self.edit_config() as tx:
+            user_role_ids = set(tx.data.get("user_role_ids", []))
+            user_role_ids.add(role.id)
+            tx.data["user_role_ids"] = list(user_role_ids)
         await utils.send_success(interaction, f"Rolle {role.mention} hinzugefügt.")
 
     @app_commands.command(
@@ -319,14 +321,15 @@ class AlarmCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def alarmusers_remove(self, interaction: Interaction, role: discord.Role):
-        if not await self.is_lead(interaction.user, interaction.guild):
+        if not (utils.is_authorized(interaction) or await self.is_lead(interaction.user, interaction.guild)):
             return await utils.send_permission_denied(interaction)
-        cfg = await self.get_config()
-        user_role_ids = set(cfg.get("user_role_ids", []))
-        if role.id in user_role_ids:
-            user_role_ids.remove(role.id)
-            cfg["user_role_ids"] = list(user_role_ids)
-            await self.save_config(cfg)
+        async with self.edit_config() as tx:
+            user_role_ids = set(tx.data.get("user_role_ids", []))
+            removed = role.id in user_role_ids
+            if removed:
+                user_role_ids.remove(role.id)
+                tx.data["user_role_ids"] = list(user_role_ids)
+        if removed:
             await utils.send_success(interaction, f"Rolle {role.mention} entfernt.")
         else:
             await utils.send_error(interaction, "Diese Rolle ist nicht in der Pingliste.")
@@ -337,11 +340,10 @@ class AlarmCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def alarmlog(self, interaction: Interaction, channel: discord.TextChannel):
-        if not await self.is_lead(interaction.user, interaction.guild):
+        if not (utils.is_authorized(interaction) or await self.is_lead(interaction.user, interaction.guild)):
             return await utils.send_permission_denied(interaction)
-        cfg = await self.get_config()
-        cfg["log_channel_id"] = channel.id
-        await self.save_config(cfg)
+        async with self.edit_config() as tx:
+            tx.data["log_channel_id"] = channel.id
         await utils.send_success(interaction, f"Logchannel gesetzt: {channel.mention}")
 
     @app_commands.command(
@@ -350,7 +352,7 @@ class AlarmCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def alarmzuteilung(self, interaction: Interaction, user: discord.Member):
-        if not await self.is_lead(interaction.user, interaction.guild):
+        if not (utils.is_authorized(interaction) or await self.is_lead(interaction.user, interaction.guild)):
             return await utils.send_permission_denied(interaction)
         await interaction.response.send_modal(AlarmZuteilModal(self, user))
 
@@ -0,0 +1,104 @@
+# bench/bench_copy.py
+#
+# Benchmark für utils.atomic_copy (Streaming: sendfile bzw. 1-MB-Chunks, tmp + rename)
+# gegen die alte Variante (ganze Datei mit aiofiles in den Speicher lesen und schreiben).
+# Gemessen werden Durchsatz und Peak-RSS (resource.getrusage). Jede Messung läuft in einem
+# eigenen Prozess, weil ru_maxrss nur steigt und sich Läufe sonst gegenseitig verfälschen.
+#
+#   python bench/bench_copy.py                       # 1 MB, 100 MB, 1 GB
+#   python bench/bench_copy.py --sizes 1 100 --runs 5
+#   python bench/bench_copy.py --fsync               # mit fsync (wie PERSIST_COPY_FSYNC=1)
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import resource
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import aiofiles  # noqa: E402
+import utils  # noqa: E402
+
+MB = 1024 * 1024
+MODES = ("atomic_copy", "read_all")
+
+def peak_rss_mb():
+    # Linux: KiB, macOS: Bytes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / MB if sys.platform == "darwin" else rss / 1024
+
+def make_file(path, size_mb):
+    if os.path.exists(path) and os.path.getsize(path) == size_mb * MB:
+        return
+    block = os.urandom(MB)
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+async def read_all_copy(src, dst):
+    """Alte Implementierung (vor user-008) als Vergleich."""
+    async with aiofiles.open(src, "rb") as fsrc:
+        data = await fsrc.read()
+    async with aiofiles.open(dst, "wb") as fdst:
+        await fdst.write(data)
+
+async def copy_once(mode, src, dst, fsync):
+    if mode == "atomic_copy":
+        if not await utils.atomic_copy(src, dst, fsync=fsync):
+            raise RuntimeError("atomic_copy fehlgeschlagen")
+    else:
+        await read_all_copy(src, dst)
+
+def run_one(mode, src, runs, fsync):
+    """Kindprozess: runs Kopien, gibt 'sekunden_best peak_rss_mb' aus."""
+    dst = src + ".copy"
+    base_rss = peak_rss_mb()
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        asyncio.run(copy_once(mode, src, dst, fsync))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    if os.path.getsize(dst) != os.path.getsize(src):
+        raise RuntimeError("Kopie unvollständig")
+    os.remove(dst)
+    print(f"{best:.6f} {peak_rss_mb():.1f} {base_rss:.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark utils.atomic_copy")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 1024], help="Dateigrößen in MB")
+    parser.add_argument("--runs", type=int, default=3, help="Wiederholungen je Messung (bester Wert zählt)")
+    parser.add_argument("--fsync", action="store_true")
+    parser.add_argument("--dir", default=None, help="Arbeitsverzeichnis (Standard: temporär)")
+    parser.add_argument("--one", nargs=2, metavar=("MODE", "SRC"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.one:
+        return run_one(args.one[0], args.one[1], args.runs, args.fsync)
+
+    workdir = args.dir or tempfile.mkdtemp(prefix="bench-copy-")
+    print(f"Arbeitsverzeichnis: {workdir} | sendfile: {hasattr(os, 'sendfile')} | fsync: {args.fsync}")
+    print(f"{'Größe':>8}  {'Modus':<12} {'Zeit':>9}  {'Durchsatz':>11}  {'Peak-RSS':>9}  {'+ ggü. Start':>12}")
+    for size_mb in args.sizes:
+        src = os.path.join(workdir, f"src_{size_mb}mb.bin")
+        make_file(src, size_mb)
+        for mode in MODES:
+            cmd = [sys.executable, os.path.abspath(__file__), "--one", mode, src, "--runs", str(args.runs)]
+            if args.fsync:
+                cmd.append("--fsync")
+            out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout.split()
+            seconds, peak, base = float(out[0]), float(out[1]), float(out[2])
+            print(
+                f"{size_mb:>6}MB  {mode:<12} {seconds * 1000:>7.1f}ms  {size_mb / seconds:>7.0f} MB/s"
+                f"  {peak:>6.0f} MB  {peak - base:>9.0f} MB"
+            )
+        if not args.dir:
+            os.remove(src)
+
+if __name__ == "__main__":
+    main()
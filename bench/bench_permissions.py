@@ -0,0 +1,112 @@
+# bench/bench_permissions.py
+#
+# Benchmark für permissions.PermissionEngine: Checks pro Sekunde bei 10k Membern und
+# 500 Rollen – einmal mit Treffern im Member-Memo (gleiche Rollen-Tupel wiederholen sich),
+# einmal ohne (Memo vor jedem Check geleert). Zum Vergleich der alte Weg ohne Index:
+# pro Check commands_permissions.json per utils.load_json holen (Kopie aus dem Dokument-Cache)
+# und die Member-Rollen gegen die Rollen-Liste prüfen.
+#
+#   python bench/bench_permissions.py
+#   python bench/bench_permissions.py --members 10000 --roles 500 --commands 200 --checks 200000
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="bench-perm-"))
+os.makedirs("persistent_data", exist_ok=True)
+
+import utils  # noqa: E402
+import permissions  # noqa: E402
+
+def build(members, roles, commands, roles_per_member, roles_per_command, distinct_role_sets, seed=7):
+    rng = random.Random(seed)
+    role_ids = [10 ** 17 + i for i in range(roles)]
+    matrix = {f"cmd{i}": rng.sample(role_ids, roles_per_command) for i in range(commands)}
+    # Auf echten Servern teilen sich viele Member dieselbe Rollen-Kombination
+    role_sets = [
+        [SimpleNamespace(id=rid) for rid in sorted(rng.sample(role_ids, rng.randint(1, roles_per_member)))]
+        for _ in range(distinct_role_sets)
+    ]
+    member_list = [SimpleNamespace(id=i, roles=rng.choice(role_sets)) for i in range(members)]
+    return matrix, member_list
+
+async def naive_allowed(member, command):
+    """Vorher (PermissionsCog.has_command_permission): Dokument laden, dann Rollen-Scan."""
+    perms = await utils.load_json(permissions.PERMISSIONS_PATH, {})
+    return utils.has_any_role(member, perms.get(command, []))
+
+async def run(args):
+    matrix, members = build(
+        args.members, args.roles, args.commands, args.roles_per_member,
+        args.roles_per_command, args.role_sets
+    )
+    await utils.save_json(permissions.PERMISSIONS_PATH, matrix)
+    engine = permissions.ENGINE
+    await engine.refresh()
+    rng = random.Random(1)
+    names = list(matrix)
+    workload = [(rng.choice(members), rng.choice(names)) for _ in range(args.checks)]
+
+    async def engine_pass(clear_memo):
+        granted = 0
+        start = time.perf_counter()
+        for member, command in workload:
+            if clear_memo:
+                engine.clear_memo()
+            granted += await engine.allowed(member, command)
+        return time.perf_counter() - start, granted
+
+    start = time.perf_counter()
+    engine.invalidate()
+    await engine.refresh()
+    rebuild = time.perf_counter() - start
+
+    engine.clear_memo()
+    hits_before = engine.summary()["memo_hits"]
+    hit_time, hit_granted = await engine_pass(False)
+    hit_rate = (engine.summary()["memo_hits"] - hits_before) / len(workload)
+    miss_time, miss_granted = await engine_pass(True)
+
+    start = time.perf_counter()
+    naive_granted = 0
+    for member, command in workload:
+        naive_granted += await naive_allowed(member, command)
+    naive_time = time.perf_counter() - start
+
+    if not hit_granted == miss_granted == naive_granted:
+        raise RuntimeError("Engine und Vergleich entscheiden unterschiedlich")
+
+    print(
+        f"{args.members} Member, {args.roles} Rollen, {args.commands} Commands, "
+        f"{args.role_sets} Rollen-Kombinationen, {len(workload)} Checks ({hit_granted} erlaubt)"
+    )
+    summary = engine.summary()
+    print(f"Index-Neuaufbau: {rebuild * 1000:.1f}ms ({summary['scopes']} Scopes, {summary['roles']} Rollen)")
+    for label, seconds in (
+        (f"Engine, Memo-Treffer ({hit_rate:.0%})", hit_time),
+        ("Engine, Memo-Fehlschlag", miss_time),
+        ("Vorher (load_json + Scan)", naive_time),
+    ):
+        print(f"  {label:<30} {len(workload) / seconds:>12,.0f} Checks/s  ({seconds / len(workload) * 1e6:.2f} µs/Check)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PermissionEngine")
+    parser.add_argument("--members", type=int, default=10000)
+    parser.add_argument("--roles", type=int, default=500)
+    parser.add_argument("--commands", type=int, default=200)
+    parser.add_argument("--roles-per-member", type=int, default=8)
+    parser.add_argument("--roles-per-command", type=int, default=5)
+    parser.add_argument("--role-sets", type=int, default=300, help="verschiedene Rollen-Kombinationen unter den Membern")
+    parser.add_argument("--checks", type=int, default=50000)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# bench/bench_serializer.py
+#
+# Micro-Benchmark für utils.dumps / utils.loads: orjson gegen Standard-json,
+# jeweils eingerückt (Standard) und kompakt (PERSIST_COMPACT). Die Testdokumente sind
+# synthetisch und bilden die großen Dokumente des Bots nach:
+#   strike       strike_data.json: User-ID → Liste von Einträgen
+#   translation  translation_log.json (Altformat): User-ID → Profil → Liste von Übersetzungen
+#   wiki         wiki_pages.json: Titel → längerer Markdown-Text
+# Danach utils.encode_document inline gegen ausgelagert (asyncio.to_thread, ab
+# PERSIST_SERIALIZE_THREAD_BYTES): Gesamtzeit und wie lange der Event-Loop dabei blockiert war.
+#
+#   python bench/bench_serializer.py                  # 1k, 10k, 100k Einträge, alle Formen
+#   python bench/bench_serializer.py --sizes 1000 --runs 20 --shapes wiki
+#
+# Ohne installiertes orjson wird nur der Standard-Pfad gemessen.
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import utils  # noqa: E402
+
+ORJSON = utils.orjson
+
+def make_strike_document(entries, seed=42):
+    """entries Einträge, verteilt auf entries/10 User – mit Umlauten, Zahlen und None."""
+    rng = random.Random(seed)
+    words = ["Grund", "Verwarnung", "Spam", "Beleidigung", "Schicht verpasst", "Props", "Übersetzung", "größer"]
+    doc = {}
+    for i in range(entries):
+        uid = str(100000000000000000 + rng.randrange(max(1, entries // 10)))
+        doc.setdefault(uid, []).append({
+            "grund": " ".join(rng.choice(words) for _ in range(rng.randint(2, 12))),
+            "bild": rng.choice(["", "https://cdn.discordapp.com/attachments/1/2/bild.png"]),
+            "zeit": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            "von": str(rng.randrange(10 ** 17, 10 ** 18)) if rng.random() < 0.9 else None,
+            "anzahl": rng.randint(0, 1000),
+        })
+    return doc
+
+def make_translation_document(entries, seed=42):
+    """entries Übersetzungen, verteilt auf entries/20 User mit je bis zu 3 Profilen."""
+    rng = random.Random(seed)
+    words = ["Hallo", "wie", "geht's", "dir", "heute", "Schatz", "thank", "you", "so", "much", "für", "alles", "❤️", "😘"]
+    profiles = ["Standard", "Flirty", "Formell"]
+    doc = {}
+    for _ in range(entries):
+        uid = str(100000000000000000 + rng.randrange(max(1, entries // 20)))
+        original = " ".join(rng.choice(words) for _ in range(rng.randint(3, 40)))
+        doc.setdefault(uid, {}).setdefault(rng.choice(profiles), []).append({
+            "zeit": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            "original": original,
+            "translated": " ".join(reversed(original.split())),
+        })
+    return doc
+
+def make_wiki_document(entries, seed=42):
+    """entries/10 Seiten (Wiki-Seiten sind wenige, aber lang) mit 0,5–4 KB Markdown."""
+    rng = random.Random(seed)
+    words = ["Schicht", "Regeln", "Übersicht", "**wichtig**", "Ablauf", "`/befehl`", "Props", "größer", "Team"]
+    doc = {}
+    for i in range(max(1, entries // 10)):
+        lines = []
+        while sum(len(line) + 1 for line in lines) < rng.randint(500, 4000):
+            lines.append(rng.choice(["- ", "## ", ""]) + " ".join(rng.choice(words) for _ in range(rng.randint(3, 15))))
+        doc[f"Seite {i} – {rng.choice(words)}"] = "\n".join(lines)
+    return doc
+
+SHAPES = {
+    "strike": make_strike_document,
+    "translation": make_translation_document,
+    "wiki": make_wiki_document,
+}
+
+def best_of(func, runs):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def measure(doc, compact, runs):
+    """→ (dump-Sekunden, load-Sekunden, Bytes) mit dem aktuell aktiven Serializer."""
+    raw = utils.dumps(doc, compact)
+    dump = best_of(lambda: utils.dumps(doc, compact), runs)
+    load = best_of(lambda: utils.loads(raw), runs)
+    if utils.loads(raw) != doc:
+        raise RuntimeError("Round-Trip stimmt nicht")
+    return dump, load, len(raw)
+
+async def encode_once(doc, offload):
+    """Ein encode_document; → (Sekunden, längste Blockade des Event-Loops in Sekunden)."""
+    key = "bench.json"
+    # encode_document entscheidet anhand der letzten Größe, ob der Dump in den Thread geht
+    utils._LAST_SIZE[key] = utils.SERIALIZE_THREAD_BYTES if offload else 0
+    stop = False
+    longest = 0.0
+
+    async def heartbeat():
+        nonlocal longest
+        last = time.perf_counter()
+        while not stop:
+            await asyncio.sleep(0)
+            now = time.perf_counter()
+            longest = max(longest, now - last)
+            last = now
+
+    ticker = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await utils.encode_document(key, doc, compact=False)
+    elapsed = time.perf_counter() - start
+    stop = True
+    await ticker
+    return elapsed, longest
+
+def measure_offload(doc, runs):
+    """→ {inline/thread: (beste Gesamtzeit, kleinste maximale Loop-Blockade)}"""
+    results = {}
+    for offload in (False, True):
+        samples = [asyncio.run(encode_once(doc, offload)) for _ in range(runs)]
+        results["thread" if offload else "inline"] = (min(s[0] for s in samples), min(s[1] for s in samples))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark utils.dumps/loads (orjson vs. json)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Einträge je Dokument")
+    parser.add_argument("--runs", type=int, default=5, help="Wiederholungen (bester Wert zählt)")
+    parser.add_argument("--shapes", nargs="+", choices=list(SHAPES), default=list(SHAPES), help="Dokument-Formen")
+    args = parser.parse_args()
+
+    backends = [("json", None)] + ([("orjson", ORJSON)] if ORJSON else [])
+    print(f"orjson: {ORJSON.__version__ if ORJSON else 'nicht installiert'}")
+    print(f"Thread-Schwelle (PERSIST_SERIALIZE_THREAD_BYTES): {utils.SERIALIZE_THREAD_BYTES / 1024:.0f}KB")
+    try:
+        for shape in args.shapes:
+            print(f"\n[{shape}]")
+            print(f"{'Einträge':>9}  {'Serializer':<10} {'Modus':<8} {'Größe':>9}  {'dumps':>9}  {'loads':>9}  {'dumps MB/s':>10}")
+            for entries in args.sizes:
+                doc = SHAPES[shape](entries)
+                results = {}
+                for name, module in backends:
+                    utils.orjson = module
+                    for compact in (False, True):
+                        dump, load, size = measure(doc, compact, args.runs)
+                        results[(name, compact)] = (dump, load)
+                        print(
+                            f"{entries:>9}  {name:<10} {'kompakt' if compact else 'indent':<8} {size / 1024:>7.0f}KB"
+                            f"  {dump * 1000:>7.2f}ms  {load * 1000:>7.2f}ms  {size / 1024 / 1024 / dump:>10.0f}"
+                        )
+                    offload = measure_offload(doc, args.runs)
+                    (it, ib), (tt, tb) = offload["inline"], offload["thread"]
+                    print(
+                        f"{'':>9}  {name:<10} encode_document: inline {it * 1000:.2f}ms (Loop blockiert {ib * 1000:.2f}ms)"
+                        f" / Thread {tt * 1000:.2f}ms (Loop blockiert {tb * 1000:.2f}ms)"
+                    )
+                if ORJSON:
+                    for compact in (False, True):
+                        (jd, jl), (od, ol) = results[("json", compact)], results[("orjson", compact)]
+                        print(f"{'':>9}  → orjson {'kompakt' if compact else 'indent'}: dumps {jd / od:.1f}× / loads {jl / ol:.1f}× schneller")
+    finally:
+        utils.orjson = ORJSON
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import logging
+import utils
 
 TOKEN = os.getenv("DISCORD_TOKEN")
 GUILD_ID = int(os.getenv("GUILD_ID", "0"))
@@ -48,7 +49,35 @@ intents.members = True
 intents.guilds = True
 intents.message_content = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+class GuardedTree(discord.app_commands.CommandTree):
+    """
+    Zentrales Rechte-Gate: läuft vor jedem Slash-Command-Callback.
+    Sind für den Command in commands_permissions.json Rollen eingetragen, entscheidet allein der
+    Rechte-Index (PermissionsCog) – abgelehnte Aufrufe laden keine einzige Datei. Modul-eigene
+    Rechte (Strike-Mods, Leads, …) gelten dann für diesen Command nicht mehr (steht so auch in
+    der Hilfe von /befehlpermission). Commands ohne Rollen laufen wie bisher in die Checks im Callback.
+    """
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        command = interaction.command
+        perms_cog = self.client.get_cog("PermissionsCog")
+        if command is None or perms_cog is None:
+            return True
+        name = command.qualified_name.lower()
+        if utils.is_admin(interaction.user):
+            return True
+        engine = perms_cog.engine
+        await engine.refresh()
+        if not engine.is_configured(name):
+            return True
+        if await engine.allowed(interaction.user, name):
+            interaction.extras["authorized"] = True
+            return True
+        if interaction.type is discord.InteractionType.application_command:
+            await utils.send_permission_denied(interaction)
+        return False
+
+bot = commands.Bot(command_prefix="!", intents=intents, tree_cls=GuardedTree)
 
 COGS = [
     "persist",
@@ -106,6 +135,11 @@ async def on_ready():
     except Exception as e:
         log_error(f"Fehler beim SlashCommand-Sync: {e}")
 
+    # Prefix-Index für Command-Autocomplete (/befehlpermission …) einmal aufbauen
+    perms_cog = bot.get_cog("PermissionsCog")
+    if perms_cog:
+        perms_cog.build_command_index()
+
     await log_registered_commands()
     log_success(f"BOT ONLINE: {bot.user} ({bot.user.id}) – Alle Systeme bereit!\n")
 
@@ -122,6 +156,9 @@ async def on_app_command_error(interaction, error):
 
 async def shutdown():
     log_info("🔄 Shutdown-Handler: Speichere persistente Daten...")
+    await utils.stop_flusher()
+    stats = utils.get_write_stats()
+    log_info(f"💾 Schreibvorgänge: {stats['requested']} angefordert, {stats['performed']} ausgeführt ({stats['coalesced']} zusammengefasst)")
     await asyncio.sleep(0.5)
     log_info("🔴 BOT STOPPED")
 
@@ -0,0 +1,275 @@
+# language_detect.py
+
+import os
+import re
+import sys
+import math
+import time
+from collections import Counter, namedtuple
+
+# Spracherkennung für die Übersetzungsrichtung:
+#   - Zeichen-Trigramm-Modell pro Sprache (Naive Bayes mit Glättung) + Stoppwörter
+#   - Konfidenz = Wahrscheinlichkeit der besten Sprache (0..1)
+#   - Unter LANGUAGE_DETECT_THRESHOLD → None, dann entscheidet das Modell selbst
+#   - Kurze Texte (bis SHORT_TEXT_WORDS Wörter) nur über Wortlisten: Trigramme tragen bei
+#     "ok", "lol" oder "hi" nichts. Sprachneutrale Chat-Wörter (NEUTRAL_WORDS) → None.
+# Weitere Sprachen: register_language("fr", beispieltext, stoppwoerter, chatwoerter)
+# Auswertung: python language_detect.py --eval bench/language_corpus.tsv
+DETECT_THRESHOLD = float(os.environ.get("LANGUAGE_DETECT_THRESHOLD", "0.75"))
+# Anteil bekannter Trigramme, unter dem keine Sprache "passt" (z.B. Französisch)
+MIN_COVERAGE = float(os.environ.get("LANGUAGE_DETECT_MIN_COVERAGE", "0.55"))
+MAX_CHARS = 400  # längere Texte nur anlesen – reicht zum Erkennen
+SHORT_TEXT_WORDS = 3
+SHORT_TEXT_CONFIDENCE = 0.9
+
+Detection = namedtuple("Detection", "lang confidence")
+
+_WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+_LATIN_RE = re.compile(r"[a-zA-ZÀ-ɏ]")
+_UMLAUT_RE = re.compile(r"[äöüß]")
+
+SAMPLES = {
+    "de": (
+        "Hallo, wie geht es dir heute? Mir geht es gut, danke der Nachfrage. "
+        "Kannst du mir bitte kurz helfen, ich komme mit dem Setup nicht weiter. "
+        "Ich habe das jetzt schon dreimal versucht und es klappt einfach nicht. "
+        "Wann bist du morgen online? Ich wollte noch die Schicht mit dir besprechen. "
+        "Das ist wirklich eine gute Idee, lass uns das so machen. "
+        "Schreib mir einfach, wenn du Zeit hast, dann telefonieren wir kurz. "
+        "Ich bin gerade unterwegs und melde mich später noch mal bei dir. "
+        "Hast du schon gegessen? Wir könnten zusammen etwas bestellen. "
+        "Vielen Dank für deine Nachricht, ich schaue mir das gleich an. "
+        "Kein Problem, das kann jedem mal passieren. Mach dir keine Sorgen. "
+        "Die Bilder sind wirklich schön geworden, das gefällt mir sehr. "
+        "Ich weiß nicht genau, was du meinst, kannst du das noch mal erklären? "
+        "Wir sehen uns dann am Wochenende, ich freue mich schon darauf. "
+        "Heute war ein langer Tag, ich bin ziemlich müde und gehe bald schlafen. "
+        "Gibt es noch etwas, das ich für dich tun kann? Sag einfach Bescheid. "
+        "Das war nicht so gemeint, es tut mir leid, wenn das falsch rüberkam. "
+        "Schönen Abend noch und bis bald, pass auf dich auf. "
+        "Ich habe die Datei hochgeladen, bitte prüf mal, ob alles passt. "
+        "Der Preis ist leider etwas zu hoch, geht da noch was? "
+        "Natürlich, gerne, ich schicke dir gleich alle Infos dazu. "
+        "Warum antwortest du nicht mehr? Ist alles in Ordnung bei dir? "
+        "Ich denke, wir sollten das lieber morgen in Ruhe klären. "
+        "Sie hat gesagt, dass sie heute Abend nicht kommen kann. "
+        "Wir haben gestern lange gearbeitet und waren danach noch etwas trinken. "
+        "Kannst du mir sagen, wo ich die Einstellungen finde? Ich suche schon ewig. "
+        "Eigentlich wollte ich nur fragen, ob du am Freitag Zeit hast. "
+        "Genau so machen wir das, danke dir für die schnelle Antwort. "
+        "Ich glaube nicht, dass das funktioniert, aber wir können es versuchen. "
+        "Mein Handy war leer, deshalb konnte ich nicht zurückschreiben. "
+        "Guten Morgen, hast du gut geschlafen? Was machst du heute noch so? "
+        "Ich muss jetzt los, wir schreiben später weiter, versprochen. "
+        "Was hältst du davon, wenn wir nächste Woche zusammen anfangen? "
+        "Bitte vergiss nicht, die Rechnung bis Ende des Monats zu bezahlen. "
+        "Hier ist der Link, damit solltest du alles finden, was du brauchst. "
+        "Ich vermisse dich, schreib mir bald wieder. Liebe Grüße und bis dann. "
+        "Es gibt leider noch keine Neuigkeiten, ich halte dich aber auf dem Laufenden. "
+        "Könntest du das bitte noch einmal schicken? Ich habe es nicht bekommen. "
+        "Schau mal, was ich gefunden habe, das ist doch genau das Richtige für uns. "
+        "Wie findest du das neue Profilbild? Ehrlich gesagt finde ich es super. "
+        "Ich verstehe dich, aber so einfach ist das leider nicht. "
+        "Na klar, kein Stress, nimm dir ruhig die Zeit, die du brauchst. "
+    ),
+    "en": (
+        "Hey, how are you doing today? I'm fine, thanks for asking. "
+        "Can you please help me for a second, I'm stuck with the setup. "
+        "I already tried this three times and it just doesn't work. "
+        "When are you online tomorrow? I wanted to talk about the shift with you. "
+        "That's a really good idea, let's do it that way. "
+        "Just text me when you have time and we'll have a quick call. "
+        "I'm on my way right now and will get back to you later. "
+        "Have you eaten yet? We could order something together. "
+        "Thank you so much for your message, I'll take a look at it right away. "
+        "No problem, that can happen to anyone. Don't worry about it. "
+        "The pictures turned out really nice, I like them a lot. "
+        "I'm not sure what you mean, could you explain that again? "
+        "See you on the weekend then, I'm already looking forward to it. "
+        "Today was a long day, I'm pretty tired and going to bed soon. "
+        "Is there anything else I can do for you? Just let me know. "
+        "I didn't mean it like that, I'm sorry if it came across wrong. "
+        "Have a nice evening and talk soon, take care of yourself. "
+        "I uploaded the file, please check whether everything is fine. "
+        "The price is a bit too high unfortunately, can you do anything about it? "
+        "Of course, gladly, I'll send you all the info right away. "
+        "Why aren't you answering anymore? Is everything okay with you? "
+        "I think we should rather sort this out tomorrow when things are calm. "
+        "She said that she can't come tonight. "
+        "We worked late yesterday and went out for a drink afterwards. "
+        "Can you tell me where I can find the settings? I've been looking forever. "
+        "Actually I just wanted to ask if you're free on Friday. "
+        "That's exactly how we'll do it, thank you for the quick reply. "
+        "I don't think that will work, but we can give it a try. "
+        "My phone was dead, that's why I couldn't text you back. "
+        "Good morning, did you sleep well? What are you up to today? "
+        "I have to go now, we'll keep chatting later, I promise. "
+        "What do you think about starting together next week? "
+        "Please don't forget to pay the bill by the end of the month. "
+        "Here is the link, with that you should find everything you need. "
+        "I miss you, write me again soon. Lots of love and see you then. "
+        "Unfortunately there is no news yet, but I'll keep you posted. "
+        "Could you please send that one more time? I didn't get it. "
+        "Look what I found, that's exactly the right thing for us. "
+        "What do you think of the new profile picture? Honestly I think it's great. "
+        "I understand you, but it's unfortunately not that simple. "
+        "Sure thing, no stress, take all the time you need. "
+    ),
+}
+
+STOPWORDS = {
+    "de": (
+        "der die das und ich nicht mit für ist sind auf zu wie ein eine einen dem den des du wir ihr sie es "
+        "mir dir mich dich uns euch bitte danke ja nein auch noch schon aber oder wenn dann dass was wer "
+        "wo warum heute morgen hast habe hat bin bist war waren kann kannst können muss gibt mal doch gerne "
+        "sehr gut nur jetzt hier da weil kein keine nach bei von vom zum zur im am um über"
+    ),
+    "en": (
+        "the and you with for is are on to how in of that it this a an i me my your we our they them "
+        "he she his her please thanks yes no also still already but or if then what who where why today "
+        "tomorrow have has had am was were can could must there just really very good only now here "
+        "because not any after at from by about do does did will would"
+    ),
+}
+
+# Kurze Chat-Antworten, die eindeutig einer Sprache gehören (zusätzlich zu den Stoppwörtern)
+CHAT_WORDS = {
+    "de": "hallo tschüss tschüs moin servus nö nee jo joa jep genau klar super naja gute nacht bis später danke dir",
+    "en": "hello bye yeah yep nope sure thx ty thank thanks good night later see ya",
+}
+# Wird in beiden Sprachen gleich geschrieben → sagt nichts über die Richtung
+NEUTRAL_WORDS = set(
+    "ok okay k lol haha hahaha hehe xd hi hey baby bro omg wow hmm hm ah oh yo cool nice sorry top love".split()
+)
+
+class LanguageModel:
+    def __init__(self):
+        self.profiles = {}   # lang → {trigramm: log-Wahrscheinlichkeit}
+        self.unseen = {}     # lang → log-Wahrscheinlichkeit für unbekannte Trigramme
+        self.stopwords = {}  # wort → set(lang)
+        self.short_words = {}  # wort → set(lang), Stoppwörter + Chat-Wörter für kurze Texte
+
+    def add(self, lang, sample, stopwords="", chat_words=""):
+        counts = Counter()
+        for word in _WORD_RE.findall(sample.lower()):
+            counts.update(_trigrams(word))
+        total = sum(counts.values())
+        vocab = len(counts) + 1
+        # Add-One-Glättung, damit unbekannte Trigramme nicht alles auf 0 ziehen
+        self.profiles[lang] = {g: math.log((c + 1) / (total + vocab)) for g, c in counts.items()}
+        self.unseen[lang] = math.log(1 / (total + vocab))
+        for word in stopwords.split():
+            self.stopwords.setdefault(word, set()).add(lang)
+        for word in (stopwords + " " + chat_words).split():
+            self.short_words.setdefault(word, set()).add(lang)
+
+    def detect_short(self, words):
+        """Kurzer Text → Detection, oder None, wenn die Wortlisten nicht reichen (dann Trigramme)."""
+        content = [w for w in words if w not in NEUTRAL_WORDS]
+        if not content:
+            return Detection(None, 0.0)
+        langs = None
+        for word in content:
+            known = self.short_words.get(word)
+            if not known:
+                return None
+            langs = set(known) if langs is None else langs & known
+        if len(langs) == 1:
+            return Detection(next(iter(langs)), SHORT_TEXT_CONFIDENCE)
+        return Detection(None, 0.0)
+
+    def scores(self, text):
+        """→ ({lang: log-Score}, {lang: bekannte Trigramme}, {lang: Stoppwörter}, Anzahl Trigramme)"""
+        words = _WORD_RE.findall(text[:MAX_CHARS].lower())
+        scores = dict.fromkeys(self.profiles, 0.0)
+        seen = dict.fromkeys(self.profiles, 0)
+        stops = dict.fromkeys(self.profiles, 0)
+        n = 0
+        for word in words:
+            grams = _trigrams(word)
+            n += len(grams)
+            for lang, profile in self.profiles.items():
+                unseen = self.unseen[lang]
+                for g in grams:
+                    logprob = profile.get(g)
+                    if logprob is None:
+                        scores[lang] += unseen
+                    else:
+                        scores[lang] += logprob
+                        seen[lang] += 1
+            # Stoppwörter zählen wie ein paar sichere Trigramme extra
+            for lang in self.stopwords.get(word, ()):
+                scores[lang] += 2.0
+                stops[lang] += 1
+        return scores, seen, stops, n
+
+    def detect(self, text):
+        if not _LATIN_RE.search(text):
+            return Detection(None, 0.0)
+        words = _WORD_RE.findall(text.lower())
+        if len(words) <= SHORT_TEXT_WORDS:
+            short = self.detect_short(words)
+            if short is not None:
+                return short
+        scores, seen, stops, n = self.scores(text)
+        if not n:
+            return Detection(None, 0.0)
+        if _UMLAUT_RE.search(text.lower()) and "de" in scores:
+            scores["de"] += 4.0
+        best = max(scores, key=scores.get)
+        # Kein Modell passt (z.B. Französisch) → keine Entscheidung
+        if seen[best] / n < MIN_COVERAGE and not stops[best]:
+            return Detection(None, 0.0)
+        # Softmax über die Log-Scores
+        top = scores[best]
+        total = sum(math.exp(s - top) for s in scores.values())
+        return Detection(best, 1.0 / total)
+
+def _trigrams(word):
+    padded = f" {word} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+MODEL = LanguageModel()
+for _lang, _sample in SAMPLES.items():
+    MODEL.add(_lang, _sample, STOPWORDS.get(_lang, ""), CHAT_WORDS.get(_lang, ""))
+
+def register_language(lang, sample, stopwords="", chat_words=""):
+    MODEL.add(lang, sample, stopwords, chat_words)
+
+def detect(text):
+    """→ Detection(lang oder None, confidence)"""
+    return MODEL.detect(text)
+
+def detect_language(text, threshold=DETECT_THRESHOLD):
+    """Sprachcode oder None, wenn die Erkennung zu unsicher ist."""
+    result = MODEL.detect(text)
+    return result.lang if result.confidence >= threshold else None
+
+# ========== Auswertung (Genauigkeit / Laufzeit) ==========
+
+def evaluate(path):
+    """Datei mit Zeilen "sprache<TAB>text" → Trefferquote, Anteil unentschieden, µs pro Aufruf."""
+    cases = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            lang, _, text = line.rstrip("\n").partition("\t")
+            if text:
+                cases.append((lang, text))
+    started = time.perf_counter()
+    results = [detect_language(text) for _, text in cases]
+    elapsed = time.perf_counter() - started
+    decided = [(lang, got) for (lang, _), got in zip(cases, results) if got is not None]
+    correct = sum(1 for lang, got in decided if lang == got)
+    return {
+        "cases": len(cases),
+        "accuracy": correct / len(decided) if decided else 0.0,
+        "undecided": 1 - len(decided) / len(cases) if cases else 0.0,
+        "us_per_call": elapsed / len(cases) * 1e6 if cases else 0.0,
+    }
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--eval":
+        print(evaluate(sys.argv[2]))
+    else:
+        for arg in sys.argv[1:]:
+            print(detect(arg), arg)
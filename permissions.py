@@ -6,71 +6,219 @@ from discord.ext import commands
 import os
 import utils
 import asyncio
+import bisect
+import io
+import json
 
 GUILD_ID = int(os.environ.get("GUILD_ID", "0"))
 MY_GUILD = discord.Object(id=GUILD_ID)
 PERMISSIONS_PATH = os.path.join("persistent_data", "commands_permissions.json")
 
+# ===== Permission-Engine =====
+# Index im Speicher statt Datei lesen + Rollen-Scan bei jedem Check:
+#   Scope (Command-Name oder z.B. "strike:mod") → Bit-Nummer
+#   Rollen-ID → Bitmaske aller Scopes, die diese Rolle freischaltet
+# Die effektive Maske eines Members wird pro Rollen-Tupel gemerkt. Quellen (JSON-Dokumente)
+# werden über utils.get_version() beobachtet: jede Änderung baut den Index neu auf.
+
+class PermissionEngine:
+    MEMO_LIMIT = 10000
+
+    def __init__(self):
+        self._sources = {}      # path → (fallback, extract(doc) → {scope: [role_ids]})
+        self._versions = {}     # path → Version beim letzten Laden
+        self._scope_roles = {}  # path → {scope: [role_ids]}
+        self._bits = {}         # scope → Bit-Nummer
+        self._role_masks = {}   # role_id → Bitmaske
+        self._memo = {}         # Rollen-Tupel → Bitmaske
+        self.stats = {"checks": 0, "memo_hits": 0, "rebuilds": 0}
+
+    def register_source(self, path, fallback, extract):
+        self._sources[path] = (fallback, extract)
+        self._versions.pop(path, None)
+
+    def invalidate(self):
+        """Erzwingt ein Neuladen aller Quellen beim nächsten Check."""
+        self._versions.clear()
+
+    async def refresh(self):
+        changed = False
+        for path, (fallback, extract) in self._sources.items():
+            version = utils.get_version(path)
+            if self._versions.get(path) == version:
+                continue
+            doc = await utils.load_json(path, fallback)
+            self._scope_roles[path] = extract(doc)
+            self._versions[path] = version
+            changed = True
+        if changed:
+            self._rebuild()
+
+    def _rebuild(self):
+        bits = {}
+        role_masks = {}
+        for scopes in self._scope_roles.values():
+            for scope, role_ids in scopes.items():
+                # Leere Rollen-Liste = nicht konfiguriert (sonst wäre der Command für alle gesperrt)
+                if not role_ids:
+                    continue
+                bit = bits.setdefault(scope, len(bits))
+                for rid in role_ids or []:
+                    role_masks[rid] = role_masks.get(rid, 0) | (1 << bit)
+        self._bits = bits
+        self._role_masks = role_masks
+        self._memo.clear()
+        self.stats["rebuilds"] += 1
+
+    def member_mask(self, member) -> int:
+        key = tuple(role.id for role in getattr(member, "roles", []))
+        mask = self._memo.get(key)
+        if mask is not None:
+            self.stats["memo_hits"] += 1
+            return mask
+        mask = 0
+        for rid in key:
+            mask |= self._role_masks.get(rid, 0)
+        if len(self._memo) >= self.MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[key] = mask
+        return mask
+
+    def is_configured(self, scope: str) -> bool:
+        """Mindestens eine Rolle eingetragen."""
+        return scope in self._bits
+
+    async def allowed(self, member, scope: str) -> bool:
+        """Rollen-Check ohne Admin-Sonderfall (den macht der Aufrufer)."""
+        await self.refresh()
+        self.stats["checks"] += 1
+        bit = self._bits.get(scope)
+        if bit is None:
+            return False
+        return bool(self.member_mask(member) >> bit & 1)
+
+    def summary(self):
+        return {
+            **self.stats,
+            "scopes": len(self._bits),
+            "roles": len(self._role_masks),
+            "memo_entries": len(self._memo),
+        }
+
+    def clear_memo(self):
+        """Vergisst die gemerkten Member-Masken (der Index bleibt)."""
+        self._memo.clear()
+
+    def roles_for(self, scope: str) -> list[int]:
+        bit = self._bits.get(scope)
+        if bit is None:
+            return []
+        return [rid for rid, mask in self._role_masks.items() if mask >> bit & 1]
+
+ENGINE = PermissionEngine()
+ENGINE.register_source(PERMISSIONS_PATH, {}, lambda doc: {cmd.lower(): roles for cmd, roles in doc.items()})
+
 class PermissionsCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.engine = ENGINE
+        self.command_names = []  # sortierte Qualified-Names aller Guild-Commands (Prefix-Index)
 
     # ===== Interne Helper =====
 
+    def build_command_index(self):
+        """Einmal nach dem Sync (bot.on_ready) aufrufen: Prefix-Index über den Command-Tree."""
+        names = {
+            cmd.qualified_name.lower()
+            for cmd in self.bot.tree.walk_commands(guild=MY_GUILD)
+            if isinstance(cmd, app_commands.Command)
+        }
+        self.command_names = sorted(names)
+
+    def command_exists(self, name: str) -> bool:
+        if not self.command_names:
+            self.build_command_index()
+        i = bisect.bisect_left(self.command_names, name)
+        return i < len(self.command_names) and self.command_names[i] == name
+
+    def commands_with_prefix(self, prefix: str, limit: int = 25) -> list[str]:
+        if not self.command_names:
+            self.build_command_index()
+        prefix = prefix.lower()
+        i = bisect.bisect_left(self.command_names, prefix)
+        result = []
+        while i < len(self.command_names) and len(result) < limit and self.command_names[i].startswith(prefix):
+            result.append(self.command_names[i])
+            i += 1
+        return result
+
+    async def command_autocomplete(self, interaction: Interaction, current: str):
+        return [app_commands.Choice(name=n, value=n) for n in self.commands_with_prefix(current)]
+
     async def get_allowed_roles(self, command_name: str) -> list[int]:
         """Liefert erlaubte Rollen-IDs für einen Command."""
         perms = await utils.load_json(PERMISSIONS_PATH, {})
         return perms.get(command_name, [])
 
     async def set_allowed_roles(self, command_name: str, role_ids: list[int]):
-        perms = await utils.load_json(PERMISSIONS_PATH, {})
-        perms[command_name] = role_ids
-        await utils.save_json(PERMISSIONS_PATH, perms)
+        async with utils.json_transaction(PERMISSIONS_PATH, {}) as tx:
+            tx.data[command_name] = role_ids
 
     async def has_command_permission(self, member: discord.Member, command_name: str) -> bool:
         # Admins haben IMMER alle Rechte
         if utils.is_admin(member):
             return True
-        allowed = await self.get_allowed_roles(command_name)
-        return utils.has_any_role(member, allowed)
+        return await self.engine.allowed(member, command_name.lower())
 
     # ===== Slash Commands =====
 
     @app_commands.command(
         name="befehlpermission",
-        description="Gibt einer Rolle das Recht, einen Command zu nutzen (Admin only)."
+        description="Gibt einer Rolle das Recht für einen Command – ab dann entscheidet nur diese Liste (Admin only)."
     )
     @app_commands.guilds(MY_GUILD)
     async def add_permission(self, interaction: Interaction, command: str, role: discord.Role):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         command = command.lower()
         # Existiert der Command?
-        if not any(cmd.name == command for cmd in self.bot.tree.get_commands(guild=discord.Object(GUILD_ID))):
+        if not self.command_exists(command):
             return await utils.send_error(interaction, f"Command `{command}` existiert nicht!")
-        # Hole aktuelle Rollen
-        allowed = await self.get_allowed_roles(command)
-        if role.id in allowed:
+        # Aktuelle Rollen lesen + ergänzen in einer Transaktion
+        async with utils.json_transaction(PERMISSIONS_PATH, {}) as tx:
+            allowed = tx.data.setdefault(command, [])
+            already = role.id in allowed
+            if not already:
+                allowed.append(role.id)
+        if already:
             return await utils.send_error(interaction, f"{role.mention} darf `{command}` bereits nutzen.")
-        allowed.append(role.id)
-        await self.set_allowed_roles(command, allowed)
-        await utils.send_success(interaction, f"{role.mention} darf jetzt `{command}` ausführen.\nVergiss nicht `/refreshpermissions` auszuführen!")
+        await utils.send_success(
+            interaction,
+            f"{role.mention} darf jetzt `{command}` ausführen (gilt sofort).\n"
+            f"Hinweis: Solange für `{command}` Rollen eingetragen sind, entscheidet nur diese Liste (plus Admins). "
+            f"Modul-eigene Rechte (z.B. Strike-Mods, Leads) gelten für diesen Command dann nicht mehr."
+        )
 
     @app_commands.command(
         name="befehlpermissionremove",
-        description="Entzieht einer Rolle das Recht für einen Command (Admin only)."
+        description="Entzieht einer Rolle das Recht; ohne Rollen gelten wieder die Modul-Rechte (Admin only)."
     )
     @app_commands.guilds(MY_GUILD)
     async def remove_permission(self, interaction: Interaction, command: str, role: discord.Role):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         command = command.lower()
-        allowed = await self.get_allowed_roles(command)
-        if role.id not in allowed:
+        async with utils.json_transaction(PERMISSIONS_PATH, {}) as tx:
+            allowed = tx.data.get(command, [])
+            had_right = role.id in allowed
+            if had_right:
+                allowed.remove(role.id)
+                # Letzte Rolle weg → Eintrag löschen, der Command läuft wieder über die Modul-Checks
+                if not allowed:
+                    del tx.data[command]
+        if not had_right:
             return await utils.send_error(interaction, f"{role.mention} hatte kein Recht für `{command}`.")
-        allowed.remove(role.id)
-        await self.set_allowed_roles(command, allowed)
-        await utils.send_success(interaction, f"{role.mention} darf `{command}` nun nicht mehr nutzen.\nBitte `/refreshpermissions` ausführen!")
+        await utils.send_success(interaction, f"{role.mention} darf `{command}` nun nicht mehr nutzen (gilt sofort).")
 
     @app_commands.command(
         name="befehlpermissions",
@@ -78,7 +226,7 @@ class PermissionsCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def list_permissions(self, interaction: Interaction, command: str):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         command = command.lower()
         allowed = await self.get_allowed_roles(command)
@@ -90,19 +238,143 @@ class PermissionsCog(commands.Cog):
             color=discord.Color.blurple()
         )
 
+    @add_permission.autocomplete("command")
+    async def add_permission_autocomplete(self, interaction: Interaction, current: str):
+        return await self.command_autocomplete(interaction, current)
+
+    @remove_permission.autocomplete("command")
+    async def remove_permission_autocomplete(self, interaction: Interaction, current: str):
+        return await self.command_autocomplete(interaction, current)
+
+    @list_permissions.autocomplete("command")
+    async def list_permissions_autocomplete(self, interaction: Interaction, current: str):
+        return await self.command_autocomplete(interaction, current)
+
+    @app_commands.command(
+        name="befehlpermissionexport",
+        description="Exportiert alle Command-Rechte als JSON-Datei (Admin only)."
+    )
+    @app_commands.guilds(MY_GUILD)
+    async def export_permissions(self, interaction: Interaction):
+        if not utils.is_authorized(interaction):
+            return await utils.send_permission_denied(interaction)
+        perms = await utils.load_json(PERMISSIONS_PATH, {})
+        guild = interaction.guild
+        export = {"guild_id": guild.id, "commands": {}}
+        for command, role_ids in sorted(perms.items()):
+            entries = []
+            for rid in role_ids:
+                role = guild.get_role(rid)
+                # Name mitexportieren: IDs sind auf einem anderen Server (Staging ↔ Live) andere
+                entries.append({"id": rid, "name": role.name if role else None})
+            export["commands"][command] = entries
+        content = json.dumps(export, ensure_ascii=False, indent=2).encode("utf-8")
+        await utils.send_ephemeral(
+            interaction,
+            text=f"Export: **{len(export['commands'])}** Commands mit Rechten.",
+            emoji="📤",
+            color=discord.Color.blurple(),
+            file=discord.File(io.BytesIO(content), filename="commands_permissions_export.json")
+        )
+
+    @app_commands.command(
+        name="befehlpermissionimport",
+        description="Importiert Command-Rechte aus einer JSON-Datei (Export-Format, Admin only)."
+    )
+    @app_commands.describe(
+        datei="JSON-Datei aus /befehlpermissionexport",
+        ersetzen="Ja = alle bisherigen Rechte ersetzen, Nein = ergänzen"
+    )
+    @app_commands.guilds(MY_GUILD)
+    async def import_permissions(self, interaction: Interaction, datei: discord.Attachment, ersetzen: bool = True):
+        if not utils.is_authorized(interaction):
+            return await utils.send_permission_denied(interaction)
+        try:
+            raw = json.loads(await datei.read())
+        except Exception as e:
+            return await utils.send_error(interaction, f"Datei ist kein gültiges JSON: {e}")
+        matrix, errors = self.parse_import(interaction.guild, raw)
+        if errors:
+            # Alles oder nichts: bei Fehlern wird gar nichts übernommen
+            listing = "\n".join(f"• {e}" for e in errors[:15])
+            more = f"\n… und {len(errors) - 15} weitere" if len(errors) > 15 else ""
+            return await utils.send_error(interaction, f"Import abgebrochen, nichts geändert:\n{listing}{more}")
+        async with utils.json_transaction(PERMISSIONS_PATH, {}) as tx:
+            if ersetzen:
+                tx.data.clear()
+            for command, role_ids in matrix.items():
+                if not role_ids:
+                    continue
+                allowed = tx.data.setdefault(command, [])
+                for rid in role_ids:
+                    if rid not in allowed:
+                        allowed.append(rid)
+        await utils.send_success(
+            interaction,
+            f"Import abgeschlossen: **{len(matrix)}** Commands, **{sum(len(r) for r in matrix.values())}** Rollen-Zuweisungen "
+            f"({'ersetzt' if ersetzen else 'ergänzt'})."
+        )
+
+    def parse_import(self, guild: discord.Guild, raw) -> tuple[dict, list[str]]:
+        """Prüft eine Export-Datei komplett → (Command → Rollen-IDs, Fehlerliste)."""
+        errors = []
+        matrix = {}
+        commands_raw = raw.get("commands") if isinstance(raw, dict) else None
+        if not isinstance(commands_raw, dict):
+            return {}, ["Feld `commands` fehlt oder ist kein Objekt."]
+        same_guild = raw.get("guild_id") == guild.id
+        roles_by_name = {}
+        for role in guild.roles:
+            roles_by_name.setdefault(role.name, []).append(role)
+        for command, entries in commands_raw.items():
+            command = str(command).lower()
+            if not self.command_exists(command):
+                errors.append(f"Command `{command}` existiert nicht.")
+                continue
+            if not isinstance(entries, list):
+                errors.append(f"`{command}`: Rollen müssen eine Liste sein.")
+                continue
+            role_ids = []
+            for entry in entries:
+                if isinstance(entry, int):
+                    entry = {"id": entry}
+                if not isinstance(entry, dict):
+                    errors.append(f"`{command}`: ungültiger Rollen-Eintrag {entry!r}.")
+                    continue
+                role = guild.get_role(entry.get("id")) if same_guild or not entry.get("name") else None
+                if role is None and entry.get("name"):
+                    # Anderer Server: über den Rollennamen zuordnen (muss eindeutig sein)
+                    candidates = roles_by_name.get(entry["name"], [])
+                    if len(candidates) > 1:
+                        errors.append(f"`{command}`: Rollenname „{entry['name']}“ ist nicht eindeutig.")
+                        continue
+                    role = candidates[0] if candidates else None
+                if role is None:
+                    errors.append(f"`{command}`: Rolle {entry.get('name') or entry.get('id')} nicht gefunden.")
+                    continue
+                if role.id not in role_ids:
+                    role_ids.append(role.id)
+            matrix[command] = role_ids
+        return matrix, errors
+
     @app_commands.command(
         name="refreshpermissions",
         description="Synchronisiert alle Slash-Command-Rechte auf dem Server (Admin only)."
     )
     @app_commands.guilds(MY_GUILD)
     async def refresh_permissions(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         # Slash-Commands können NICHT per python live unsichtbar gemacht werden!
-        # Wir synchronisieren nur die gespeicherten Rollen, die im Command-Callback überprüft werden!
+        # Wir bauen nur den Rechte-Index neu auf, gegen den geprüft wird.
+        self.engine.invalidate()
+        await self.engine.refresh()
+        self.build_command_index()
+        stats = self.engine.summary()
         await utils.send_success(
             interaction,
-            "**Alle Slash-Commands** wurden für diese Guild synchronisiert.\nAlle Berechtigungen sind jetzt aktiv (werden im Command geprüft)."
+            f"Rechte-Index neu aufgebaut: **{stats['scopes']}** Scopes, **{stats['roles']}** Rollen.\n"
+            f"Checks bisher: {stats['checks']} (davon {stats['memo_hits']} aus dem Member-Cache)."
         )
 
     # ===== Helper für andere Cogs (exportiert) =====
@@ -120,3 +392,7 @@ async def setup(bot):
 # import permissions
 # await permissions.user_has_permission(member, "strikegive")
 # if nicht erlaubt: await utils.send_permission_denied(interaction)
+#
+# Eigene Rollen-Listen (z.B. Strike-Mods) als Scope in den Index hängen:
+# permissions.ENGINE.register_source(PFAD, fallback, lambda doc: {"modul:scope": doc})
+# await permissions.ENGINE.allowed(member, "modul:scope")
@@ -6,13 +6,26 @@ from discord.ext import commands, tasks
 import os
 import aiofiles
 import asyncio
-from datetime import datetime, timezone
+import hashlib
+import json
+import shutil
+from datetime import datetime, timedelta, timezone
 import utils
 
 GUILD_ID = int(os.environ.get("GUILD_ID", "0"))
 MY_GUILD = discord.Object(id=GUILD_ID)
 PERSIST_PATH = "persistent_data"
 BACKUP_ROOT = "railway_data_backup"
+# Inkrementelle Backups: Dateiinhalte liegen genau einmal (nach SHA-256) in objects/,
+# jeder Snapshot ist nur ein Manifest Dateiname → Hash in snapshots/<timestamp>.json
+OBJECTS_DIR = os.path.join(BACKUP_ROOT, "objects")
+SNAPSHOTS_DIR = os.path.join(BACKUP_ROOT, "snapshots")
+STAGING_DIR = os.path.join(BACKUP_ROOT, "staging")
+# Aufbewahrung: alles der letzten X Stunden, danach je Tag / je Woche der neueste Snapshot
+BACKUP_KEEP_HOURS = int(os.environ.get("BACKUP_KEEP_HOURS", "24"))
+BACKUP_KEEP_DAILY = int(os.environ.get("BACKUP_KEEP_DAILY", "14"))
+BACKUP_KEEP_WEEKLY = int(os.environ.get("BACKUP_KEEP_WEEKLY", "13"))
+PRUNE_BATCH = 50  # Einträge pro Schritt, danach kurz an den Event-Loop abgeben
 LOG_CHANNEL_PATH = os.path.join(PERSIST_PATH, "persist_log_channel.json")  # Speichert optional den Log-Channel
 
 # Hier alle kritischen Dateien eintragen (nur Filenamen, keine Pfade)
@@ -24,15 +37,18 @@ DATA_FILES = [
     "alarm_config.json",
     "profiles.json",
     "translation_log.json",
+    "translation_log.jsonl",
     "translator_prompt.json",
     "translator_menu.json",
     "trans_category.json",
+    "translation_sessions.json",
+    "translation_timeouts.json",
     "translator_log.json",
     "wiki_pages.json",
     "wiki_backup.json",
     "wiki_main_channel.json",
     "setup_config.json",
-    "commands_permissions.json"
+    "commands_permissions.json",
     "request_config.json",
     "request_data.json",
     "request_log.json"
@@ -48,6 +64,87 @@ async def ensure_dir(path):
     except Exception as e:
         print(f"[persist.py] Fehler beim Anlegen von {path}: {e}")
 
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def object_path(digest):
+    return os.path.join(OBJECTS_DIR, digest[:2], digest)
+
+def list_snapshots():
+    """Alle Snapshot-Namen (Timestamps), älteste zuerst."""
+    if not os.path.isdir(SNAPSHOTS_DIR):
+        return []
+    return sorted(f[:-5] for f in os.listdir(SNAPSHOTS_DIR) if f.endswith(".json"))
+
+async def read_manifest(name):
+    try:
+        async with aiofiles.open(os.path.join(SNAPSHOTS_DIR, f"{name}.json"), "r", encoding="utf-8") as f:
+            return json.loads(await f.read())
+    except Exception as e:
+        print(f"[persist.py] Manifest {name} nicht lesbar: {e}")
+        return None
+
+async def write_manifest(name, manifest):
+    path = os.path.join(SNAPSHOTS_DIR, f"{name}.json")
+    async with aiofiles.open(path + ".tmp", "w", encoding="utf-8") as f:
+        await f.write(json.dumps(manifest, indent=2))
+    os.replace(path + ".tmp", path)
+
+def parse_timestamp(name):
+    try:
+        return datetime.strptime(name, "%Y%m%d_%H%M%S").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+def list_legacy_snapshots():
+    """Timestamp-Ordner aus dem alten Vollkopie-Backup."""
+    if not os.path.isdir(BACKUP_ROOT):
+        return []
+    return sorted(
+        d for d in os.listdir(BACKUP_ROOT)
+        if parse_timestamp(d) and os.path.isdir(os.path.join(BACKUP_ROOT, d))
+    )
+
+def select_retained(names, now=None):
+    """Wendet die Aufbewahrungsregeln an → Menge der zu behaltenden Snapshot-Namen."""
+    now = now or datetime.now(timezone.utc)
+    keep = set()
+    days = set()
+    weeks = set()
+    for name in sorted(names, reverse=True):  # neueste zuerst
+        ts = parse_timestamp(name)
+        if ts is None:
+            keep.add(name)  # Unbekanntes Format nie automatisch löschen
+            continue
+        age = now - ts
+        day = ts.date()
+        week = ts.isocalendar()[:2]
+        if age <= timedelta(hours=BACKUP_KEEP_HOURS):
+            keep.add(name)
+        elif age <= timedelta(days=BACKUP_KEEP_DAILY) and day not in days:
+            keep.add(name)
+        elif age <= timedelta(weeks=BACKUP_KEEP_WEEKLY) and week not in weeks:
+            keep.add(name)
+        days.add(day)
+        weeks.add(week)
+    if names:
+        keep.add(max(names))  # Der neueste Snapshot bleibt immer erhalten
+    return keep
+
+def dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            try:
+                total += os.path.getsize(os.path.join(root, f))
+            except OSError:
+                pass
+    return total
+
 async def get_log_channel(bot):
     cfg = await utils.load_json(LOG_CHANNEL_PATH, {})
     if "log_channel_id" in cfg:
@@ -61,22 +158,178 @@ class PersistCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.automatic_backup_interval = 4  # in Stunden (anpassbar)
+        self._hash_cache = {}  # fname → (mtime_ns, size, sha256) der Live-Datei
+        self._backup_lock = asyncio.Lock()
         self.automatic_backup.start()
 
     async def cog_load(self):
+        # Write-Ahead-Journal: abgebrochene Schreibvorgänge vom letzten Lauf nachspielen
+        replayed = await utils.recover_journal()
+        if replayed:
+            print(f"[persist.py] {replayed} Schreibvorgänge aus dem Journal wiederhergestellt.")
+        if utils.get_backend().name == "sqlite":
+            # Einmal-Import der bisherigen JSON-Dateien (bereits vorhandene Dokumente bleiben unangetastet)
+            imported = await utils.migrate_json_to_sqlite(PERSIST_PATH)
+            if imported:
+                print(f"[persist.py] {imported} JSON-Dateien nach SQLite migriert.")
+        await self.quarantine_corrupt_files()
         await self.restore_missing_files()  # Automatisches Restore beim Start
 
+    async def cog_unload(self):
+        self.automatic_backup.cancel()
+        # Write-Behind: offene Änderungen garantiert wegschreiben
+        await utils.stop_flusher()
+
+    async def quarantine_corrupt_files(self):
+        """Beschädigte Dateien beiseite legen, damit restore_missing_files sie aus dem Backup holt."""
+        for fname in DATA_FILES:
+            path = os.path.join(PERSIST_PATH, fname)
+            if fname.endswith(".jsonl") or await utils.check_document(path):
+                continue
+            moved = utils.quarantine_document(path)
+            if moved:
+                print(f"[persist.py] {fname} ist beschädigt → verschoben nach {moved}, Restore aus Backup.")
+            else:
+                print(f"[persist.py] {fname} ist beschädigt und konnte nicht verschoben werden!")
+
     async def restore_missing_files(self):
         await ensure_dir(PERSIST_PATH)
         await ensure_dir(BACKUP_ROOT)
-        restored = 0
+        restored, _, _ = await self.restore_snapshot(only_missing=True)
+        print(f"[persist.py] Automatisch {restored} Dateien beim Start restauriert.")
+
+    # -------------- Snapshots (content-addressed) --------------
+
+    async def store_object(self, fname):
+        """Legt den aktuellen Inhalt einer Datei im Object-Store ab → (sha256, size) oder None."""
+        src = os.path.join(PERSIST_PATH, fname)
+        if not await utils.document_exists(src):
+            return None
+        live_file = utils.document_file(src)
+        if live_file:
+            st = os.stat(live_file)
+            cached = self._hash_cache.get(fname)
+            # Unveränderte Datei (mtime/size gleich) → weder lesen noch kopieren
+            if cached and cached[:2] == (st.st_mtime_ns, st.st_size) and os.path.exists(object_path(cached[2])):
+                return cached[2], st.st_size
+            digest = await asyncio.to_thread(sha256_file, live_file)
+            if os.path.exists(object_path(digest)):
+                self._hash_cache[fname] = (st.st_mtime_ns, st.st_size, digest)
+                return digest, st.st_size
+        # Neuer Inhalt: erst in Staging kopieren und dort hashen (Live-Datei kann sich ändern)
+        await ensure_dir(STAGING_DIR)
+        staging = os.path.join(STAGING_DIR, fname)
+        if await utils.export_document(src, staging) is False:
+            return None
+        digest = await asyncio.to_thread(sha256_file, staging)
+        size = os.path.getsize(staging)
+        target = object_path(digest)
+        if os.path.exists(target):
+            os.remove(staging)
+        else:
+            await ensure_dir(os.path.dirname(target))
+            os.replace(staging, target)
+        return digest, size
+
+    async def create_snapshot(self):
+        """Erstellt einen Snapshot aller DATA_FILES → (name, gesicherte Dateien, fehlende Dateien)."""
+        async with self._backup_lock:
+            await ensure_dir(SNAPSHOTS_DIR)
+            name = get_timestamp()
+            files = {}
+            missing = []
+            # Alle Dateien parallel sichern (begrenzte Anzahl gleichzeitiger Kopien)
+            results = await utils.run_bounded(self.store_object(fname) for fname in DATA_FILES)
+            for fname, stored in zip(DATA_FILES, results):
+                if stored is None:
+                    missing.append(fname)
+                    continue
+                digest, size = stored
+                files[fname] = {"sha256": digest, "size": size}
+            await write_manifest(name, {"created": name, "files": files})
+            return name, len(files), missing
+
+    async def restore_snapshot(self, name=None, only_missing=False):
+        """Stellt einen Snapshot (Standard: neuester) wieder her → (restored, missing, name)."""
+        snapshots = list_snapshots()
+        name = name or (snapshots[-1] if snapshots else None)
+        missing = []
+        if name is None:
+            # Altes Backup-Format: "latest"-Kopien direkt im BACKUP_ROOT
+            sources = {fname: os.path.join(BACKUP_ROOT, fname) for fname in DATA_FILES}
+        else:
+            manifest = await read_manifest(name)
+            if manifest is None:
+                return 0, list(DATA_FILES), name
+            sources = {fname: object_path(info["sha256"]) for fname, info in manifest.get("files", {}).items()}
+        jobs = []
         for fname in DATA_FILES:
             live = os.path.join(PERSIST_PATH, fname)
-            backup = os.path.join(BACKUP_ROOT, fname)
-            if not os.path.exists(live) and os.path.exists(backup):
-                await utils.atomic_copy(backup, live)
-                restored += 1
-        print(f"[persist.py] Automatisch {restored} Dateien beim Start restauriert.")
+            if only_missing and await utils.document_exists(live):
+                continue
+            src = sources.get(fname)
+            if src and os.path.exists(src):
+                jobs.append(utils.import_document(src, live))
+            else:
+                missing.append(fname)
+        # Parallel wiederherstellen, aber mit begrenzter Anzahl gleichzeitiger Kopien
+        results = await utils.run_bounded(jobs)
+        restored = sum(1 for ok in results if ok is not False)
+        return restored, missing, name
+
+    # -------------- Retention / GC --------------
+
+    async def prune_backups(self):
+        """Löscht Snapshots außerhalb der Aufbewahrung und danach nicht mehr referenzierte Objekte.
+        Läuft in kleinen Schritten, Dateisystem-Arbeit im Thread → blockiert den Event-Loop nicht."""
+        async with self._backup_lock:
+            removed_snapshots = 0
+            snapshots = list_snapshots()
+            legacy = await asyncio.to_thread(list_legacy_snapshots)
+            keep = select_retained(snapshots + legacy)
+            for i, name in enumerate(snapshots):
+                if name not in keep:
+                    try:
+                        os.remove(os.path.join(SNAPSHOTS_DIR, f"{name}.json"))
+                        removed_snapshots += 1
+                    except OSError as e:
+                        print(f"[persist.py] Fehler beim Löschen von Snapshot {name}: {e}")
+                if i % PRUNE_BATCH == PRUNE_BATCH - 1:
+                    await asyncio.sleep(0)
+            for name in legacy:
+                if name not in keep:
+                    await asyncio.to_thread(shutil.rmtree, os.path.join(BACKUP_ROOT, name), True)
+                    removed_snapshots += 1
+
+            # Referenzierte Hashes aus allen verbliebenen Manifesten sammeln
+            referenced = set()
+            for i, name in enumerate(list_snapshots()):
+                manifest = await read_manifest(name)
+                if manifest is None:
+                    # Unlesbares Manifest → lieber nichts löschen als Objekte verlieren
+                    return removed_snapshots, 0
+                referenced.update(info["sha256"] for info in manifest.get("files", {}).values())
+                if i % PRUNE_BATCH == PRUNE_BATCH - 1:
+                    await asyncio.sleep(0)
+
+            removed_objects = 0
+            if os.path.isdir(OBJECTS_DIR):
+                for prefix in sorted(os.listdir(OBJECTS_DIR)):
+                    prefix_dir = os.path.join(OBJECTS_DIR, prefix)
+                    orphans = [
+                        d for d in await asyncio.to_thread(os.listdir, prefix_dir)
+                        if d not in referenced
+                    ]
+                    for digest in orphans:
+                        try:
+                            os.remove(os.path.join(prefix_dir, digest))
+                            removed_objects += 1
+                        except OSError as e:
+                            print(f"[persist.py] Fehler beim Löschen von Objekt {digest}: {e}")
+                    await asyncio.sleep(0)
+            # Stat-Cache darf nicht auf gelöschte Objekte zeigen
+            self._hash_cache = {k: v for k, v in self._hash_cache.items() if v[2] in referenced}
+            return removed_snapshots, removed_objects
 
     # -------------- Commands --------------
 
@@ -86,63 +339,66 @@ class PersistCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def backup_now(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-
-        timestamp = get_timestamp()
-        backup_dir = os.path.join(BACKUP_ROOT, timestamp)
-        await ensure_dir(backup_dir)
-
-        copied = 0
-        missing = []
-        for fname in DATA_FILES:
-            src = os.path.join(PERSIST_PATH, fname)
-            dst = os.path.join(backup_dir, fname)
-            if os.path.exists(src):
-                await utils.atomic_copy(src, dst)
-                copied += 1
-            else:
-                missing.append(fname)
-
-        # Optional: aktuelles Set als "latest" zusätzlich kopieren (direkt im root)
-        for fname in DATA_FILES:
-            src = os.path.join(PERSIST_PATH, fname)
-            dst = os.path.join(BACKUP_ROOT, fname)
-            if os.path.exists(src):
-                await utils.atomic_copy(src, dst)
-
+        name, copied, missing = await self.create_snapshot()
         await utils.send_success(
             interaction,
-            text=f"Backup abgeschlossen: **{copied}** Dateien gesichert (`{timestamp}`)\n{'⚠️ Folgende Dateien fehlten: ' + ', '.join(missing) if missing else ''}"
+            text=f"Backup abgeschlossen: **{copied}** Dateien gesichert (`{name}`)\n{'⚠️ Folgende Dateien fehlten: ' + ', '.join(missing) if missing else ''}"
         )
-        await self.log_action(f"Backup durchgeführt ({copied} Dateien, {timestamp}).")
+        await self.log_action(f"Backup durchgeführt ({copied} Dateien, {name}).")
+        await self.prune_backups()
 
     @app_commands.command(
         name="restorenow",
-        description="Stellt alle Daten aus dem letzten Backup wieder her (Admin-Only, überschreibt alles!)."
+        description="Stellt alle Daten aus einem Backup wieder her (Standard: letztes, Admin-Only, überschreibt alles!)."
     )
+    @app_commands.describe(snapshot="Snapshot (Timestamp), leer = neuester")
     @app_commands.guilds(MY_GUILD)
-    async def restore_now(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+    async def restore_now(self, interaction: Interaction, snapshot: str = None):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-
-        copied = 0
-        missing = []
-        for fname in DATA_FILES:
-            src = os.path.join(BACKUP_ROOT, fname)
-            dst = os.path.join(PERSIST_PATH, fname)
-            if os.path.exists(src):
-                await utils.atomic_copy(src, dst)
-                copied += 1
-            else:
-                missing.append(fname)
+        if snapshot and snapshot not in list_snapshots():
+            return await utils.send_error(interaction, f"Snapshot `{snapshot}` existiert nicht.")
+        copied, missing, name = await self.restore_snapshot(snapshot)
         await utils.send_ephemeral(
             interaction,
-            text=f"Restore abgeschlossen: **{copied}** Dateien wiederhergestellt.\n{'⚠️ Folgende Dateien fehlen im Backup: ' + ', '.join(missing) if missing else ''}\n\n**Bot-Neustart empfohlen!**",
+            text=f"Restore abgeschlossen (`{name or 'Legacy-Backup'}`): **{copied}** Dateien wiederhergestellt.\n{'⚠️ Folgende Dateien fehlen im Backup: ' + ', '.join(missing) if missing else ''}\n\n**Bot-Neustart empfohlen!**",
             emoji="♻️",
             color=discord.Color.blurple()
         )
-        await self.log_action(f"Restore durchgeführt ({copied} Dateien). Neustart empfohlen.")
+        await self.log_action(f"Restore durchgeführt ({copied} Dateien, {name or 'Legacy-Backup'}). Neustart empfohlen.")
+
+    @restore_now.autocomplete("snapshot")
+    async def restore_snapshot_autocomplete(self, interaction: Interaction, current: str):
+        names = [n for n in reversed(list_snapshots()) if n.startswith(current)]
+        return [app_commands.Choice(name=n, value=n) for n in names[:25]]
+
+    @app_commands.command(
+        name="backupstatus",
+        description="Zeigt Anzahl, Größe und Zeitraum der vorhandenen Backups (Admin-Only)."
+    )
+    @app_commands.guilds(MY_GUILD)
+    async def backup_status(self, interaction: Interaction):
+        if not utils.is_authorized(interaction):
+            return await utils.send_permission_denied(interaction)
+        snapshots = sorted(list_snapshots() + await asyncio.to_thread(list_legacy_snapshots))
+        total_bytes = await asyncio.to_thread(dir_size, BACKUP_ROOT)
+        if snapshots:
+            span = f"**Ältester:** `{snapshots[0]}`\n**Neuester:** `{snapshots[-1]}`"
+        else:
+            span = "Noch keine Backups vorhanden."
+        await utils.send_ephemeral(
+            interaction,
+            text=(
+                f"**Snapshots:** {len(snapshots)}\n"
+                f"**Gesamtgröße:** {total_bytes / 1024 / 1024:.2f} MB\n"
+                f"{span}\n"
+                f"**Aufbewahrung:** {BACKUP_KEEP_HOURS}h komplett, {BACKUP_KEEP_DAILY} Tage täglich, {BACKUP_KEEP_WEEKLY} Wochen wöchentlich"
+            ),
+            emoji="🗂️",
+            color=discord.Color.blurple()
+        )
 
     @app_commands.command(
         name="persistlogchannel",
@@ -150,11 +406,35 @@ class PersistCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def set_log_channel(self, interaction: Interaction, channel: discord.TextChannel):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         await utils.save_json(LOG_CHANNEL_PATH, {"log_channel_id": channel.id})
         await utils.send_success(interaction, f"Persistenz-Log-Channel gesetzt: {channel.mention}")
 
+    @app_commands.command(
+        name="persiststats",
+        description="Zeigt Statistiken zu Schreibvorgängen der Persistenz (Admin-Only)."
+    )
+    @app_commands.guilds(MY_GUILD)
+    async def persist_stats(self, interaction: Interaction):
+        if not utils.is_authorized(interaction):
+            return await utils.send_permission_denied(interaction)
+        stats = utils.get_write_stats()
+        mode = f"Write-Behind ({utils.FLUSH_INTERVAL:g}s)" if utils.WRITE_BEHIND else "Write-Through"
+        await utils.send_ephemeral(
+            interaction,
+            text=(
+                f"**Persistenz-Modus:** {mode}\n"
+                f"**Schreibvorgänge angefordert:** {stats['requested']}\n"
+                f"**Tatsächlich geschrieben:** {stats['performed']}\n"
+                f"**Zusammengefasst:** {stats['coalesced']}\n"
+                f"**Noch offen:** {stats['pending']}\n"
+                f"**Journal:** {stats['journal']} ({stats['journal_records']} Einträge, {stats['journal_fsyncs']} fsyncs)"
+            ),
+            emoji="💾",
+            color=discord.Color.blurple()
+        )
+
     # -------------- Automatisches Backup --------------
 
     @tasks.loop(hours=4)
@@ -166,24 +446,12 @@ class PersistCog(commands.Cog):
         await self.bot.wait_until_ready()
 
     async def backup_task(self):
-        timestamp = get_timestamp()
-        backup_dir = os.path.join(BACKUP_ROOT, timestamp)
-        await ensure_dir(backup_dir)
-        copied = 0
-        for fname in DATA_FILES:
-            src = os.path.join(PERSIST_PATH, fname)
-            dst = os.path.join(backup_dir, fname)
-            if os.path.exists(src):
-                await utils.atomic_copy(src, dst)
-                copied += 1
-        # Aktuelles Set als "latest" kopieren
-        for fname in DATA_FILES:
-            src = os.path.join(PERSIST_PATH, fname)
-            dst = os.path.join(BACKUP_ROOT, fname)
-            if os.path.exists(src):
-                await utils.atomic_copy(src, dst)
+        name, copied, _ = await self.create_snapshot()
         # Optional Log-Channel-Info
-        await self.log_action(f"Automatisches Backup ({copied} Dateien, {timestamp}).")
+        await self.log_action(f"Automatisches Backup ({copied} Dateien, {name}).")
+        removed_snapshots, removed_objects = await self.prune_backups()
+        if removed_snapshots or removed_objects:
+            await self.log_action(f"Aufräumen: {removed_snapshots} Snapshots, {removed_objects} Objekte entfernt.")
 
     # -------------- Logging-Helper --------------
 
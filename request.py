@@ -51,13 +51,18 @@ async def get_request_config():
     return await utils.load_json(REQUEST_CONFIG_PATH, {})
 
 async def save_request_config(data):
-    await utils.save_json(REQUEST_CONFIG_PATH, data)
+    async with utils.json_transaction(REQUEST_CONFIG_PATH, {}) as tx:
+        tx.data = data
 
 async def get_leads():
     return await utils.load_json(REQUEST_LEADS_PATH, {"custom": [], "ai": [], "wunsch": [], "script": []})
 
+def edit_leads():
+    return utils.json_transaction(REQUEST_LEADS_PATH, {"custom": [], "ai": [], "wunsch": [], "script": []})
+
 async def save_leads(data):
-    await utils.save_json(REQUEST_LEADS_PATH, data)
+    async with utils.json_transaction(REQUEST_LEADS_PATH, {"custom": [], "ai": [], "wunsch": [], "script": []}) as tx:
+        tx.data = data
 
 def build_embed(data, status="offen"):
     color = STATUS_COLORS.get(status, discord.Color.blurple())
@@ -275,27 +280,25 @@ class RequestCog(commands.Cog):
     @app_commands.command(name="requestsetactive", description="Setzt das Forum für aktive Anfragen.")
     @app_commands.guilds(MY_GUILD)
     async def requestsetactive(self, interaction: Interaction, channel: discord.ForumChannel):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        config = await get_request_config()
-        config["active_forum"] = channel.id
-        await save_request_config(config)
+        async with utils.json_transaction(REQUEST_CONFIG_PATH, {}) as tx:
+            tx.data["active_forum"] = channel.id
         await utils.send_success(interaction, f"Aktive Requests-Forum gesetzt: {channel.mention}")
 
     @app_commands.command(name="requestsetdone", description="Setzt das Forum für erledigte Anfragen.")
     @app_commands.guilds(MY_GUILD)
     async def requestsetdone(self, interaction: Interaction, channel: discord.ForumChannel):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        config = await get_request_config()
-        config["done_forum"] = channel.id
-        await save_request_config(config)
+        async with utils.json_transaction(REQUEST_CONFIG_PATH, {}) as tx:
+            tx.data["done_forum"] = channel.id
         await utils.send_success(interaction, f"Done-Forum gesetzt: {channel.mention}")
 
     @app_commands.command(name="requestmain", description="Postet das Anfrage-Menü")
     @app_commands.guilds(MY_GUILD)
     async def requestmain(self, interaction: Interaction, channel: discord.TextChannel):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         embed = discord.Embed(
             title="📩 Anfrage-System",
@@ -310,89 +313,81 @@ class RequestCog(commands.Cog):
     @app_commands.command(name="requestcustomlead", description="Fügt einen Custom-Lead hinzu.")
     @app_commands.guilds(MY_GUILD)
     async def requestcustomlead(self, interaction: Interaction, user: discord.User):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        leads = await get_leads()
-        if user.id not in leads["custom"]:
-            leads["custom"].append(user.id)
-            await save_leads(leads)
+        async with edit_leads() as tx:
+            if user.id not in tx.data["custom"]:
+                tx.data["custom"].append(user.id)
         await utils.send_success(interaction, f"{user.mention} ist jetzt Custom-Lead.")
 
     @app_commands.command(name="requestcustomremovelead", description="Entfernt einen Custom-Lead.")
     @app_commands.guilds(MY_GUILD)
     async def requestcustomremovelead(self, interaction: Interaction, user: discord.User):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        leads = await get_leads()
-        if user.id in leads["custom"]:
-            leads["custom"].remove(user.id)
-            await save_leads(leads)
+        async with edit_leads() as tx:
+            if user.id in tx.data["custom"]:
+                tx.data["custom"].remove(user.id)
         await utils.send_success(interaction, f"{user.mention} wurde als Custom-Lead entfernt.")
 
     @app_commands.command(name="requestailead", description="Fügt einen AI-Lead hinzu.")
     @app_commands.guilds(MY_GUILD)
     async def requestailead(self, interaction: Interaction, user: discord.User):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        leads = await get_leads()
-        if user.id not in leads["ai"]:
-            leads["ai"].append(user.id)
-            await save_leads(leads)
+        async with edit_leads() as tx:
+            if user.id not in tx.data["ai"]:
+                tx.data["ai"].append(user.id)
         await utils.send_success(interaction, f"{user.mention} ist jetzt AI-Lead.")
 
     @app_commands.command(name="requestairemovelead", description="Entfernt einen AI-Lead.")
     @app_commands.guilds(MY_GUILD)
     async def requestairemovelead(self, interaction: Interaction, user: discord.User):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        leads = await get_leads()
-        if user.id in leads["ai"]:
-            leads["ai"].remove(user.id)
-            await save_leads(leads)
+        async with edit_leads() as tx:
+            if user.id in tx.data["ai"]:
+                tx.data["ai"].remove(user.id)
         await utils.send_success(interaction, f"{user.mention} wurde als AI-Lead entfernt.")
 
     @app_commands.command(name="requestwunschlead", description="Fügt einen Wunsch-Lead hinzu.")
     @app_commands.guilds(MY_GUILD)
     async def requestwunschlead(self, interaction: Interaction, user: discord.User):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        leads = await get_leads()
-        if user.id not in leads["wunsch"]:
-            leads["wunsch"].append(user.id)
-            await save_leads(leads)
+        async with edit_leads() as tx:
+            if user.id not in tx.data["wunsch"]:
+                tx.data["wunsch"].append(user.id)
         await utils.send_success(interaction, f"{user.mention} ist jetzt Wunsch-Lead.")
 
     @app_commands.command(name="requestwunschremovelead", description="Entfernt einen Wunsch-Lead.")
     @app_commands.guilds(MY_GUILD)
     async def requestwunschremovelead(self, interaction: Interaction, user: discord.User):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        leads = await get_leads()
-        if user.id in leads["wunsch"]:
-            leads["wunsch"].remove(user.id)
-            await save_leads(leads)
+        async with edit_leads() as tx:
+            if user.id in tx.data["wunsch"]:
+                tx.data["wunsch"].remove(user.id)
         await utils.send_success(interaction, f"{user.mention} wurde als Wunsch-Lead entfernt.")
 
     @app_commands.command(name="requestscriptlead", description="Fügt einen Script-Lead hinzu.")
     @app_commands.guilds(MY_GUILD)
     async def requestscriptlead(self, interaction: Interaction, user: discord.User):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        leads = await get_leads()
-        if user.id not in leads["script"]:
-            leads["script"].append(user.id)
-            await save_leads(leads)
+        async with edit_leads() as tx:
+            if user.id not in tx.data["script"]:
+                tx.data["script"].append(user.id)
         await utils.send_success(interaction, f"{user.mention} ist jetzt Script-Lead.")
 
     @app_commands.command(name="requestscriptremovelead", description="Entfernt einen Script-Lead.")
     @app_commands.guilds(MY_GUILD)
     async def requestscriptremovelead(self, interaction: Interaction, user: discord.User):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        leads = await get_leads()
-        if user.id in leads["script"]:
-            leads["script"].remove(user.id)
-            await save_leads(leads)
+        async with edit_leads() as tx:
+            if user.id in tx.data["script"]:
+                tx.data["script"].remove(user.id)
         await utils.send_success(interaction, f"{user.mention} wurde als Script-Lead entfernt.")
 
     # ======= Haupt-Request-Posting (inkl. Script-Typ & Titelstruktur) =======
@@ -779,7 +774,7 @@ class StatusEditButton(discord.ui.Button):
         allowed_leads = []
         if reqtype in leads:
             allowed_leads = leads[reqtype]
-        if interaction.user.id not in allowed_leads and not utils.is_admin(interaction.user):
+        if interaction.user.id not in allowed_leads and not utils.is_authorized(interaction):
             return await utils.send_error(interaction, "Nur der zuständige Lead oder Admin kann den Status ändern!")
         await interaction.response.send_message(
             "Wähle den neuen Status:",
@@ -889,7 +884,7 @@ class CloseRequestButton(discord.ui.Button):
         leads = await get_leads()
         reqtype = self.data['type']
         allowed_leads = leads[reqtype] if reqtype in leads else []
-        if interaction.user.id not in allowed_leads and not utils.is_admin(interaction.user) and interaction.user.id != self.data["erstellerid"]:
+        if interaction.user.id not in allowed_leads and not utils.is_authorized(interaction) and interaction.user.id != self.data["erstellerid"]:
             return await utils.send_error(interaction, "Nur der zuständige Lead, Admin oder Anfragesteller darf schließen!")
         config = await get_request_config()
         done_forum_id = config.get("done_forum")
@@ -967,7 +962,7 @@ class LeadActionsDropdown(discord.ui.Select):
         self.lead = lead
 
     async def callback(self, interaction: Interaction):
-        if interaction.user.id != self.lead.id and not utils.is_admin(interaction.user):
+        if interaction.user.id != self.lead.id and not utils.is_authorized(interaction):
             return await interaction.response.send_message("Nur du als Lead oder Admin kannst den Status ändern!", ephemeral=True)
         new_status = self.values[0]
         if new_status in ("abgelehnt", "uploaded", "done"):
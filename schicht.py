@@ -3,11 +3,15 @@ from discord import app_commands, Interaction
 from discord.ext import commands
 import os
 import utils
+import permissions
 import asyncio
 
 GUILD_ID = int(os.environ.get("GUILD_ID", "0"))
 MY_GUILD = discord.Object(id=GUILD_ID)
 SCHICHT_CONFIG_PATH = os.path.join("persistent_data", "schicht_config.json")
+SCHICHT_SCOPE = "schicht:uebergabe"
+
+permissions.ENGINE.register_source(SCHICHT_CONFIG_PATH, {}, lambda cfg: {SCHICHT_SCOPE: cfg.get("roles", [])})
 
 class SchichtCog(commands.Cog):
     def __init__(self, bot):
@@ -15,8 +19,8 @@ class SchichtCog(commands.Cog):
 
     # ===== Helper =====
 
-    async def get_config(self):
-        cfg = await utils.load_json(SCHICHT_CONFIG_PATH, {})
+    @staticmethod
+    def apply_defaults(cfg):
         if "roles" not in cfg:
             cfg["roles"] = []
         if "voice_channel_id" not in cfg:
@@ -29,12 +33,19 @@ class SchichtCog(commands.Cog):
             cfg["schicht_group_roles"] = []
         return cfg
 
+    async def get_config(self):
+        return self.apply_defaults(await utils.load_json(SCHICHT_CONFIG_PATH, {}))
+
+    def edit_config(self):
+        """Read-Modify-Write der Config unter dem Dokument-Lock (utils.json_transaction)."""
+        return utils.json_transaction(SCHICHT_CONFIG_PATH, {})
+
     async def save_config(self, config):
-        await utils.save_json(SCHICHT_CONFIG_PATH, config)
+        async with utils.json_transaction(SCHICHT_CONFIG_PATH, {}) as tx:
+            tx.data = config
 
     async def is_allowed(self, member: discord.Member):
-        cfg = await self.get_config()
-        return utils.is_admin(member) or utils.has_any_role(member, cfg.get("roles", []))
+        return utils.is_admin(member) or await permissions.ENGINE.allowed(member, SCHICHT_SCOPE)
 
     async def is_in_group(self, member: discord.Member):
         cfg = await self.get_config()
@@ -70,7 +81,7 @@ class SchichtCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def schichtmain(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         embed = discord.Embed(
             title="👮‍♂️ Schichtübergabe – Hinweise",
@@ -103,7 +114,7 @@ class SchichtCog(commands.Cog):
         guild = interaction.guild
 
         # Rechte-Check
-        if not await self.is_allowed(initiator):
+        if not (utils.is_authorized(interaction) or await self.is_allowed(initiator)):
             return await utils.send_permission_denied(interaction)
 
         # Nur Schichtgruppenmitglieder auswählbar (User oder Rolle)
@@ -163,12 +174,12 @@ class SchichtCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def schichtsetrolle(self, interaction: Interaction, role: discord.Role):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        cfg = await self.get_config()
-        if role.id not in cfg.get("roles", []):
-            cfg["roles"].append(role.id)
-            await self.save_config(cfg)
+        async with self.edit_config() as tx:
+            cfg = self.apply_defaults(tx.data)
+            if role.id not in cfg["roles"]:
+                cfg["roles"].append(role.id)
         await utils.send_success(interaction, f"Rolle {role.mention} darf nun Schichtübergaben durchführen.")
 
     @app_commands.command(
@@ -177,12 +188,12 @@ class SchichtCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def schichtremoverolle(self, interaction: Interaction, role: discord.Role):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        cfg = await self.get_config()
-        if role.id in cfg.get("roles", []):
-            cfg["roles"].remove(role.id)
-            await self.save_config(cfg)
+        async with self.edit_config() as tx:
+            cfg = self.apply_defaults(tx.data)
+            if role.id in cfg["roles"]:
+                cfg["roles"].remove(role.id)
         await utils.send_success(interaction, f"Rolle {role.mention} entfernt.")
 
     @app_commands.command(
@@ -191,11 +202,10 @@ class SchichtCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def schichtsetvoice(self, interaction: Interaction, channel: discord.VoiceChannel):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        cfg = await self.get_config()
-        cfg["voice_channel_id"] = channel.id
-        await self.save_config(cfg)
+        async with self.edit_config() as tx:
+            self.apply_defaults(tx.data)["voice_channel_id"] = channel.id
         await utils.send_success(interaction, f"Voice-Channel für Übergaben gesetzt: {channel.mention}")
 
     @app_commands.command(
@@ -204,11 +214,10 @@ class SchichtCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def schichtsetlog(self, interaction: Interaction, channel: discord.TextChannel):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        cfg = await self.get_config()
-        cfg["log_channel_id"] = channel.id
-        await self.save_config(cfg)
+        async with self.edit_config() as tx:
+            self.apply_defaults(tx.data)["log_channel_id"] = channel.id
         await utils.send_success(interaction, f"Log-Channel gesetzt: {channel.mention}")
 
     @app_commands.command(
@@ -245,20 +254,21 @@ class SchichtCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def schichtgroup(self, interaction: Interaction, target: discord.Member | discord.Role):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        cfg = await self.get_config()
+        key = "schicht_group_users" if isinstance(target, discord.Member) else "schicht_group_roles"
+        async with self.edit_config() as tx:
+            cfg = self.apply_defaults(tx.data)
+            added = target.id not in cfg[key]
+            if added:
+                cfg[key].append(target.id)
         if isinstance(target, discord.Member):
-            if target.id not in cfg.get("schicht_group_users", []):
-                cfg["schicht_group_users"].append(target.id)
-                await self.save_config(cfg)
+            if added:
                 await utils.send_success(interaction, f"{target.mention} ist jetzt Mitglied der Schichtgruppe.")
             else:
                 await utils.send_error(interaction, f"{target.mention} ist bereits Mitglied der Schichtgruppe.")
         elif isinstance(target, discord.Role):
-            if target.id not in cfg.get("schicht_group_roles", []):
-                cfg["schicht_group_roles"].append(target.id)
-                await self.save_config(cfg)
+            if added:
                 await utils.send_success(interaction, f"Rolle {target.mention} ist jetzt Schichtgruppe (alle mit der Rolle).")
             else:
                 await utils.send_error(interaction, f"Rolle {target.mention} ist bereits Schichtgruppe.")
@@ -269,20 +279,21 @@ class SchichtCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def schichtgroupremove(self, interaction: Interaction, target: discord.Member | discord.Role):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        cfg = await self.get_config()
+        key = "schicht_group_users" if isinstance(target, discord.Member) else "schicht_group_roles"
+        async with self.edit_config() as tx:
+            cfg = self.apply_defaults(tx.data)
+            removed = target.id in cfg[key]
+            if removed:
+                cfg[key].remove(target.id)
         if isinstance(target, discord.Member):
-            if target.id in cfg.get("schicht_group_users", []):
-                cfg["schicht_group_users"].remove(target.id)
-                await self.save_config(cfg)
+            if removed:
                 await utils.send_success(interaction, f"{target.mention} wurde aus der Schichtgruppe entfernt.")
             else:
                 await utils.send_error(interaction, f"{target.mention} ist nicht in der Schichtgruppe.")
         elif isinstance(target, discord.Role):
-            if target.id in cfg.get("schicht_group_roles", []):
-                cfg["schicht_group_roles"].remove(target.id)
-                await self.save_config(cfg)
+            if removed:
                 await utils.send_success(interaction, f"Rolle {target.mention} wurde aus der Schichtgruppe entfernt.")
             else:
                 await utils.send_error(interaction, f"Rolle {target.mention} ist nicht in der Schichtgruppe.")
@@ -27,7 +27,8 @@ class SetupBotCog(commands.Cog):
         return await utils.load_json(SETUP_CONFIG_PATH, {})
 
     async def save_setup_config(self, config):
-        await utils.save_json(SETUP_CONFIG_PATH, config)
+        async with utils.json_transaction(SETUP_CONFIG_PATH, {}) as tx:
+            tx.data = config
 
     async def call_reload_menu(self, system_key: str, channel_id: int):
         """Ruft die reload_menu-Funktion des jeweiligen Systems auf (falls vorhanden)."""
@@ -46,7 +47,7 @@ class SetupBotCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def start_setup(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         await utils.send_ephemeral(interaction, "Geführtes Setup wird gestartet! Bitte beantworte alle Fragen zügig. Tippe 'abbrechen', um das Setup zu beenden.", emoji="⚙️")
         config = {}
@@ -83,7 +84,7 @@ class SetupBotCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def refresh_posts(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         config = await self.get_setup_config()
         posted = 0
@@ -99,7 +100,7 @@ class SetupBotCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def setup_status(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         config = await self.get_setup_config()
         lines = []
@@ -125,11 +126,10 @@ class SetupBotCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def start_use(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        config = await self.get_setup_config()
-        config["setup_complete"] = True
-        await self.save_setup_config(config)
+        async with utils.json_transaction(SETUP_CONFIG_PATH, {}) as tx:
+            tx.data["setup_complete"] = True
         await utils.send_success(interaction, "Bot ist jetzt im Produktivmodus! (setup_complete: true)")
 
 # ===== Cog-Setup =====
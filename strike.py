@@ -3,6 +3,7 @@ from discord import app_commands, Interaction
 from discord.ext import commands
 import os
 import utils
+import permissions
 from datetime import datetime
 
 GUILD_ID = int(os.environ.get("GUILD_ID", "0"))
@@ -14,6 +15,9 @@ STRIKE_LOG_PATH = os.path.join("persistent_data", "strike_log_channel.json")
 PROPS_DATA_PATH = os.path.join("persistent_data", "props_data.json")
 PROPS_LIST_PATH = os.path.join("persistent_data", "props_list.json")
 PROPS_LOG_PATH = os.path.join("persistent_data", "props_log_channel.json")
+STRIKE_MOD_SCOPE = "strike:mod"
+
+permissions.ENGINE.register_source(STRIKE_ROLES_PATH, [], lambda roles: {STRIKE_MOD_SCOPE: roles})
 
 class StrikeModal(discord.ui.Modal, title="Strike vergeben"):
     grund = discord.ui.TextInput(label="Grund für den Strike", style=discord.TextStyle.long, required=True)
@@ -116,13 +120,15 @@ class StrikeCog(commands.Cog):
         return await utils.load_json(STRIKE_DATA_PATH, {})
 
     async def save_strike_data(self, data):
-        await utils.save_json(STRIKE_DATA_PATH, data)
+        async with utils.json_transaction(STRIKE_DATA_PATH, {}) as tx:
+            tx.data = data
 
     async def get_strike_roles(self):
         return await utils.load_json(STRIKE_ROLES_PATH, [])
 
     async def save_strike_roles(self, data):
-        await utils.save_json(STRIKE_ROLES_PATH, data)
+        async with utils.json_transaction(STRIKE_ROLES_PATH, []) as tx:
+            tx.data = data
 
     async def get_strike_autorole(self):
         return await utils.load_json(STRIKE_AUTOROLE_PATH, None)
@@ -141,15 +147,15 @@ class StrikeCog(commands.Cog):
     async def is_strike_mod(self, member: discord.Member):
         if utils.is_admin(member):
             return True
-        roles = await self.get_strike_roles()
-        return utils.has_any_role(member, roles)
+        return await permissions.ENGINE.allowed(member, STRIKE_MOD_SCOPE)
 
     # ========== PROPS ==========
     async def get_props_data(self):
         return await utils.load_json(PROPS_DATA_PATH, {})
 
     async def save_props_data(self, data):
-        await utils.save_json(PROPS_DATA_PATH, data)
+        async with utils.json_transaction(PROPS_DATA_PATH, {}) as tx:
+            tx.data = data
 
     async def get_props_list_channel(self, guild):
         cid = await utils.load_json(PROPS_LIST_PATH, None)
@@ -169,7 +175,7 @@ class StrikeCog(commands.Cog):
     )
     @app_commands.guilds(GUILD_ID)
     async def strikemain(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         embed = discord.Embed(
             title="🛑 Strike System – Vergabe von Strikes & Props",
@@ -207,7 +213,7 @@ class StrikeCog(commands.Cog):
     )
     @app_commands.guilds(GUILD_ID)
     async def strikegive(self, interaction: Interaction, user: discord.Member):
-        if not await self.is_strike_mod(interaction.user):
+        if not (utils.is_authorized(interaction) or await self.is_strike_mod(interaction.user)):
             return await utils.send_permission_denied(interaction)
         async def after_modal(modal_interaction, grund, bild):
             await self.add_strike(user, grund, bild, by_user=interaction.user)
@@ -255,15 +261,14 @@ class StrikeCog(commands.Cog):
         await interaction.response.send_modal(StrikeModal(after_modal))
 
     async def add_strike(self, user: discord.Member, grund, bild, by_user=None):
-        data = await self.get_strike_data()
         s = {
             "grund": grund,
             "bild": bild,
             "zeit": datetime.now().strftime("%Y-%m-%d %H:%M"),
             "von": str(by_user.id) if by_user else None
         }
-        data.setdefault(str(user.id), []).append(s)
-        await self.save_strike_data(data)
+        async with utils.json_transaction(STRIKE_DATA_PATH, {}) as tx:
+            tx.data.setdefault(str(user.id), []).append(s)
 
     async def check_autorole(self, user: discord.Member, guild):
         data = await self.get_strike_data()
@@ -355,7 +360,7 @@ class StrikeCog(commands.Cog):
     )
     @app_commands.guilds(GUILD_ID)
     async def strikelist(self, interaction: Interaction, channel: discord.TextChannel):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         await utils.save_json(STRIKE_LIST_PATH, channel.id)
         await self.post_strike_log(interaction.guild)
@@ -367,7 +372,7 @@ class StrikeCog(commands.Cog):
     )
     @app_commands.guilds(GUILD_ID)
     async def strikeremove(self, interaction: Interaction, user: discord.Member):
-        if not await self.is_strike_mod(interaction.user):
+        if not (utils.is_authorized(interaction) or await self.is_strike_mod(interaction.user)):
             return await utils.send_permission_denied(interaction)
         data = await self.get_strike_data()
         strikes = data.get(str(user.id), [])
@@ -384,13 +389,13 @@ class StrikeCog(commands.Cog):
         await self.save_strike_log(interaction.guild, interaction.user, user, grund, bild, action="removed")
 
     async def remove_last_strike(self, user: discord.Member):
-        data = await self.get_strike_data()
         uid = str(user.id)
-        if uid in data and data[uid]:
-            data[uid].pop()
-            if not data[uid]:
-                del data[uid]
-            await self.save_strike_data(data)
+        async with utils.json_transaction(STRIKE_DATA_PATH, {}) as tx:
+            data = tx.data
+            if uid in data and data[uid]:
+                data[uid].pop()
+                if not data[uid]:
+                    del data[uid]
 
     @app_commands.command(
         name="strikedelete",
@@ -398,18 +403,16 @@ class StrikeCog(commands.Cog):
     )
     @app_commands.guilds(GUILD_ID)
     async def strikedelete(self, interaction: Interaction, user: discord.Member):
-        if not await self.is_strike_mod(interaction.user):
+        if not (utils.is_authorized(interaction) or await self.is_strike_mod(interaction.user)):
             return await utils.send_permission_denied(interaction)
         await self.delete_all_strikes(user)
         await utils.send_success(interaction, f"Alle Strikes für {user.mention} entfernt.")
         await self.post_strike_log(interaction.guild)
 
     async def delete_all_strikes(self, user: discord.Member):
-        data = await self.get_strike_data()
         uid = str(user.id)
-        if uid in data:
-            del data[uid]
-            await self.save_strike_data(data)
+        async with utils.json_transaction(STRIKE_DATA_PATH, {}) as tx:
+            tx.data.pop(uid, None)
 
     @app_commands.command(
         name="strikerole",
@@ -417,12 +420,11 @@ class StrikeCog(commands.Cog):
     )
     @app_commands.guilds(GUILD_ID)
     async def strikerole(self, interaction: Interaction, role: discord.Role):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        roles = await self.get_strike_roles()
-        if role.id not in roles:
-            roles.append(role.id)
-            await self.save_strike_roles(roles)
+        async with utils.json_transaction(STRIKE_ROLES_PATH, []) as tx:
+            if role.id not in tx.data:
+                tx.data.append(role.id)
         await utils.send_success(interaction, f"Rolle {role.mention} darf jetzt Strikes vergeben.")
 
     @app_commands.command(
@@ -431,12 +433,11 @@ class StrikeCog(commands.Cog):
     )
     @app_commands.guilds(GUILD_ID)
     async def strikerole_remove(self, interaction: Interaction, role: discord.Role):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        roles = await self.get_strike_roles()
-        if role.id in roles:
-            roles.remove(role.id)
-            await self.save_strike_roles(roles)
+        async with utils.json_transaction(STRIKE_ROLES_PATH, []) as tx:
+            if role.id in tx.data:
+                tx.data.remove(role.id)
         await utils.send_success(interaction, f"Rolle {role.mention} entfernt.")
 
     @app_commands.command(
@@ -445,7 +446,7 @@ class StrikeCog(commands.Cog):
     )
     @app_commands.guilds(GUILD_ID)
     async def strikeaddrole(self, interaction: Interaction, role: discord.Role):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         await self.save_strike_autorole(role.id)
         await utils.send_success(interaction, f"Auto-Role bei 3 Strikes ist jetzt {role.mention}.")
@@ -456,7 +457,7 @@ class StrikeCog(commands.Cog):
     )
     @app_commands.guilds(GUILD_ID)
     async def strikeaddrole_remove(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         await self.save_strike_autorole(None)
         await utils.send_success(interaction, f"Auto-Role bei 3 Strikes entfernt.")
@@ -467,7 +468,7 @@ class StrikeCog(commands.Cog):
     )
     @app_commands.guilds(GUILD_ID)
     async def strikelog(self, interaction: Interaction, channel: discord.TextChannel):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         await utils.save_json(STRIKE_LOG_PATH, channel.id)
         await utils.send_success(interaction, f"Strike-Log-Channel gesetzt: {channel.mention}")
@@ -478,7 +479,7 @@ class StrikeCog(commands.Cog):
     )
     @app_commands.guilds(GUILD_ID)
     async def strikeclear(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         await self.save_strike_data({})
         await self.post_strike_log(interaction.guild)
@@ -491,17 +492,16 @@ class StrikeCog(commands.Cog):
     )
     @app_commands.guilds(GUILD_ID)
     async def propgive(self, interaction: Interaction, user: discord.Member):
-        if not await self.is_props_mod(interaction.user):
+        if not (utils.is_authorized(interaction) or await self.is_props_mod(interaction.user)):
             return await utils.send_permission_denied(interaction)
         async def after_modal(modal_interaction, beschreibung):
-            data = await self.get_props_data()
             prop_entry = {
                 "beschreibung": beschreibung,
                 "zeit": datetime.now().strftime("%Y-%m-%d %H:%M"),
                 "von": interaction.user.id  # Wer hat props vergeben?
             }
-            data.setdefault(str(user.id), []).append(prop_entry)
-            await self.save_props_data(data)
+            async with utils.json_transaction(PROPS_DATA_PATH, {}) as tx:
+                tx.data.setdefault(str(user.id), []).append(prop_entry)
             await self.post_props_log(interaction.guild)
             await self.save_props_log(interaction.guild, interaction.user, user, beschreibung)
             await utils.send_success(modal_interaction, f"{user.mention} hat einen Prop bekommen!")
@@ -591,7 +591,7 @@ class StrikeCog(commands.Cog):
     )
     @app_commands.guilds(GUILD_ID)
     async def propslist(self, interaction: Interaction, channel: discord.TextChannel):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         await utils.save_json(PROPS_LIST_PATH, channel.id)
         await self.post_props_log(interaction.guild)
@@ -603,7 +603,7 @@ class StrikeCog(commands.Cog):
     )
     @app_commands.guilds(GUILD_ID)
     async def propslog(self, interaction: Interaction, channel: discord.TextChannel):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         await utils.save_json(PROPS_LOG_PATH, channel.id)
         await utils.send_success(interaction, f"Props-Log-Channel gesetzt: {channel.mention}")
@@ -614,15 +614,15 @@ class StrikeCog(commands.Cog):
     )
     @app_commands.guilds(GUILD_ID)
     async def propsremove(self, interaction: Interaction, number: int, user: discord.Member):
-        if not await self.is_props_mod(interaction.user):
+        if not (utils.is_authorized(interaction) or await self.is_props_mod(interaction.user)):
             return await utils.send_permission_denied(interaction)
-        data = await self.get_props_data()
         uid = str(user.id)
-        if uid in data:
-            data[uid] = data[uid][:-number] if number < len(data[uid]) else []
-            if not data[uid]:
-                del data[uid]
-            await self.save_props_data(data)
+        async with utils.json_transaction(PROPS_DATA_PATH, {}) as tx:
+            data = tx.data
+            if uid in data:
+                data[uid] = data[uid][:-number] if number < len(data[uid]) else []
+                if not data[uid]:
+                    del data[uid]
         await self.post_props_log(interaction.guild)
         await utils.send_success(interaction, f"{number} Props für {user.mention} entfernt!")
 
@@ -632,7 +632,7 @@ class StrikeCog(commands.Cog):
     )
     @app_commands.guilds(GUILD_ID)
     async def propsclear(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         await self.save_props_data({})
         await self.post_props_log(interaction.guild)
@@ -0,0 +1,102 @@
+# tests/test_transactions.py
+#
+# Stresstest für utils.json_transaction: viele gleichzeitige add_strike-Aufrufe
+# dürfen keinen Eintrag verlieren, und ein kompletter Reset (strikeclear)
+# während einer offenen Transaktion darf keinen VersionConflict auslösen.
+#
+#   python tests/test_transactions.py [anzahl]     oder     python -m pytest tests/
+#
+# Jeder Test läuft in einem eigenen temporären Verzeichnis (persistent_data/ wird dort angelegt)
+# und mit eigenem Event-Loop (asyncio.run).
+
+import os
+import sys
+import asyncio
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import utils  # noqa: E402
+import strike  # noqa: E402
+
+CONCURRENT = 500
+
+def _reset_utils():
+    """Modulzustand von utils verwerfen: Dokument-/Schreib-Locks sind an den Loop gebunden,
+    in dem sie angelegt wurden, Cache, Versionen, Backend und Journal am alten Verzeichnis."""
+    utils._DOC_LOCKS.clear()
+    utils._WRITE_LOCKS.clear()
+    utils._DOC_VERSIONS.clear()
+    utils.invalidate_cache()
+    if utils._journal is not None and utils._journal._fh is not None:
+        utils._journal._fh.close()
+    utils._journal = None
+    if utils._backend is not None and hasattr(utils._backend, "close"):
+        utils._backend.close()
+    utils._backend = None
+    utils._flush_task = None
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "persistent_data").mkdir()
+    _reset_utils()
+    yield tmp_path
+    _reset_utils()
+
+def _cog():
+    return strike.StrikeCog(bot=None)
+
+async def _add_many(cog, count, users=10):
+    mod = SimpleNamespace(id=1)
+    await asyncio.gather(*(
+        cog.add_strike(SimpleNamespace(id=1000 + i % users), f"Grund {i}", "", by_user=mod)
+        for i in range(count)
+    ))
+
+async def _concurrent_add(count):
+    cog = _cog()
+    await cog.save_strike_data({})
+    await _add_many(cog, count)
+    # Von der Platte zählen, nicht aus dem Dokument-Cache
+    await utils.stop_flusher()
+    utils.invalidate_cache(strike.STRIKE_DATA_PATH)
+    data = await utils.load_json(strike.STRIKE_DATA_PATH, {})
+    return sum(len(v) for v in data.values())
+
+async def _clear_during_transaction(count):
+    cog = _cog()
+    await _add_many(cog, count)
+    # Reset startet, während eine Transaktion offen ist. Er muss auf den Dokument-Lock warten –
+    # ein direktes save_json würde die Version erhöhen und die Transaktion mit VersionConflict scheitern lassen.
+    async with utils.json_transaction(strike.STRIKE_DATA_PATH, {}) as tx:
+        reset = asyncio.ensure_future(cog.save_strike_data({}))
+        await asyncio.sleep(0.05)
+        tx.data.setdefault("42", []).append({"grund": "in Transaktion"})
+    await reset
+    data = await utils.load_json(strike.STRIKE_DATA_PATH, {})
+    await utils.stop_flusher()
+    return sum(len(v) for v in data.values())
+
+def test_concurrent_add_strike():
+    assert asyncio.run(_concurrent_add(CONCURRENT)) == CONCURRENT
+
+def test_clear_during_transaction():
+    # Kein VersionConflict, und der Reset kommt nach der Transaktion
+    assert asyncio.run(_clear_during_transaction(CONCURRENT)) == 0
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else CONCURRENT
+    results = []
+    for scenario in (_concurrent_add, _clear_during_transaction):
+        os.chdir(tempfile.mkdtemp(prefix="allinclusivebot-tx-"))
+        os.makedirs("persistent_data")
+        _reset_utils()
+        results.append(asyncio.run(scenario(count)))
+    print(f"{count} gleichzeitige add_strike → {results[0]} Einträge ({'OK' if results[0] == count else 'VERLOREN'})")
+    print(f"Reset während offener Transaktion → kein VersionConflict, danach {results[1]} Einträge")
+    sys.exit(0 if results == [count, 0] else 1)
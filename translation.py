@@ -2,12 +2,21 @@
 
 import discord
 from discord import app_commands, Interaction
-from discord.ext import commands
+from discord.ext import commands, tasks
 import os
+import json
+import heapq
+import bisect
 import utils
-import openai
 import asyncio
-from datetime import datetime
+import time
+from translation_cache import TranslationCache, cache_key
+from translation_client import TranslationError, get_client
+from language_detect import detect_language
+from translation_history import HistoryIndex, day_key
+from translation_chunks import CHARS_PER_TOKEN, DISCORD_LIMIT, join_chunks, split_chunks, split_message
+from collections import deque
+from datetime import datetime, timedelta
 
 GUILD_ID = int(os.environ.get("GUILD_ID", "0"))
 MY_GUILD = discord.Object(id=GUILD_ID)
@@ -15,12 +24,49 @@ PROFILES_PATH = os.path.join("persistent_data", "profiles.json")
 MENU_PATH = os.path.join("persistent_data", "translator_menu.json")
 CATEGORY_PATH = os.path.join("persistent_data", "trans_category.json")
 PROMPT_PATH = os.path.join("persistent_data", "translator_prompt.json")
-TRANSLATION_LOG_PATH = os.path.join("persistent_data", "translation_log.json")
+TRANSLATION_LOG_PATH = os.path.join("persistent_data", "translation_log.jsonl")
+LEGACY_TRANSLATION_LOG_PATH = os.path.join("persistent_data", "translation_log.json")
+# Aktive Sessions: {channel_id: {"user_id", "profile", "created"}} – überlebt Neustarts
+SESSIONS_PATH = os.path.join("persistent_data", "translation_sessions.json")
+SESSION_PREFIX = "translat-"
+END_SESSION_CUSTOM_ID = "translation:end_session"
+# Profil-Menü: Discord erlaubt max. 25 Optionen pro Select → Seiten à 25
+PROFILE_PAGE_SIZE = 25
+# Discord: SelectOption-value und Autocomplete-value max. 100 Zeichen – der Profilname ist beides
+PROFILE_NAME_LIMIT = 100
+PROFILE_SELECT_CUSTOM_ID = "translation:profile_select"
+MORE_PROFILES_CUSTOM_ID = "translation:more_profiles"
 
-OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
+# Inaktive Sessions automatisch beenden (pro Profil per /translatortimeout überschreibbar, 0 = nie)
+IDLE_MINUTES = float(os.environ.get("TRANSLATION_IDLE_MINUTES", "60"))
+IDLE_WARN_MINUTES = float(os.environ.get("TRANSLATION_IDLE_WARN_MINUTES", "5"))
+TIMEOUTS_PATH = os.path.join("persistent_data", "translation_timeouts.json")
+REAPER_INTERVAL = 30  # Sekunden
+# Letzte Aktivität höchstens so oft (s) in die Registry schreiben – nach Neustart max. so viel zu früh
+ACTIVITY_PERSIST_SECONDS = 60
 
-# Setze OpenAI-Key
-openai.api_key = OPENAI_API_KEY
+# Pool vorbereiteter (versteckter) Channels in der Session-Kategorie:
+# Session-Start = ein Edit (Name/Rechte/Topic) statt Channel anlegen, beendete Sessions werden recycelt.
+POOL_SIZE = int(os.environ.get("TRANSLATION_POOL_SIZE", "3"))  # 0 = aus
+POOL_REFILL_SECONDS = float(os.environ.get("TRANSLATION_POOL_REFILL_SECONDS", "60"))
+POOL_CHANNEL_NAME = "pool-translat"
+POOL_TOPIC = "Vorbereiteter Übersetzungs-Channel (frei)"
+# Bulk-Delete klappt nur für Nachrichten < 14 Tage, ältere Sessions werden gelöscht statt recycelt
+POOL_MAX_SESSION_AGE = timedelta(days=13)
+RECENT_PER_SESSION = 10  # so viele Einträge zeigt end_session
+FIELD_TEXT_LIMIT = 490  # Eingabe/Übersetzung je Embed-Feld (Discord: 1024 pro Feld)
+EMBED_TOTAL_LIMIT = 6000  # Discord: Gesamtlänge eines Embeds
+LOG_TAIL_BYTES = int(os.environ.get("TRANSLATION_LOG_TAIL_BYTES", str(8 * 1024 * 1024)))
+
+# Streaming: Platzhalter sofort posten und während der Antwort fortlaufend editieren
+STREAMING = os.environ.get("TRANSLATION_STREAMING", "0").lower() in ("1", "true", "yes", "on")
+# Mindestabstand zwischen zwei Edits (Discord-Ratelimit: ca. 5 Edits / 5 s pro Channel)
+STREAM_EDIT_INTERVAL = float(os.environ.get("TRANSLATION_STREAM_EDIT_INTERVAL", "1.0"))
+# Vorschau im Platzhalter bleibt mit Codeblock unter dem Nachrichtenlimit, der Rest kommt am Ende gesplittet
+STREAM_PREVIEW_LIMIT = DISCORD_LIMIT - 10
+LATENCY_SAMPLES = 500
+# Nachrichten, die innerhalb dieses Fensters (ms) in einer Session eintreffen, gehen als ein Request raus (0 = aus)
+COALESCE_MS = int(os.environ.get("TRANSLATION_COALESCE_MS", "0"))
 
 # ======= Basis Prompt =======
 BASE_PROMPT = (
@@ -33,52 +79,134 @@ BASE_PROMPT = (
 
 # ====== Hilfsfunktionen =======
 
-def detect_language(text):
-    import re
-    # Sehr simple Heuristik: Viele Umlaute, ß → deutsch, sonst englisch
-    if re.search(r"[äöüÄÖÜß]", text) or re.search(r"\b(der|die|das|und|ich|nicht|mit|für|ist|sind|auf|zu|wie)\b", text, re.I):
-        return "de"
-    if re.search(r"\b(the|and|you|with|for|is|are|on|to|how|in|of|that)\b", text, re.I):
-        return "en"
-    # Default: Wenn überwiegend ASCII → englisch, sonst deutsch
-    if all(ord(c) < 128 for c in text):
-        return "en"
-    return "de"
-
-async def translate_text_gpt(text, stil, prompt_extra):
+def build_system_prompt(text, stil, prompt_extra, lang=None):
+    """lang = erkannte Sprache (language_detect); None = zu unsicher, das Modell entscheidet selbst."""
     system_prompt = BASE_PROMPT
-    # Zielrichtung erkennen
-    lang = detect_language(text)
     if lang == "de":
         system_prompt += " Ziel: Übersetze ins Englisch."
-    else:
+    elif lang == "en":
         system_prompt += " Ziel: Übersetze ins Deutsch."
+    else:
+        system_prompt += " Ziel: Ist der Text deutsch, übersetze ihn auf Englisch, sonst auf Deutsch."
+    if "\n" in text.strip():
+        system_prompt += " Behalte alle Zeilenumbrüche exakt bei."
     # Stil und extra Prompts anhängen (optional)
     if stil:
         system_prompt += f" Stil: {stil}."
     if prompt_extra:
         system_prompt += " Zusatzregeln: " + prompt_extra
+    return system_prompt
+
+def build_messages(text, stil, prompt_extra, lang=None):
+    return [
+        {"role": "system", "content": build_system_prompt(text, stil, prompt_extra, lang)},
+        {"role": "user", "content": text}
+    ]
+
+def max_tokens_for(text):
+    # Antwort darf etwas länger als die Eingabe werden (Deutsch ist länger als Englisch)
+    return max(500, 2 * len(text) // CHARS_PER_TOKEN)
+
+def trim_reply(result, text):
+    """Überflüssige Zeilen abschneiden, falls GPT doch mal was "erklärt" – so viele Zeilen wie die Eingabe."""
+    lines = result.strip().split("\n")
+    return "\n".join(lines[:text.strip().count("\n") + 1])
+
+async def translate_text_gpt(text, stil, prompt_extra, lang=None, on_queued=None):
+    """Übersetzt über den gemeinsamen Client; wirft TranslationError statt Fehlertext zurückzugeben."""
+    result = await get_client().complete(
+        build_messages(text, stil, prompt_extra, lang),
+        max_tokens=max_tokens_for(text),
+        temperature=0.0,  # Immer exakt, kein Rumgespinne
+        on_queued=on_queued
+    )
+    result = (result or "").strip()
+    # Kein Text = Fehler
+    if not result:
+        raise TranslationError("Keine Antwort")
+    return trim_reply(result, text)
+
+async def stream_text_gpt(text, stil, prompt_extra, lang=None, on_queued=None):
+    """Liefert die Übersetzung schrittweise (jeweils den bisherigen Gesamttext)."""
+    result = ""
+    async for delta in get_client().stream(
+        build_messages(text, stil, prompt_extra, lang),
+        max_tokens=max_tokens_for(text),
+        temperature=0.0,
+        on_queued=on_queued
+    ):
+        result += delta
+        yield trim_reply(result, text)
+
+def session_channel_name(profile_name, user):
+    return f"{SESSION_PREFIX}{profile_name.lower()}-{user.name.lower()}"
+
+async def _untranslated(chunk):
+    # Reiner Leerraum zwischen Absätzen – nichts zu übersetzen
+    return chunk, True
 
+async def send_translation(channel, translated):
+    """Übersetzung als Codeblock + Copy-Button, bei > 2000 Zeichen auf mehrere Nachrichten verteilt."""
+    for part in split_message(translated, DISCORD_LIMIT - 6):
+        await channel.send(f"```{part}```", view=CopyView(part))
+
+async def send_translations(channel, translations):
+    """Mehrere Übersetzungen in einer Nachricht (ein Copy-Button je Übersetzung), wenn es passt."""
+    if len(translations) == 1:
+        return await send_translation(channel, translations[0])
+    content = "\n".join(f"```{t}```" for t in translations)
+    if len(content) > DISCORD_LIMIT or len(translations) > 25:
+        for translated in translations:
+            await send_translation(channel, translated)
+        return
+    await channel.send(content, view=MultiCopyView(translations))
+
+def build_batch_messages(texts, langs, stil, prompt_extra):
+    """Mehrere Texte als JSON-Array in einem Request; Antwort = JSON-Array der Übersetzungen."""
+    targets = {"de": "Englisch", "en": "Deutsch"}
+    items = [{"text": text, "ziel": targets.get(lang, "auto")} for text, lang in zip(texts, langs)]
+    system_prompt = (
+        BASE_PROMPT
+        + " Du bekommst ein JSON-Array mit Objekten {\"text\", \"ziel\"}. Übersetze jeden Text einzeln in die"
+        " Zielsprache (\"auto\": ist der Text deutsch, auf Englisch, sonst auf Deutsch). Antworte ausschließlich"
+        " mit einem JSON-Array der Übersetzungen als Strings – gleiche Reihenfolge, gleiche Anzahl."
+        " Zeilenumbrüche innerhalb eines Textes bleiben als \\n in der jeweiligen Übersetzung erhalten."
+    )
+    if stil:
+        system_prompt += f" Stil: {stil}."
+    if prompt_extra:
+        system_prompt += " Zusatzregeln: " + prompt_extra
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": json.dumps(items, ensure_ascii=False)}
+    ]
+
+def line_count(text):
+    """Nicht-leere Zeilen – so fällt auf, wenn eine Sammel-Antwort Zeilenumbrüche verschluckt."""
+    return sum(1 for line in text.splitlines() if line.strip())
+
+def parse_batch_reply(result, count):
+    """JSON-Array aus der Antwort holen; None, wenn Form oder Anzahl nicht passen."""
+    start, end = result.find("["), result.rfind("]")
+    if start < 0 or end < start:
+        return None
     try:
-        # GPT-3.5 turbo für Speed/Preis-Leistung, alternativ gpt-4o für maximale Qualität
-        response = await openai.ChatCompletion.acreate(
-            model="gpt-3.5-turbo",  # oder "gpt-4o" für noch bessere Results
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text}
-            ],
-            temperature=0.0,  # Immer exakt, kein Rumgespinne
-            max_tokens=500
-        )
-        result = response.choices[0].message.content.strip()
-        # Kein Text = Fallback
-        if not result:
-            return "*Fehler: Keine Antwort*"
-        # Entferne überflüssige Zeilen, falls GPT doch mal was "erklärt"
-        result = result.split("\n")[0]
-        return result
-    except Exception as ex:
-        return f"*Fehler bei GPT: {ex}*"
+        data = json.loads(result[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(data, list) or len(data) != count or not all(isinstance(t, str) and t.strip() for t in data):
+        return None
+    return [t.strip() for t in data]
+
+async def translate_batch_gpt(texts, langs, stil, prompt_extra, on_queued=None):
+    """→ Liste der Übersetzungen oder None (Antwort unbrauchbar → einzeln übersetzen)."""
+    result = await get_client().complete(
+        build_batch_messages(texts, langs, stil, prompt_extra),
+        max_tokens=sum(max_tokens_for(t) for t in texts),
+        temperature=0.0,
+        on_queued=on_queued
+    )
+    return parse_batch_reply(result or "", len(texts))
 
 # ========== UI für Kopierfeld ==========
 
@@ -96,12 +224,104 @@ class CopyView(discord.ui.View):
             color=discord.Color.green()
         )
 
+class CopyButton(discord.ui.Button):
+    def __init__(self, label, text):
+        super().__init__(label=label, style=discord.ButtonStyle.gray, emoji="📋")
+        self.text = text
+
+    async def callback(self, interaction: Interaction):
+        await utils.send_ephemeral(
+            interaction,
+            text=f"```{self.text}```",
+            emoji="📋",
+            color=discord.Color.green()
+        )
+
+class MultiCopyView(discord.ui.View):
+    def __init__(self, texts):
+        super().__init__(timeout=60)
+        for i, text in enumerate(texts, 1):
+            self.add_item(CopyButton(f"Kopiere {i}", text))
+
+class HistoryView(discord.ui.View):
+    """Blättern im Verlauf – jede Seite liest nur ihre eigenen Log-Zeilen."""
+    def __init__(self, result, title, guild):
+        super().__init__(timeout=300)
+        self.result = result
+        self.title = title
+        self.guild = guild
+        self.page = 0
+
+    async def render(self):
+        entries = await self.result.page(self.page)
+        embed = discord.Embed(
+            title=self.title,
+            description=f"{self.result.total} Einträge – Seite {self.page + 1}/{self.result.pages} (neueste zuerst)",
+            color=discord.Color.blurple()
+        )
+        for entry in entries:
+            member = self.guild.get_member(int(entry.get("user_id", 0) or 0)) if self.guild else None
+            who = member.display_name if member else entry.get("user_id")
+            embed.add_field(
+                name=f"{entry.get('zeit', '?')} · {who} · {entry.get('profile', '?')}",
+                value=f"**Eingabe:** {shorten(entry.get('original', ''))}\n"
+                      f"**Übersetzung:** {shorten(entry.get('translated', ''))}",
+                inline=False
+            )
+        self.prev_btn.disabled = self.page == 0
+        self.next_btn.disabled = self.page >= self.result.pages - 1
+        return embed
+
+    @discord.ui.button(label="Zurück", style=discord.ButtonStyle.gray, emoji="◀️")
+    async def prev_btn(self, interaction: Interaction, button: discord.ui.Button):
+        self.page = max(0, self.page - 1)
+        await interaction.response.edit_message(embed=await self.render(), view=self)
+
+    @discord.ui.button(label="Weiter", style=discord.ButtonStyle.gray, emoji="▶️")
+    async def next_btn(self, interaction: Interaction, button: discord.ui.Button):
+        self.page = min(self.result.pages - 1, self.page + 1)
+        await interaction.response.edit_message(embed=await self.render(), view=self)
+
+def shorten(text, limit=200):
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
 # ========== Main Cog ==========
 
 class TranslationCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.active_sessions = {}  # user_id → channel_id
+        self.sessions = {}  # channel_id → {"user_id", "profile", "created"}
+        self._reconcile_task = None
+        self._history_task = None
+        self.pool = deque()  # freie Pool-Channel-IDs
+        self._recycling = set()  # Channels, die gerade geleert werden
+        self._reserved = set()  # aus dem Pool genommen, aber noch nicht als Session registriert
+        self._close_tasks = set()  # starke Referenzen auf laufende close_session_channel-Tasks
+        self._pool_lock = asyncio.Lock()
+        self.timeouts = {}  # profil → Minuten
+        self._deadlines = []  # Min-Heap (zeitpunkt, channel_id) – nächstes Ereignis je Session
+        self._scheduled = {}  # channel_id → gültiger Zeitpunkt im Heap (ältere Heap-Einträge sind veraltet)
+        self._activity_saved = {}  # channel_id → wann last_active zuletzt gespeichert wurde
+        self.pending = {}  # channel_id → [(message, received)] im Coalescing-Fenster
+        self._flush_tasks = set()  # starke Referenzen – der Event-Loop hält Tasks nur schwach
+        self.coalesce_stats = {"batches": 0, "messages": 0, "fallbacks": 0}
+        self.recent_log = {}  # (user_id, profile) → deque der letzten Übersetzungen
+        self.cache = TranslationCache()
+        self.history = HistoryIndex(TRANSLATION_LOG_PATH)
+        # Gerenderte Profil-Seiten, gültig solange profiles.json dieselbe Version hat
+        self._profile_pages = None
+        self._profile_pages_version = None
+        self._profile_names = []
+        self._profile_keys = []  # kleingeschrieben, sortiert (Bisect fürs Autocomplete)
+        # Zeit bis zur ersten sichtbaren Übersetzung (ms) je Pfad, zum Vergleich
+        self.latency = {
+            "blocking": deque(maxlen=LATENCY_SAMPLES),
+            "streaming": deque(maxlen=LATENCY_SAMPLES),
+            "cache": deque(maxlen=LATENCY_SAMPLES),
+            # Klick im Menü → Link zur Session (ms)
+            "session_pool": deque(maxlen=LATENCY_SAMPLES),
+            "session_new": deque(maxlen=LATENCY_SAMPLES),
+        }
 
     # ==== Helper ==== (wie gehabt)
 
@@ -109,25 +329,74 @@ class TranslationCog(commands.Cog):
         return await utils.load_json(PROFILES_PATH, {})
 
     async def save_profiles(self, data):
-        await utils.save_json(PROFILES_PATH, data)
+        async with utils.json_transaction(PROFILES_PATH, {}) as tx:
+            tx.data = data
+
+    async def profile_pages(self):
+        """SelectOption-Seiten (je 25, alphabetisch) – neu gebaut nur, wenn profiles.json sich geändert hat."""
+        version = utils.get_version(PROFILES_PATH)
+        if self._profile_pages is None or self._profile_pages_version != version:
+            profiles = await self.get_profiles()
+            too_long = [name for name in profiles if len(name) > PROFILE_NAME_LIMIT]
+            if too_long:
+                # Würden das ganze Menü kaputt machen (Discord lehnt die View ab) → nicht anbieten
+                print(f"[translation] Profilnamen über {PROFILE_NAME_LIMIT} Zeichen ausgelassen: {', '.join(shorten(n, 40) for n in too_long)}")
+            names = sorted((name for name in profiles if len(name) <= PROFILE_NAME_LIMIT), key=str.lower)
+            options = [
+                discord.SelectOption(label=name, value=name, description=(profiles[name] or "")[:80] or None)
+                for name in names
+            ]
+            self._profile_names = names
+            self._profile_keys = [name.lower() for name in names]
+            self._profile_pages = [options[i:i + PROFILE_PAGE_SIZE] for i in range(0, len(options), PROFILE_PAGE_SIZE)]
+            self._profile_pages_version = version
+        return self._profile_pages
+
+    async def match_profiles(self, current, limit=25):
+        """Autocomplete: Präfix-Treffer per Bisect, danach Teilstring-Treffer."""
+        await self.profile_pages()
+        current = current.lower()
+        start = bisect.bisect_left(self._profile_keys, current)
+        matches = []
+        for key, name in zip(self._profile_keys[start:], self._profile_names[start:]):
+            if not key.startswith(current) or len(matches) >= limit:
+                break
+            matches.append(name)
+        if len(matches) < limit and current:
+            for key, name in zip(self._profile_keys, self._profile_names):
+                if current in key and not key.startswith(current):
+                    matches.append(name)
+                    if len(matches) >= limit:
+                        break
+        return matches
+
+    async def build_menu_view(self):
+        pages = await self.profile_pages()
+        return self.MenuView(self, pages) if pages else None
+
+    async def show_profile_pager(self, interaction, page):
+        pages = await self.profile_pages()
+        if not pages:
+            return await utils.send_error(interaction, "Es gibt keine Profile.")
+        page = max(0, min(page, len(pages) - 1))
+        view = self.ProfilePagerView(self, pages, page)
+        await utils.send_ephemeral(interaction, embed=view.embed(), view=view)
 
     async def get_menu_channel(self, guild):
         d = await utils.load_json(MENU_PATH, {})
         return guild.get_channel(d.get("menu_channel_id", 0)) if d.get("menu_channel_id") else None
 
     async def set_menu_channel(self, channel_id):
-        d = await utils.load_json(MENU_PATH, {})
-        d["menu_channel_id"] = channel_id
-        await utils.save_json(MENU_PATH, d)
+        async with utils.json_transaction(MENU_PATH, {}) as tx:
+            tx.data["menu_channel_id"] = channel_id
 
     async def get_log_channel(self, guild):
         d = await utils.load_json(MENU_PATH, {})
         return guild.get_channel(d.get("log_channel_id", 0)) if d.get("log_channel_id") else None
 
     async def set_log_channel(self, channel_id):
-        d = await utils.load_json(MENU_PATH, {})
-        d["log_channel_id"] = channel_id
-        await utils.save_json(MENU_PATH, d)
+        async with utils.json_transaction(MENU_PATH, {}) as tx:
+            tx.data["log_channel_id"] = channel_id
 
     async def get_category(self, guild):
         cid = await utils.load_json(CATEGORY_PATH, None)
@@ -136,44 +405,585 @@ class TranslationCog(commands.Cog):
     async def set_category(self, cid):
         await utils.save_json(CATEGORY_PATH, cid)
 
+    # ==== Session-Registry (Channel-ID → Besitzer/Profil) ====
+
+    async def load_sessions(self):
+        data = await utils.load_json(SESSIONS_PATH, {})
+        self.sessions = {int(cid): entry for cid, entry in data.items()}
+
+    async def register_session(self, channel_id, user_id, profile_name):
+        entry = {
+            "user_id": user_id,
+            "profile": profile_name,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "last_active": time.time()
+        }
+        self.sessions[channel_id] = entry
+        async with utils.json_transaction(SESSIONS_PATH, {}) as tx:
+            tx.data[str(channel_id)] = entry
+        self._activity_saved[channel_id] = entry["last_active"]
+        self.schedule_session(channel_id)
+        return entry
+
+    async def unregister_sessions(self, channel_ids):
+        channel_ids = [cid for cid in channel_ids if cid in self.sessions]
+        if not channel_ids:
+            return
+        for cid in channel_ids:
+            self.sessions.pop(cid, None)
+            self._scheduled.pop(cid, None)
+            self._activity_saved.pop(cid, None)
+        async with utils.json_transaction(SESSIONS_PATH, {}) as tx:
+            for cid in channel_ids:
+                tx.data.pop(str(cid), None)
+
+    def find_sessions(self, user_id, profile_name=None):
+        return [
+            cid for cid, entry in self.sessions.items()
+            if entry["user_id"] == user_id and (profile_name is None or entry["profile"] == profile_name)
+        ]
+
+    # ==== Lebenszyklus: Inaktivität → Warnung → Ende ====
+
+    def session_deadlines(self, entry):
+        """→ (warnen_ab, beenden_ab) als Unix-Zeit, None = Profil ohne Timeout."""
+        minutes = self.timeouts.get(entry["profile"], IDLE_MINUTES)
+        if not minutes or minutes <= 0:
+            return None
+        last = entry.get("last_active")
+        if last is None:
+            try:
+                last = datetime.fromisoformat(entry["created"]).timestamp()
+            except (KeyError, ValueError):
+                last = time.time()
+        expire = last + minutes * 60
+        warn = expire - min(IDLE_WARN_MINUTES, minutes / 2) * 60
+        return warn, expire
+
+    def schedule_session(self, channel_id):
+        entry = self.sessions.get(channel_id)
+        deadlines = self.session_deadlines(entry) if entry else None
+        if not deadlines:
+            self._scheduled.pop(channel_id, None)
+            return
+        at = deadlines[1] if entry.get("warned") else deadlines[0]
+        self._scheduled[channel_id] = at
+        heapq.heappush(self._deadlines, (at, channel_id))
+
+    async def touch_session(self, channel_id):
+        """Aktivität merken – O(1), der Heap wird erst beim Fälligwerden nachgezogen."""
+        entry = self.sessions[channel_id]
+        now = time.time()
+        entry["last_active"] = now
+        entry.pop("warned", None)
+        if now - self._activity_saved.get(channel_id, 0) >= ACTIVITY_PERSIST_SECONDS:
+            self._activity_saved[channel_id] = now
+            async with utils.json_transaction(SESSIONS_PATH, {}) as tx:
+                if str(channel_id) in tx.data:
+                    tx.data[str(channel_id)]["last_active"] = now
+
+    @tasks.loop(seconds=REAPER_INTERVAL)
+    async def reaper_task(self):
+        now = time.time()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            at, cid = heapq.heappop(self._deadlines)
+            if self._scheduled.get(cid) != at:
+                continue  # veraltet (neu geplant oder Session weg)
+            del self._scheduled[cid]
+            entry = self.sessions.get(cid)
+            deadlines = self.session_deadlines(entry) if entry else None
+            if not deadlines:
+                continue
+            warn, expire = deadlines
+            try:
+                if now >= expire:
+                    await self.expire_session(cid)
+                    continue
+                if now >= warn and not entry.get("warned"):
+                    await self.warn_session(cid, entry, expire)
+            except Exception as e:
+                print(f"[translation] Fehler im Session-Reaper: {e}")
+            # Zwischendurch aktiv gewesen → einfach neu einplanen
+            self.schedule_session(cid)
+
+    @reaper_task.before_loop
+    async def before_reaper_task(self):
+        await self.bot.wait_until_ready()
+
+    async def warn_session(self, channel_id, entry, expire):
+        entry["warned"] = True
+        channel = self.bot.get_channel(channel_id)
+        if channel:
+            minutes = max(1, round((expire - time.time()) / 60))
+            await channel.send(
+                f"<@{entry['user_id']}> ⏳ Diese Session wird in ca. {minutes} Min. wegen Inaktivität beendet. "
+                "Schreib einfach weiter, um sie offen zu halten."
+            )
+
+    async def expire_session(self, channel_id):
+        """Reaper: abgelaufene Session beenden – der Channel wird in jedem Fall geschlossen."""
+        session = self.sessions.get(channel_id)
+        channel = self.bot.get_channel(channel_id)
+        if not channel or not session:
+            await self.unregister_sessions([channel_id])
+            return
+        try:
+            await self.finish_session(channel, session, reason="wegen Inaktivität beendet")
+        except Exception as e:
+            # finish_session schließt den Channel erst nach dem Abmelden – scheitert schon das
+            # (z.B. Schreibfehler der Registry), hier aufräumen, sonst bleibt ein verwaister Channel
+            print(f"[translation] Fehler beim Beenden von Session {channel_id}: {e}")
+            self.sessions.pop(channel_id, None)
+            self._scheduled.pop(channel_id, None)
+            await self.close_session_channel(channel, session.get("created"))
+
+    async def load_timeouts(self):
+        self.timeouts = await utils.load_json(TIMEOUTS_PATH, {})
+
+    async def reconcile_sessions(self):
+        """Nach dem Start: Registry mit den Channels der Session-Kategorie abgleichen."""
+        await self.bot.wait_until_ready()
+        guild = self.bot.get_guild(GUILD_ID)
+        if not guild:
+            return
+        # Einträge ohne Channel entfernen
+        gone = [cid for cid in self.sessions if guild.get_channel(cid) is None]
+        await self.unregister_sessions(gone)
+        cat = await self.get_category(guild)
+        if not cat:
+            if gone:
+                print(f"[translation] {len(gone)} verwaiste Session(s) aus der Registry entfernt.")
+            return
+        # Session-Channels ohne Eintrag (z.B. aus der Zeit vor der Registry) übernehmen
+        profiles = await self.get_profiles()
+        adopted, removed = 0, 0
+        for channel in cat.text_channels:
+            if not channel.name.startswith(SESSION_PREFIX) or channel.id in self.sessions:
+                continue
+            owner = next(
+                (t for t, o in channel.overwrites.items()
+                 if isinstance(t, discord.Member) and t != guild.me and o.send_messages),
+                None
+            )
+            profile_name = self.profile_from_channel(channel, profiles, owner)
+            if owner and profile_name:
+                await self.register_session(channel.id, owner.id, profile_name)
+                adopted += 1
+                continue
+            # Weder Besitzer noch Profil erkennbar → niemand kann den Channel mehr nutzen
+            try:
+                await channel.delete(reason="Verwaiste Übersetzungs-Session")
+                removed += 1
+            except Exception as e:
+                print(f"[translation] Fehler beim Löschen von #{channel.name}: {e}")
+        if gone or adopted or removed:
+            print(f"[translation] Sessions abgeglichen: {len(gone)} entfernt, {adopted} übernommen, {removed} Channels gelöscht.")
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        # Von Hand gelöschte Session-Channels aus der Registry nehmen
+        if channel.id in self.sessions:
+            await self.unregister_sessions([channel.id])
+
+    @staticmethod
+    def profile_from_channel(channel, profiles, owner):
+        # Topic: "Übersetzungs-Session für <Name> (<Profil>)"
+        topic = channel.topic or ""
+        if topic.endswith(")") and "(" in topic:
+            candidate = topic[topic.rfind("(") + 1:-1]
+            if candidate in profiles:
+                return candidate
+        # Fallback: Channelname translat-<profil>-<user>
+        if owner:
+            for name in profiles:
+                if channel.name == session_channel_name(name, owner):
+                    return name
+        return None
+
     async def get_prompts(self):
         return await utils.load_json(PROMPT_PATH, [])
 
     async def add_prompt(self, text):
-        prompts = await self.get_prompts()
-        prompts.append(text)
-        await utils.save_json(PROMPT_PATH, prompts)
+        async with utils.json_transaction(PROMPT_PATH, []) as tx:
+            tx.data.append(text)
 
     async def remove_prompt(self, index):
-        prompts = await self.get_prompts()
-        if 0 <= index < len(prompts):
-            prompts.pop(index)
-        await utils.save_json(PROMPT_PATH, prompts)
+        async with utils.json_transaction(PROMPT_PATH, []) as tx:
+            if 0 <= index < len(tx.data):
+                tx.data.pop(index)
+
+    # ==== Channel-Pool ====
+
+    @staticmethod
+    def pool_overwrites(guild):
+        return {
+            guild.default_role: discord.PermissionOverwrite(read_messages=False),
+            guild.me: discord.PermissionOverwrite(
+                read_messages=True, send_messages=True, manage_channels=True, manage_messages=True
+            )
+        }
+
+    async def fill_pool(self):
+        guild = self.bot.get_guild(GUILD_ID)
+        cat = await self.get_category(guild) if guild else None
+        if not cat or POOL_SIZE <= 0:
+            return
+        async with self._pool_lock:
+            # Nur Channels, die noch existieren und in der aktuellen Kategorie liegen
+            valid = [
+                cid for cid in self.pool
+                if (c := guild.get_channel(cid)) and c.category_id == cat.id and cid not in self.sessions
+            ]
+            # Pool-Channels vom letzten Lauf (vor dem Neustart) übernehmen
+            for c in cat.text_channels:
+                if (c.name == POOL_CHANNEL_NAME and c.id not in valid and c.id not in self.sessions
+                        and c.id not in self._recycling and c.id not in self._reserved):
+                    valid.append(c.id)
+            self.pool = deque(valid)
+            while len(self.pool) < POOL_SIZE:
+                try:
+                    channel = await guild.create_text_channel(
+                        name=POOL_CHANNEL_NAME,
+                        category=cat,
+                        overwrites=self.pool_overwrites(guild),
+                        topic=POOL_TOPIC
+                    )
+                except Exception as e:
+                    print(f"[translation] Fehler beim Auffüllen des Channel-Pools: {e}")
+                    return
+                self.pool.append(channel.id)
+
+    @tasks.loop(seconds=POOL_REFILL_SECONDS)
+    async def pool_task(self):
+        await self.fill_pool()
 
-    async def get_log(self):
-        return await utils.load_json(TRANSLATION_LOG_PATH, {})
+    @pool_task.before_loop
+    async def before_pool_task(self):
+        await self.bot.wait_until_ready()
 
-    async def save_log(self, data):
-        await utils.save_json(TRANSLATION_LOG_PATH, data)
+    async def open_session_channel(self, guild, cat, name, overwrites, topic):
+        """→ (Channel, aus_pool). Pool-Channel = ein einziger Edit statt Channel anlegen.
+        Ein Pool-Channel bleibt in _reserved, bis der Aufrufer ihn registriert hat."""
+        while self.pool:
+            channel = guild.get_channel(self.pool.popleft())
+            if not channel or channel.category_id != cat.id:
+                continue
+            # Während des Edits heißt er noch pool-translat – fill_pool darf ihn nicht zurückholen
+            self._reserved.add(channel.id)
+            try:
+                await channel.edit(name=name, overwrites=overwrites, topic=topic)
+                return channel, True
+            except Exception as e:
+                self._reserved.discard(channel.id)
+                print(f"[translation] Pool-Channel nicht nutzbar, lege neu an: {e}")
+                break
+        channel = await guild.create_text_channel(name=name, category=cat, overwrites=overwrites, topic=topic)
+        return channel, False
+
+    async def close_session_channel(self, channel, created=None):
+        """Session-Channel zurück in den Pool (verstecken + leeren) oder löschen."""
+        too_old = False
+        if created:
+            try:
+                too_old = datetime.now() - datetime.fromisoformat(created) > POOL_MAX_SESSION_AGE
+            except ValueError:
+                too_old = True
+        if POOL_SIZE > 0 and len(self.pool) < POOL_SIZE and not too_old:
+            self._recycling.add(channel.id)
+            try:
+                # Erst verstecken (User sieht sofort nichts mehr), dann leeren
+                await channel.edit(name=POOL_CHANNEL_NAME, overwrites=self.pool_overwrites(channel.guild), topic=POOL_TOPIC)
+                await channel.purge(limit=None)
+                self.pool.append(channel.id)
+                return
+            except Exception as e:
+                print(f"[translation] Recycling von #{channel.name} fehlgeschlagen, lösche: {e}")
+            finally:
+                self._recycling.discard(channel.id)
+        try:
+            await channel.delete()
+        except Exception:
+            pass
 
-    # ==== Menu/Dynamic Views ==== (wie gehabt)
+    # ==== Übersetzungs-Log (JSONL, append-only) ====
+
+    async def cog_load(self):
+        await self.load_sessions()
+        await self.load_timeouts()
+        # Ausstehende Abläufe aus der Registry wieder einplanen
+        for cid in self.sessions:
+            self.schedule_session(cid)
+        self.reaper_task.start()
+        # Button "Session beenden" und das Profil-Menü funktionieren auch nach einem Neustart
+        self.bot.add_view(self.EndSessionView(self))
+        self.bot.add_view(self.MenuView(self, None))
+        self._reconcile_task = asyncio.create_task(self.reconcile_sessions())
+        if POOL_SIZE > 0:
+            self.pool_task.start()
+        await self.cache.load()
+        await self.migrate_legacy_log()
+        await utils.repair_jsonl(TRANSLATION_LOG_PATH)
+        # Ringpuffer aus dem Ende des Logs neu aufbauen
+        for entry in await utils.tail_jsonl(TRANSLATION_LOG_PATH, LOG_TAIL_BYTES):
+            self.remember_entry(entry)
+        # Verlaufs-Index im Hintergrund aufbauen (bei großen Logs ein paar Sekunden)
+        self._history_task = asyncio.create_task(self.history.refresh())
+
+    async def cog_unload(self):
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+        if self._history_task:
+            self._history_task.cancel()
+        self.pool_task.cancel()
+        self.reaper_task.cancel()
+        # Wartende Coalescing-Fenster nicht abwarten, aber gesammelte Nachrichten noch übersetzen
+        for task in self._flush_tasks:
+            task.cancel()
+        await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        for channel_id in list(self.pending):
+            channel = self.bot.get_channel(channel_id)
+            if channel:
+                await self.flush_pending(channel, delay=False)
+        self.pending.clear()
+        await get_client().close()
+
+    async def migrate_legacy_log(self):
+        """Einmalig: altes translation_log.json ({user: {profil: [...]}}) in den JSONL-Stream übernehmen."""
+        if os.path.exists(TRANSLATION_LOG_PATH) or not os.path.exists(LEGACY_TRANSLATION_LOG_PATH):
+            return
+        legacy = await utils.load_json(LEGACY_TRANSLATION_LOG_PATH, {})
+        entries = [
+            {"user_id": uid, "profile": profile, **entry}
+            for uid, profiles in legacy.items()
+            for profile, userlog in profiles.items()
+            for entry in userlog
+        ]
+        entries.sort(key=lambda e: e.get("zeit", ""))
+        for entry in entries:
+            await utils.append_jsonl(TRANSLATION_LOG_PATH, entry)
+        print(f"[translation] {len(entries)} Log-Einträge nach {TRANSLATION_LOG_PATH} migriert.")
+
+    def remember_entry(self, entry):
+        key = (str(entry.get("user_id")), entry.get("profile"))
+        buf = self.recent_log.get(key)
+        if buf is None:
+            buf = self.recent_log[key] = deque(maxlen=RECENT_PER_SESSION)
+        buf.append(entry)
+
+    def get_recent_log(self, user_id, profile_name):
+        return list(self.recent_log.get((str(user_id), profile_name), ()))
+
+    async def log_translation(self, user_id, profile_name, original, translated):
+        entry = {
+            "user_id": str(user_id),
+            "profile": profile_name,
+            "zeit": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "ts": int(time.time()),  # UTC, für den Verlaufs-Index (zeit ist Ortszeit zur Anzeige)
+            "original": original,
+            "translated": translated
+        }
+        self.remember_entry(entry)
+        await utils.append_jsonl(TRANSLATION_LOG_PATH, entry)
+
+    # ==== Übersetzen (mit Cache) ====
+
+    async def translate(self, text, stil, prompt, on_queued=None, lang=None, lookup=True):
+        """→ (Übersetzung, aus_cache). Lange Texte werden in Chunks parallel übersetzt. Wirft TranslationError.
+        lookup=False: der Cache wurde für den ganzen Text schon gefragt (translate_many)."""
+        lang = lang or detect_language(text)
+        chunks = split_chunks(text)
+        if len(chunks) == 1:
+            return await self.translate_chunk(text, lang, stil, prompt, on_queued, lookup)
+        # Alle Chunks gleichzeitig – Limits/Reihenfolge regelt der gemeinsame Client
+        results = await asyncio.gather(*(
+            self.translate_chunk(chunk, lang, stil, prompt, on_queued) if chunk.strip() else _untranslated(chunk)
+            for chunk, _ in chunks
+        ))
+        translated = join_chunks([t for t, _ in results], chunks).strip()
+        return translated, all(from_cache for _, from_cache in results)
+
+    async def translate_many(self, texts, stil, prompt, on_queued=None):
+        """Mehrere kurze Texte, Cache-Fehlschläge in einem Request.
+        → Liste aus (Übersetzung, aus_cache) oder Exception, in Eingabe-Reihenfolge."""
+        langs = [detect_language(t) for t in texts]
+        keys = [cache_key(t, lang, stil, prompt, get_client().model_id) for t, lang in zip(texts, langs)]
+        results = [None] * len(texts)
+        missing = []
+        for i, key in enumerate(keys):
+            cached = await self.cache.get(key)
+            if cached is not None:
+                results[i] = (cached, True)
+            else:
+                missing.append(i)
+        if len(missing) > 1:
+            started = time.perf_counter()
+            try:
+                batch = await translate_batch_gpt(
+                    [texts[i] for i in missing], [langs[i] for i in missing], stil, prompt, on_queued
+                )
+            except TranslationError as e:
+                print(f"[translation] Fehler bei Sammel-Übersetzung, einzeln weiter: {e}")
+                batch = None
+            if batch is not None:
+                self.cache.record_api_call((time.perf_counter() - started) * 1000)
+                retry = []
+                for i, translated in zip(missing, batch):
+                    if line_count(translated) != line_count(texts[i]):
+                        retry.append(i)  # Zeilen zusammengezogen/aufgeteilt → einzeln übersetzen
+                        continue
+                    results[i] = (translated, False)
+                    await self.cache.put(keys[i], translated)
+                missing = retry
+            if batch is None or missing:
+                self.coalesce_stats["fallbacks"] += 1
+        # Rest einzeln (nur ein Fehlschlag oder Sammel-Antwort unbrauchbar)
+        singles = await asyncio.gather(
+            *(self.translate(texts[i], stil, prompt, on_queued, langs[i], lookup=False) for i in missing),
+            return_exceptions=True
+        )
+        for i, result in zip(missing, singles):
+            results[i] = result
+        return results
+
+    async def translate_chunk(self, text, lang, stil, prompt, on_queued=None, lookup=True):
+        key = cache_key(text, lang, stil, prompt, get_client().model_id)
+        cached = await self.cache.get(key) if lookup else None
+        if cached is not None:
+            return cached, True
+        started = time.perf_counter()
+        translated = await translate_text_gpt(text, stil, prompt, lang, on_queued)
+        self.cache.record_api_call((time.perf_counter() - started) * 1000)
+        await self.cache.put(key, translated)
+        return translated, False
+
+    async def translate_streaming(self, channel, text, stil, prompt, received, on_queued=None):
+        """Streaming-Pfad: Platzhalter posten, fortlaufend editieren, CopyView erst am Ende.
+        Gibt None zurück, wenn die Übersetzung fehlgeschlagen ist."""
+        lang = detect_language(text)
+        key = cache_key(text, lang, stil, prompt, get_client().model_id)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            await send_translation(channel, cached)
+            self.record_latency("cache", received)
+            return cached
+        placeholder = await channel.send("```…```")
+        started = time.perf_counter()
+        translated = ""
+        shown = ""
+        last_edit = 0.0
+        try:
+            async for partial in stream_text_gpt(text, stil, prompt, lang, on_queued):
+                translated = partial
+                now = time.perf_counter()
+                preview = shorten(translated, STREAM_PREVIEW_LIMIT)
+                # Edits zusammenfassen: erster Text sofort, danach höchstens alle STREAM_EDIT_INTERVAL s;
+                # ab dem Limit steht die gekürzte Vorschau fest, weitere Edits bringen nichts
+                if preview and preview != shown and (not shown or now - last_edit >= STREAM_EDIT_INTERVAL):
+                    await placeholder.edit(content=f"```{preview}```")
+                    if not shown:
+                        self.record_latency("streaming", received)
+                    shown = preview
+                    last_edit = now
+            if not translated:
+                raise TranslationError("Keine Antwort")
+        except Exception as ex:
+            # Fehler: kein CopyView, kein Cache, kein Log
+            await placeholder.edit(content=f"*Fehler bei Übersetzung: {ex}*")
+            return None
+        self.cache.record_api_call((time.perf_counter() - started) * 1000)
+        await self.cache.put(key, translated)
+        # Zu lang für eine Nachricht: Platzhalter wird der erste Teil, der Rest wie bei send_translation
+        first, *rest = split_message(translated, DISCORD_LIMIT - 6)
+        await placeholder.edit(content=f"```{first}```", view=CopyView(first))
+        for part in rest:
+            await send_translation(channel, part)
+        return translated
+
+    def record_latency(self, path, received):
+        self.latency[path].append((time.perf_counter() - received) * 1000)
+
+    # ==== Menu/Dynamic Views ====
     class ProfileDropdown(discord.ui.Select):
-        def __init__(self, profiles, callback):
-            options = [discord.SelectOption(label=name, description=stil[:80]) for name, stil in profiles.items()]
-            super().__init__(placeholder="Profil wählen…", min_values=1, max_values=1, options=options)
+        def __init__(self, options, callback, placeholder="Profil wählen…", custom_id=None):
+            kwargs = {"custom_id": custom_id} if custom_id else {}
+            super().__init__(placeholder=placeholder, min_values=1, max_values=1, options=options, **kwargs)
             self._callback = callback
 
         async def callback(self, interaction):
-            await self._callback(interaction, self.values[0])
+            if self.values[0]:
+                await self._callback(interaction, self.values[0])
+
+    class MenuView(discord.ui.View):
+        """Persistentes Menü: erste Profil-Seite direkt, alle weiteren über "Mehr Profile".
+        pages=None → nur zum Registrieren der custom_ids beim Start (bot.add_view)."""
+        def __init__(self, cog, pages):
+            super().__init__(timeout=None)
+            self.cog = cog
+            first = pages[0] if pages else [discord.SelectOption(label="Profil wählen…", value="")]
+            total = sum(len(p) for p in pages) if pages else 0
+            placeholder = "Profil wählen…"
+            if pages and len(pages) > 1:
+                placeholder = f"Profil wählen… (1–{len(first)} von {total})"
+            self.add_item(cog.ProfileDropdown(first, cog.start_session_callback, placeholder, PROFILE_SELECT_CUSTOM_ID))
+            if pages is None or len(pages) > 1:
+                button = discord.ui.Button(
+                    label=f"Mehr Profile ({total})" if total else "Mehr Profile",
+                    style=discord.ButtonStyle.blurple, emoji="📚", custom_id=MORE_PROFILES_CUSTOM_ID
+                )
+                button.callback = self.more_profiles
+                self.add_item(button)
+
+        async def more_profiles(self, interaction: Interaction):
+            await self.cog.show_profile_pager(interaction, 1)
+
+    class ProfilePagerView(discord.ui.View):
+        """Ephemerales Blättern durch alle Profil-Seiten."""
+        def __init__(self, cog, pages, page):
+            super().__init__(timeout=180)
+            self.cog = cog
+            self.pages = pages
+            self.page = page
+            self.add_item(cog.ProfileDropdown(pages[page], cog.start_session_callback, f"Profil wählen… (Seite {page + 1})"))
+            self.prev_btn.disabled = page == 0
+            self.next_btn.disabled = page >= len(pages) - 1
+
+        def embed(self):
+            first = self.pages[self.page][0].label
+            last = self.pages[self.page][-1].label
+            return discord.Embed(
+                description=f"📚 Seite {self.page + 1}/{len(self.pages)}: **{first}** – **{last}**\n"
+                            "Schneller: `/translate start` mit Profilsuche.",
+                color=discord.Color.blurple()
+            )
+
+        async def turn(self, interaction, page):
+            pages = await self.cog.profile_pages()
+            if not pages:
+                return await utils.send_error(interaction, "Es gibt keine Profile.")
+            page = max(0, min(page, len(pages) - 1))
+            view = self.cog.ProfilePagerView(self.cog, pages, page)
+            await interaction.response.edit_message(embed=view.embed(), view=view)
+
+        @discord.ui.button(label="Zurück", style=discord.ButtonStyle.gray, emoji="◀️", row=1)
+        async def prev_btn(self, interaction: Interaction, button: discord.ui.Button):
+            await self.turn(interaction, self.page - 1)
+
+        @discord.ui.button(label="Weiter", style=discord.ButtonStyle.gray, emoji="▶️", row=1)
+        async def next_btn(self, interaction: Interaction, button: discord.ui.Button):
+            await self.turn(interaction, self.page + 1)
 
     class EndSessionView(discord.ui.View):
-        def __init__(self, send_log_cb):
+        """Persistent (fester custom_id) – die Session kommt aus der Registry, nicht aus dem View."""
+        def __init__(self, cog):
             super().__init__(timeout=None)
-            self.send_log_cb = send_log_cb
+            self.cog = cog
 
-        @discord.ui.button(label="Session beenden & Verlauf senden", style=discord.ButtonStyle.red, emoji="🛑")
+        @discord.ui.button(
+            label="Session beenden & Verlauf senden", style=discord.ButtonStyle.red, emoji="🛑",
+            custom_id=END_SESSION_CUSTOM_ID
+        )
         async def end_btn(self, interaction: Interaction, button: discord.ui.Button):
-            await self.send_log_cb(interaction)
+            await self.cog.end_session(interaction)
 
     # ==== Slash Commands ==== (wie gehabt, keine Änderung nötig)
 
@@ -183,88 +993,126 @@ class TranslationCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def translatorpost(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        profiles = await self.get_profiles()
-        if not profiles:
+        view = await self.build_menu_view()
+        if not view:
             return await utils.send_error(interaction, "Es gibt keine Profile. Füge erst eines mit /translatoraddprofile hinzu.")
         embed = discord.Embed(
             title="🌐 Übersetzungs-Menu",
             description="Wähle ein Profil, um eine private Übersetzungs-Session zu starten.",
             color=discord.Color.blue()
         )
-        view = discord.ui.View()
-        view.add_item(self.ProfileDropdown(profiles, self.start_session_callback))
         await interaction.channel.send(embed=embed, view=view)
         await self.set_menu_channel(interaction.channel.id)
         await utils.send_success(interaction, "Übersetzungsmenü wurde gepostet!")
 
     async def start_session_callback(self, interaction: Interaction, profile_name):
-        profiles = await self.get_profiles()
-        stil = profiles[profile_name]
+        clicked = time.perf_counter()
+        # Sofort bestätigen – der Rest darf länger als Discords 3-Sekunden-Fenster dauern
+        await interaction.response.defer(ephemeral=True, thinking=True)
         guild = interaction.guild
         user = interaction.user
+        if profile_name not in await self.get_profiles():
+            return await utils.send_error(interaction, f"Profil **{profile_name}** existiert nicht mehr.")
 
         # Kategorie holen
         cat = await self.get_category(guild)
         if not cat:
             return await utils.send_error(interaction, "Kategorie für Sessions nicht gesetzt. Bitte Admin fragen.")
-        # Existierende Session löschen
-        for c in cat.text_channels:
-            if c.name == f"translat-{profile_name.lower()}-{user.name.lower()}":
-                try:
-                    await c.delete()
-                except Exception:
-                    pass
-        # Channel erstellen
-        name = f"translat-{profile_name.lower()}-{user.name.lower()}"
+        # Existierende Session desselben Profils beenden (recyceln)
+        old = self.find_sessions(user.id, profile_name)
+        old_created = {cid: self.sessions[cid].get("created") for cid in old}
+        await self.unregister_sessions(old)
+        for cid in old:
+            c = guild.get_channel(cid)
+            if c:
+                task = asyncio.create_task(self.close_session_channel(c, old_created[cid]))
+                self._close_tasks.add(task)
+                task.add_done_callback(self._close_tasks.discard)
+        # Channel aus dem Pool holen oder neu erstellen
+        name = session_channel_name(profile_name, user)
         overwrites = {
             guild.default_role: discord.PermissionOverwrite(read_messages=False),
             user: discord.PermissionOverwrite(read_messages=True, send_messages=True),
-            guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True, manage_channels=True)
+            guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True, manage_channels=True, manage_messages=True)
         }
-        channel = await guild.create_text_channel(
-            name=name,
-            category=cat,
-            overwrites=overwrites,
+        channel, from_pool = await self.open_session_channel(
+            guild, cat, name, overwrites,
             topic=f"Übersetzungs-Session für {user.display_name} ({profile_name})"
         )
-        self.active_sessions[user.id] = channel.id
+        try:
+            await self.register_session(channel.id, user.id, profile_name)
+        finally:
+            self._reserved.discard(channel.id)
+        await interaction.followup.send(f"Deine Session ist bereit: {channel.mention}", ephemeral=True)
+        self.record_latency("session_pool" if from_pool else "session_new", clicked)
         embed = discord.Embed(
             title=f"Session gestartet ({profile_name})",
             description="Schreibe eine Nachricht, um sie zu übersetzen.\n"
                         "Mit dem Button unten kannst du die Session beenden & den Verlauf senden lassen.",
             color=discord.Color.blue()
         )
-        view = self.EndSessionView(lambda i: self.end_session(i, channel, user, profile_name))
+        view = self.EndSessionView(self)
         await channel.send(f"{user.mention}", embed=embed, view=view)
-        await interaction.response.send_message(
-            f"Deine Session ist bereit: {channel.mention}", ephemeral=True
-        )
 
-    async def end_session(self, interaction, channel, user, profile_name):
-        # Verlauf posten und Channel löschen
-        log = await self.get_log()
-        userlog = log.get(str(user.id), {}).get(profile_name, [])
-        log_channel = await self.get_log_channel(channel.guild)
-        if log_channel and userlog:
-            embed = discord.Embed(
-                title=f"Übersetzungs-Session – {user.display_name} ({profile_name})",
-                color=discord.Color.green(),
-                description="Hier die letzten Übersetzungen dieser Session (max. 10):"
-            )
-            for entry in userlog[-10:]:
-                embed.add_field(
-                    name=entry["zeit"],
-                    value=f"**Eingabe:** {entry['original']}\n**Übersetzung:** {entry['translated']}",
-                    inline=False
-                )
-            await log_channel.send(embed=embed)
-        await utils.send_ephemeral(interaction, "Session beendet & Verlauf gesendet!")
+    async def end_session(self, interaction):
+        channel = interaction.channel
+        session = self.sessions.get(channel.id)
+        if not session:
+            return await utils.send_error(interaction, "Zu diesem Channel gibt es keine aktive Session.")
+        if interaction.user.id != session["user_id"] and not utils.is_authorized(interaction):
+            return await utils.send_permission_denied(interaction)
+        await self.finish_session(channel, session, interaction=interaction)
+
+    async def finish_session(self, channel, session, interaction=None, reason=None):
+        """Gemeinsamer Abschluss für Button und Reaper: Verlauf ins Log, Channel recyceln/löschen."""
+        user_id, profile_name = session["user_id"], session["profile"]
+        user = channel.guild.get_member(user_id)
+        display_name = user.display_name if user else str(user_id)
+        await self.unregister_sessions([channel.id])
         try:
-            await channel.delete()
-        except Exception:
-            pass
+            # Verlauf posten und Channel löschen
+            userlog = self.get_recent_log(user_id, profile_name)
+            log_channel = await self.get_log_channel(channel.guild)
+            if log_channel and userlog:
+                description = f"Hier die letzten Übersetzungen dieser Session (max. {RECENT_PER_SESSION}):"
+                if reason:
+                    description = f"*Session {reason}.*\n" + description
+                embed = discord.Embed(
+                    title=shorten(f"Übersetzungs-Session – {display_name} ({profile_name})", 256),
+                    color=discord.Color.green(),
+                    description=description
+                )
+                for entry in userlog:
+                    # Discord: max. 1024 Zeichen pro Feld, 6000 pro Embed
+                    value = (
+                        f"**Eingabe:** {shorten(entry['original'], FIELD_TEXT_LIMIT)}\n"
+                        f"**Übersetzung:** {shorten(entry['translated'], FIELD_TEXT_LIMIT)}"
+                    )
+                    if len(embed) + len(entry["zeit"]) + len(value) > EMBED_TOTAL_LIMIT:
+                        break
+                    embed.add_field(name=entry["zeit"], value=value, inline=False)
+                await log_channel.send(embed=embed)
+            if interaction:
+                await utils.send_ephemeral(interaction, "Session beendet & Verlauf gesendet!")
+        except Exception as e:
+            print(f"[translation] Fehler beim Verlauf für Session {channel.id}: {e}")
+        finally:
+            # Auch wenn das Senden scheitert: die Session ist schon abgemeldet, der Channel muss weg
+            await self.close_session_channel(channel, session.get("created"))
+
+    translate_group = app_commands.Group(
+        name="translate", description="Übersetzungs-Sessions", guild_ids=[GUILD_ID]
+    )
+
+    @translate_group.command(name="start", description="Startet eine private Übersetzungs-Session (Profil suchen statt scrollen).")
+    async def translate_start(self, interaction: Interaction, profil: str):
+        await self.start_session_callback(interaction, profil)
+
+    @translate_start.autocomplete("profil")
+    async def translate_start_autocomplete(self, interaction: Interaction, current: str):
+        return [app_commands.Choice(name=name[:100], value=name) for name in await self.match_profiles(current)]
 
     @app_commands.command(
         name="translatoraddprofile",
@@ -272,11 +1120,12 @@ class TranslationCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def translatoraddprofile(self, interaction: Interaction, name: str, stil: str):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        profiles = await self.get_profiles()
-        profiles[name] = stil
-        await self.save_profiles(profiles)
+        if len(name) > PROFILE_NAME_LIMIT:
+            return await utils.send_error(interaction, f"Der Profilname darf höchstens {PROFILE_NAME_LIMIT} Zeichen lang sein.")
+        async with utils.json_transaction(PROFILES_PATH, {}) as tx:
+            tx.data[name] = stil
         await utils.send_success(interaction, f"Profil **{name}** hinzugefügt.")
 
     @app_commands.command(
@@ -285,22 +1134,86 @@ class TranslationCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def translatordeleteprofile(self, interaction: Interaction, name: str):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
-        profiles = await self.get_profiles()
-        if name not in profiles:
+        async with utils.json_transaction(PROFILES_PATH, {}) as tx:
+            existed = tx.data.pop(name, None) is not None
+        if not existed:
             return await utils.send_error(interaction, f"Profil **{name}** existiert nicht.")
-        del profiles[name]
-        await self.save_profiles(profiles)
         await utils.send_success(interaction, f"Profil **{name}** entfernt.")
 
+    @app_commands.command(
+        name="translatortimeout",
+        description="Inaktivitäts-Timeout für Sessions eines Profils in Minuten, 0 = nie, leer = Standard (nur Admins)."
+    )
+    @app_commands.guilds(MY_GUILD)
+    async def translatortimeout(self, interaction: Interaction, profil: str, minuten: int = None):
+        if not utils.is_authorized(interaction):
+            return await utils.send_permission_denied(interaction)
+        if profil not in await self.get_profiles():
+            return await utils.send_error(interaction, f"Profil **{profil}** existiert nicht.")
+        if minuten is not None and minuten < 0:
+            return await utils.send_error(interaction, "Minuten dürfen nicht negativ sein.")
+        async with utils.json_transaction(TIMEOUTS_PATH, {}) as tx:
+            if minuten is None:
+                tx.data.pop(profil, None)
+            else:
+                tx.data[profil] = minuten
+            self.timeouts = dict(tx.data)
+        # Laufende Sessions des Profils mit dem neuen Timeout neu einplanen
+        for cid, entry in self.sessions.items():
+            if entry["profile"] == profil:
+                self.schedule_session(cid)
+        if minuten is None:
+            text = f"Timeout für **{profil}** zurückgesetzt auf Standard ({IDLE_MINUTES:g} Min.)."
+        elif minuten == 0:
+            text = f"Sessions mit **{profil}** laufen nicht mehr automatisch ab."
+        else:
+            text = f"Sessions mit **{profil}** enden nach **{minuten} Min.** ohne Nachricht."
+        await utils.send_success(interaction, text)
+
+    @app_commands.command(
+        name="translatorhistory",
+        description="Übersetzungsverlauf durchsuchen – User, Profil, Zeitraum (TT.MM.JJJJ) (nur Admins)."
+    )
+    @app_commands.guilds(MY_GUILD)
+    async def translatorhistory(
+        self, interaction: Interaction, user: discord.User = None, profil: str = None, von: str = None, bis: str = None
+    ):
+        if not utils.is_authorized(interaction):
+            return await utils.send_permission_denied(interaction)
+        try:
+            date_from = day_key(von) if von else None
+            date_to = day_key(bis, end=True) if bis else None
+        except ValueError:
+            return await utils.send_error(interaction, "Datum bitte als TT.MM.JJJJ (z.B. 01.05.2024).")
+        result = await self.history.query(user.id if user else None, profil, date_from, date_to)
+        if not result.total:
+            return await utils.send_ephemeral(
+                interaction, text="Keine Übersetzungen für diese Filter gefunden.", emoji="ℹ️", color=discord.Color.light_grey()
+            )
+        filters = [f for f in (
+            user.display_name if user else None, profil,
+            f"ab {von}" if von else None, f"bis {bis}" if bis else None
+        ) if f]
+        title = "Übersetzungsverlauf" + (f" – {', '.join(filters)}" if filters else "")
+        view = HistoryView(result, title, interaction.guild)
+        await utils.send_ephemeral(interaction, embed=await view.render(), view=view)
+
+    @translatorhistory.autocomplete("profil")
+    async def translatorhistory_profile_autocomplete(self, interaction: Interaction, current: str):
+        current = current.lower()
+        return [
+            app_commands.Choice(name=p, value=p) for p in self.history.profiles() if current in p.lower()
+        ][:25]
+
     @app_commands.command(
         name="translatorlog",
         description="Setzt den Logchannel für Übersetzungsverläufe (nur Admins)."
     )
     @app_commands.guilds(MY_GUILD)
     async def translatorlog(self, interaction: Interaction, channel: discord.TextChannel):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         await self.set_log_channel(channel.id)
         await utils.send_success(interaction, f"Logchannel für Übersetzungen gesetzt: {channel.mention}")
@@ -311,7 +1224,7 @@ class TranslationCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def translatorsetcategorie(self, interaction: Interaction, category: discord.CategoryChannel):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         await self.set_category(category.id)
         await utils.send_success(interaction, f"Kategorie für Sessions gesetzt: {category.name}")
@@ -322,7 +1235,7 @@ class TranslationCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def translatorprompt(self, interaction: Interaction, text: str):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         await self.add_prompt(text)
         await utils.send_success(interaction, f"Prompt hinzugefügt: {text}")
@@ -333,7 +1246,7 @@ class TranslationCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def translatorpromptdelete(self, interaction: Interaction, nummer: int):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         prompts = await self.get_prompts()
         if not prompts or not (1 <= nummer <= len(prompts)):
@@ -348,7 +1261,7 @@ class TranslationCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def translatorpromptview(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         prompts = await self.get_prompts()
         if not prompts:
@@ -363,70 +1276,178 @@ class TranslationCog(commands.Cog):
         )
         await utils.send_ephemeral(interaction, embed=embed)
 
+    @app_commands.command(
+        name="translatorcachestats",
+        description="Zeigt Treffer/Fehlschläge des Übersetzungs-Caches (nur Admins)."
+    )
+    @app_commands.guilds(MY_GUILD)
+    async def translatorcachestats(self, interaction: Interaction):
+        if not utils.is_authorized(interaction):
+            return await utils.send_permission_denied(interaction)
+        s = self.cache.summary()
+        await utils.send_ephemeral(
+            interaction,
+            text=(
+                f"**Treffer:** {s['hits']} (Speicher {s['memory_hits']}, Platte {s['disk_hits']})\n"
+                f"**Fehlschläge:** {s['misses']} – Trefferquote {s['hit_rate']:.0%}\n"
+                f"**API-Calls:** {s['api_calls']} (Ø {s['avg_api_ms']:.0f} ms)\n"
+                f"**Eingesparte Wartezeit:** ~{s['saved_ms'] / 1000:.1f} s\n"
+                f"**Einträge:** {s['memory_entries']} im Speicher, {s['disk_entries']} auf der Platte"
+            ),
+            emoji="🗃️",
+            color=discord.Color.blurple()
+        )
+
+    @app_commands.command(
+        name="translatorlatency",
+        description="Zeit bis zur ersten sichtbaren Übersetzung: Streaming vs. Blocking (nur Admins)."
+    )
+    @app_commands.guilds(MY_GUILD)
+    async def translatorlatency(self, interaction: Interaction):
+        if not utils.is_authorized(interaction):
+            return await utils.send_permission_denied(interaction)
+        labels = {
+            "blocking": "Blocking", "streaming": "Streaming", "cache": "Cache-Treffer",
+            "session_pool": "Session-Start (Pool)", "session_new": "Session-Start (neu angelegt)",
+        }
+        lines = [f"**Modus:** {'Streaming' if STREAMING else 'Blocking'} – Channel-Pool: {len(self.pool)}/{POOL_SIZE} frei"]
+        for path, label in labels.items():
+            samples = sorted(self.latency[path])
+            if not samples:
+                lines.append(f"**{label}:** keine Messwerte")
+                continue
+            median = samples[len(samples) // 2]
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            lines.append(f"**{label}:** {len(samples)} Nachrichten – Median {median:.0f} ms, p95 {p95:.0f} ms")
+        api = get_client().stats
+        if COALESCE_MS > 0:
+            c = self.coalesce_stats
+            lines.append(
+                f"**Coalescing ({COALESCE_MS} ms):** {c['messages']} Nachrichten in {c['batches']} Antworten, "
+                f"{c['fallbacks']}× einzeln nachübersetzt"
+            )
+        lines.append(
+            f"**API:** {api['requests']} Requests, {api['retries']} Retries ({api['rate_limited']}× Rate-Limit), "
+            f"{api['failed']} fehlgeschlagen, {api['queued']}× gewartet, gerade aktiv: {api['in_flight']}"
+        )
+        await utils.send_ephemeral(interaction, text="\n".join(lines), emoji="⏱️", color=discord.Color.blurple())
+
     # ==== Message Listener – GPT-Übersetzung + CopyView ====
 
     @commands.Cog.listener()
     async def on_message(self, message):
-        # Nur in Sessions
-        if message.author.bot or not message.guild:
+        # Nur in Sessions – ein Dict-Lookup, bevor irgendetwas anderes passiert
+        session = self.sessions.get(message.channel.id)
+        if session is None or message.author.bot:
             return
         user = message.author
-        if user.id not in self.active_sessions:
-            return
-        channel = message.guild.get_channel(self.active_sessions[user.id])
-        if not channel or channel.id != message.channel.id:
+        if user.id != session["user_id"]:
             return
+        channel = message.channel
+        await self.touch_session(channel.id)
 
         # Profil/Prompt holen
-        profile_name = None
-        if channel.name.startswith("translat-"):
-            try:
-                profile_name = channel.name.split("-")[1]
-            except IndexError:
-                return
-        if not profile_name:
-            return
+        profile_name = session["profile"]
 
         profiles = await self.get_profiles()
         stil = profiles.get(profile_name, "")
         prompts = await self.get_prompts()
         prompt = " ".join(prompts)
 
-        # API-Call OpenAI
+        received = time.perf_counter()
+        show_queued = self.queued_indicator(message)
+
+        # Streaming nur für Texte, die in einen Chunk passen – lange Texte laufen parallel gestückelt
+        if STREAMING and len(split_chunks(message.content)) == 1:
+            translated = await self.translate_streaming(channel, message.content, stil, prompt, received, show_queued)
+            if translated is not None:
+                await self.log_translation(user.id, profile_name, message.content, translated)
+            return
+
+        # Kurze Nachrichten kurz sammeln – ein Request + eine Antwort für den ganzen Schwall
+        if COALESCE_MS > 0 and len(split_chunks(message.content)) == 1:
+            self.queue_message(message, received)
+            return
+
+        # API-Call (gemeinsamer Client mit Limits + Retry)
         try:
-            translated = await translate_text_gpt(message.content, stil, prompt)
-        except Exception:
-            translated = "*Fehler bei Übersetzung*"
+            translated, from_cache = await self.translate(message.content, stil, prompt, show_queued)
+        except Exception as ex:
+            # Fehler gehen nur in den Channel, nicht ins Übersetzungs-Log
+            await channel.send(f"*Fehler bei Übersetzung: {ex}*")
+            return
 
         # Log this
-        log = await self.get_log()
-        userlog = log.setdefault(str(user.id), {}).setdefault(profile_name, [])
-        userlog.append({
-            "zeit": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "original": message.content,
-            "translated": translated
-        })
-        await self.save_log(log)
+        await self.log_translation(user.id, profile_name, message.content, translated)
 
         # **Reine Text-Antwort + Copy-Button (nur der Übersetzungstext)**
-        await channel.send(
-            f"```{translated}```",
-            view=CopyView(translated)
-        )
+        await send_translation(channel, translated)
+        self.record_latency("cache" if from_cache else "blocking", received)
+
+    def queued_indicator(self, message):
+        async def show_queued(waiting):
+            # ⏳ solange der Request auf einen freien Slot / das Rate-Limit wartet
+            if waiting:
+                await message.add_reaction("⏳")
+            else:
+                await message.remove_reaction("⏳", self.bot.user)
+        return show_queued
+
+    # ==== Coalescing: schnell hintereinander geschriebene Nachrichten ====
+
+    def queue_message(self, message, received):
+        batch = self.pending.setdefault(message.channel.id, [])
+        batch.append((message, received))
+        if len(batch) == 1:
+            # Fenster startet mit der ersten Nachricht → maximal COALESCE_MS zusätzliche Wartezeit
+            task = asyncio.create_task(self.flush_pending(message.channel))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush_pending(self, channel, delay=True):
+        if delay:
+            await asyncio.sleep(COALESCE_MS / 1000)
+        batch = self.pending.pop(channel.id, [])
+        session = self.sessions.get(channel.id)
+        if not batch or not session:
+            return
+        try:
+            profiles = await self.get_profiles()
+            stil = profiles.get(session["profile"], "")
+            prompt = " ".join(await self.get_prompts())
+            texts = [message.content for message, _ in batch]
+            results = await self.translate_many(texts, stil, prompt, self.queued_indicator(batch[-1][0]))
+            self.coalesce_stats["batches"] += 1
+            self.coalesce_stats["messages"] += len(batch)
+            translations, errors = [], []
+            for (message, received), text, result in zip(batch, texts, results):
+                if isinstance(result, Exception):
+                    errors.append(f"*Fehler bei Übersetzung: {result}*")
+                    continue
+                translated, from_cache = result
+                translations.append(translated)
+                await self.log_translation(session["user_id"], session["profile"], text, translated)
+            if translations:
+                await send_translations(channel, translations)
+            if errors:
+                await channel.send("\n".join(errors))
+            for (message, received), result in zip(batch, results):
+                if not isinstance(result, Exception):
+                    self.record_latency("cache" if result[1] else "blocking", received)
+        except Exception as e:
+            print(f"[translation] Fehler beim Senden gesammelter Übersetzungen: {e}")
 
     # ===== Menu-Refresh für Setupbot =====
     async def reload_menu(self, channel_id):
         guild = self.bot.get_guild(GUILD_ID)
         channel = guild.get_channel(channel_id)
-        profiles = await self.get_profiles()
-        if channel and profiles:
+        view = await self.build_menu_view()
+        if channel and view:
             embed = discord.Embed(
                 title="🌐 Übersetzungs-Menu",
                 description="Wähle ein Profil, um eine private Übersetzungs-Session zu starten.",
                 color=discord.Color.blue()
             )
-            view = discord.ui.View()
-            view.add_item(self.ProfileDropdown(profiles, self.start_session_callback))
             await channel.send(embed=embed, view=view)
 
 # ==== Cog Setup ====
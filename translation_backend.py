@@ -0,0 +1,307 @@
+# translation_backend.py
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import aiohttp
+
+# Austauschbare Übersetzungs-Backends, Auswahl per .env:
+#   TRANSLATION_BACKEND=openai  (Standard) jeder OpenAI-kompatible Chat-Endpunkt (OPENAI_API_BASE)
+#   TRANSLATION_BACKEND=gemini  Google Gemini REST-API (GOOGLE_API_KEY, GEMINI_MODEL)
+#   TRANSLATION_BACKEND=local   deterministischer Stand-in ohne Netzwerk (Lasttests, offline)
+# Der lokale Stand-in läuft auch als HTTP-Server mit OpenAI-kompatibler API:
+#   python translation_backend.py --serve --port 8089 --latency-ms 300 --error-rate 0.1
+# und dann TRANSLATION_BACKEND=openai + OPENAI_API_BASE=http://127.0.0.1:8089/v1
+TRANSLATION_BACKEND = os.environ.get("TRANSLATION_BACKEND", "openai").lower()
+OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
+OPENAI_API_BASE = os.environ.get("OPENAI_API_BASE", "") or "https://api.openai.com/v1"
+# GPT-3.5 turbo für Speed/Preis-Leistung, alternativ gpt-4o für maximale Qualität
+OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-3.5-turbo")
+GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY", "")
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-1.5-flash")
+GEMINI_API_BASE = os.environ.get("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta")
+LOCAL_LATENCY_MS = float(os.environ.get("TRANSLATION_LOCAL_LATENCY_MS", "0"))
+LOCAL_ERROR_RATE = float(os.environ.get("TRANSLATION_LOCAL_ERROR_RATE", "0"))
+LOCAL_SEED = int(os.environ.get("TRANSLATION_LOCAL_SEED", "42"))
+REQUEST_TIMEOUT = float(os.environ.get("TRANSLATION_TIMEOUT", "30"))
+
+class BackendError(Exception):
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self):
+        return self.status is None or self.status == 429 or self.status >= 500
+
+def _retry_after(headers):
+    value = headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+async def _iter_sse(response):
+    """Server-Sent-Events: liefert den Inhalt jeder "data:"-Zeile."""
+    async for raw in response.content:
+        line = raw.decode("utf-8").strip()
+        if line.startswith("data:"):
+            yield line[5:].strip()
+
+class HttpBackend:
+    def __init__(self):
+        self._session = None
+
+    def session(self):
+        if self._session is None or self._session.closed:
+            # Kein Gesamt-Timeout (Streams dürfen lange laufen), aber keine hängenden Verbindungen
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=REQUEST_TIMEOUT, sock_read=REQUEST_TIMEOUT)
+            self._session = aiohttp.ClientSession(timeout=timeout)
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def _raise_for_status(self, response):
+        if response.status >= 400:
+            body = (await response.text())[:300]
+            raise BackendError(
+                f"HTTP {response.status}: {body}",
+                status=response.status,
+                retry_after=_retry_after(response.headers)
+            )
+
+# ========== OpenAI-kompatibel ==========
+
+class OpenAICompatibleBackend(HttpBackend):
+    name = "openai"
+
+    def __init__(self, api_base=OPENAI_API_BASE, api_key=OPENAI_API_KEY, model=OPENAI_MODEL):
+        super().__init__()
+        self.url = api_base.rstrip("/") + "/chat/completions"
+        self.api_key = api_key
+        self.model = model
+
+    def _request(self, messages, max_tokens, temperature, stream):
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": stream,
+        }
+        return self.session().post(self.url, json=payload, headers=headers)
+
+    async def complete(self, messages, max_tokens, temperature):
+        """→ (Text, verbrauchte Tokens oder None)"""
+        async with self._request(messages, max_tokens, temperature, False) as response:
+            await self._raise_for_status(response)
+            data = await response.json()
+        usage = data.get("usage") or {}
+        return data["choices"][0]["message"]["content"], usage.get("total_tokens")
+
+    async def stream(self, messages, max_tokens, temperature):
+        async with self._request(messages, max_tokens, temperature, True) as response:
+            await self._raise_for_status(response)
+            async for data in _iter_sse(response):
+                if data == "[DONE]":
+                    return
+                delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+
+# ========== Gemini ==========
+
+class GeminiBackend(HttpBackend):
+    name = "gemini"
+
+    def __init__(self, api_key=GOOGLE_API_KEY, model=GEMINI_MODEL, api_base=GEMINI_API_BASE):
+        super().__init__()
+        self.api_key = api_key
+        self.model = model
+        self.api_base = api_base.rstrip("/")
+
+    def _payload(self, messages, max_tokens, temperature):
+        system = " ".join(m["content"] for m in messages if m["role"] == "system")
+        contents = [
+            {"role": "model" if m["role"] == "assistant" else "user", "parts": [{"text": m["content"]}]}
+            for m in messages if m["role"] != "system"
+        ]
+        payload = {
+            "contents": contents,
+            "generationConfig": {"temperature": temperature, "maxOutputTokens": max_tokens},
+        }
+        if system:
+            payload["systemInstruction"] = {"parts": [{"text": system}]}
+        return payload
+
+    @staticmethod
+    def _text(data):
+        candidates = data.get("candidates") or []
+        if not candidates:
+            return ""
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(p.get("text", "") for p in parts)
+
+    async def complete(self, messages, max_tokens, temperature):
+        url = f"{self.api_base}/models/{self.model}:generateContent"
+        async with self.session().post(url, params={"key": self.api_key}, json=self._payload(messages, max_tokens, temperature)) as response:
+            await self._raise_for_status(response)
+            data = await response.json()
+        usage = data.get("usageMetadata") or {}
+        return self._text(data), usage.get("totalTokenCount")
+
+    async def stream(self, messages, max_tokens, temperature):
+        url = f"{self.api_base}/models/{self.model}:streamGenerateContent"
+        params = {"key": self.api_key, "alt": "sse"}
+        async with self.session().post(url, params=params, json=self._payload(messages, max_tokens, temperature)) as response:
+            await self._raise_for_status(response)
+            async for data in _iter_sse(response):
+                text = self._text(json.loads(data))
+                if text:
+                    yield text
+
+# ========== Lokaler Stand-in ==========
+
+def local_translate(messages):
+    """Deterministische Fake-Übersetzung: gleiche Eingabe → gleiche Ausgabe."""
+    system = " ".join(m["content"] for m in messages if m["role"] == "system")
+    text = " ".join(m["content"] for m in messages if m["role"] == "user")
+    if "JSON-Array" in system:
+        # Sammel-Request (Coalescing): [{"text", "ziel"}] → ["…", …]
+        try:
+            items = json.loads(text)
+            return json.dumps(
+                [f"[{'EN' if item['ziel'] == 'Englisch' else 'DE'}] {item['text']}" for item in items],
+                ensure_ascii=False
+            )
+        except (ValueError, KeyError, TypeError):
+            pass
+    target = "EN" if "ins Englisch" in system else "DE"
+    return f"[{target}] {text}"
+
+class LocalBackend:
+    name = "local"
+
+    def __init__(self, latency_ms=LOCAL_LATENCY_MS, error_rate=LOCAL_ERROR_RATE, seed=LOCAL_SEED):
+        self.model = "local-standin"
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        # Eigener Zufallsgenerator → Fehlermuster bei gleichem Seed reproduzierbar
+        self._rng = random.Random(seed)
+
+    async def _simulate(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise BackendError("Injizierter Fehler (429)", status=429, retry_after=0.1)
+
+    async def complete(self, messages, max_tokens, temperature):
+        await self._simulate()
+        text = local_translate(messages)
+        return text, len(text) // 4
+
+    async def stream(self, messages, max_tokens, temperature):
+        await self._simulate()
+        words = local_translate(messages).split(" ")
+        for i, word in enumerate(words):
+            yield word if i == 0 else " " + word
+
+    async def close(self):
+        pass
+
+_backend = None
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if TRANSLATION_BACKEND == "gemini":
+            _backend = GeminiBackend()
+        elif TRANSLATION_BACKEND == "local":
+            _backend = LocalBackend()
+        else:
+            if TRANSLATION_BACKEND != "openai":
+                print(f"[translation_backend] Unbekanntes TRANSLATION_BACKEND '{TRANSLATION_BACKEND}', nutze openai.")
+            _backend = OpenAICompatibleBackend()
+    return _backend
+
+# ========== Stand-in als HTTP-Server (OpenAI-kompatibel) ==========
+
+def make_app(latency_ms=0.0, error_rate=0.0, seed=LOCAL_SEED, retry_after=1.0):
+    from aiohttp import web
+
+    rng = random.Random(seed)
+    stats = {"requests": 0, "errors": 0}
+
+    async def chat_completions(request):
+        stats["requests"] += 1
+        body = await request.json()
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        if error_rate and rng.random() < error_rate:
+            stats["errors"] += 1
+            return web.json_response(
+                {"error": {"message": "Rate limit reached (injiziert)", "type": "rate_limit"}},
+                status=429,
+                headers={"Retry-After": str(retry_after)}
+            )
+        text = local_translate(body.get("messages", []))
+        created = int(time.time())
+        if not body.get("stream"):
+            return web.json_response({
+                "id": f"local-{stats['requests']}",
+                "object": "chat.completion",
+                "created": created,
+                "model": body.get("model", "local-standin"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"total_tokens": len(text) // 4},
+            })
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for i, word in enumerate(text.split(" ")):
+            chunk = {"choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            if latency_ms:
+                await asyncio.sleep(latency_ms / 1000 / 10)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def get_stats(request):
+        return web.json_response(stats)
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_get("/stats", get_stats)
+    return app
+
+def main(argv):
+    import argparse
+    from aiohttp import web
+
+    parser = argparse.ArgumentParser(description="Lokaler Übersetzungs-Stand-in (OpenAI-kompatibel)")
+    parser.add_argument("--serve", action="store_true", help="HTTP-Server starten")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=LOCAL_LATENCY_MS)
+    parser.add_argument("--error-rate", type=float, default=LOCAL_ERROR_RATE)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=LOCAL_SEED)
+    args = parser.parse_args(argv)
+    if not args.serve:
+        parser.print_help()
+        return
+    app = make_app(args.latency_ms, args.error_rate, args.seed, args.retry_after)
+    print(f"[translation_backend] Stand-in läuft auf http://{args.host}:{args.port}/v1")
+    web.run_app(app, host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
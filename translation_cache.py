@@ -0,0 +1,162 @@
+# translation_cache.py
+
+import os
+import json
+import hashlib
+import asyncio
+from collections import OrderedDict
+import utils
+
+# Zwei Stufen:
+#   1) LRU im Speicher (schnell, begrenzt)
+#   2) Append-Only-JSONL auf der Platte, im Speicher liegt nur key → (Offset, Länge)
+# Der Schlüssel enthält Text, Richtung, Stil, Prompt-Regeln und Modell – ändert sich
+# ein Profil oder ein Prompt, passt der alte Eintrag automatisch nicht mehr.
+CACHE_PATH = os.path.join("persistent_data", "translation_cache.jsonl")
+CACHE_MEMORY_ENTRIES = int(os.environ.get("TRANSLATION_CACHE_SIZE", "2000"))
+CACHE_DISK_ENTRIES = int(os.environ.get("TRANSLATION_CACHE_DISK_SIZE", "50000"))
+
+def normalize_text(text):
+    """Leerzeichen je Zeile zusammenfassen – Zeilenumbrüche bleiben Teil des Schlüssels,
+    weil die Übersetzung sie exakt übernimmt."""
+    return "\n".join(" ".join(line.split()) for line in text.strip().splitlines())
+
+def cache_key(text, direction, stil, prompt, model):
+    raw = json.dumps([normalize_text(text), direction, stil or "", prompt or "", model], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def _scan_sync(path):
+    offsets = OrderedDict()
+    lines = 0
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            lines += 1
+            try:
+                key = utils.loads(line)["k"]
+            except (ValueError, KeyError, TypeError):
+                offset += len(line)
+                continue
+            # Neuere Zeile gewinnt, ans Ende (= zuletzt benutzt)
+            offsets.pop(key, None)
+            offsets[key] = (offset, len(line))
+            offset += len(line)
+    return offsets, lines
+
+def _read_sync(path, key, offset, length):
+    with open(path, "rb") as f:
+        f.seek(offset)
+        entry = utils.loads(f.read(length))
+    # Parallel kompaktiert → Offset zeigt evtl. auf eine andere Zeile
+    return entry["v"] if entry.get("k") == key else None
+
+def _append_sync(path, line):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path, "ab") as f:
+        offset = f.tell()
+        f.write(line)
+    return offset
+
+def _compact_sync(path, offsets):
+    """Schreibt nur noch die gültigen Einträge neu → neue Offsets."""
+    new_offsets = OrderedDict()
+    tmp_path = path + ".tmp"
+    with open(path, "rb") as src, open(tmp_path, "wb") as dst:
+        for key, (offset, length) in offsets.items():
+            src.seek(offset)
+            line = src.read(length)
+            new_offsets[key] = (dst.tell(), len(line))
+            dst.write(line)
+    os.replace(tmp_path, path)
+    return new_offsets
+
+class TranslationCache:
+    def __init__(self, path=CACHE_PATH, memory_entries=CACHE_MEMORY_ENTRIES, disk_entries=CACHE_DISK_ENTRIES):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self._lru = OrderedDict()      # key → Übersetzung
+        self._offsets = OrderedDict()  # key → (offset, länge) in der JSONL-Datei
+        self._lines = 0
+        self._lock = asyncio.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "api_calls": 0, "api_ms": 0.0}
+
+    async def load(self):
+        if not os.path.exists(self.path):
+            return
+        await utils.repair_jsonl(self.path)
+        async with self._lock:
+            self._offsets, self._lines = await asyncio.to_thread(_scan_sync, self.path)
+            await self._maybe_compact()
+
+    async def _maybe_compact(self):
+        # Zu viele Einträge oder zu viele tote Zeilen → Datei neu schreiben
+        while len(self._offsets) > self.disk_entries:
+            self._offsets.popitem(last=False)
+        if self._lines > 2 * max(len(self._offsets), 1000):
+            self._offsets = await asyncio.to_thread(_compact_sync, self.path, self._offsets)
+            self._lines = len(self._offsets)
+
+    async def get(self, key):
+        value = self._lru.get(key)
+        if value is not None:
+            self._lru.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return value
+        pos = self._offsets.get(key)
+        if pos is not None:
+            try:
+                value = await asyncio.to_thread(_read_sync, self.path, key, *pos)
+            except Exception as e:
+                print(f"[translation_cache] Fehler beim Lesen: {e}")
+                value = None
+            if value is not None:
+                self._offsets.move_to_end(key)
+                self._remember(key, value)
+                self.stats["disk_hits"] += 1
+                return value
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, key, value):
+        self._remember(key, value)
+        line = utils.dumps({"k": key, "v": value}, compact=True) + b"\n"
+        async with self._lock:
+            try:
+                offset = await asyncio.to_thread(_append_sync, self.path, line)
+            except Exception as e:
+                print(f"[translation_cache] Fehler beim Schreiben: {e}")
+                return
+            self._offsets.pop(key, None)
+            self._offsets[key] = (offset, len(line))
+            self._lines += 1
+            self.stats["stores"] += 1
+            await self._maybe_compact()
+
+    def _remember(self, key, value):
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.memory_entries:
+            self._lru.popitem(last=False)
+
+    def record_api_call(self, elapsed_ms):
+        self.stats["api_calls"] += 1
+        self.stats["api_ms"] += elapsed_ms
+
+    def summary(self):
+        s = self.stats
+        hits = s["memory_hits"] + s["disk_hits"]
+        total = hits + s["misses"]
+        avg_ms = s["api_ms"] / s["api_calls"] if s["api_calls"] else 0.0
+        return {
+            **s,
+            "hits": hits,
+            "hit_rate": hits / total if total else 0.0,
+            "avg_api_ms": avg_ms,
+            # Grobe Schätzung: jeder Treffer spart einen API-Call mit Durchschnittslatenz
+            "saved_ms": hits * avg_ms,
+            "memory_entries": len(self._lru),
+            "disk_entries": len(self._offsets),
+        }
@@ -0,0 +1,83 @@
+# translation_chunks.py
+
+import os
+import re
+
+# Lange Texte in Stücke zerlegen, die einzeln (parallel) übersetzt werden:
+#   - Absätze (Leerzeile) sind immer eine Grenze
+#   - sonst an Zeilenumbrüchen / Satzenden, bis das Token-Budget voll ist
+#   - zu lange Sätze an Wortgrenzen, notfalls hart
+# Jeder Chunk merkt sich den Original-Trenner dahinter → Zeilenumbrüche bleiben exakt erhalten.
+CHUNK_TOKENS = int(os.environ.get("TRANSLATION_CHUNK_TOKENS", "300"))
+CHARS_PER_TOKEN = 4
+CHUNK_CHARS = CHUNK_TOKENS * CHARS_PER_TOKEN
+DISCORD_LIMIT = 2000
+
+_SEPARATOR_RE = re.compile(r"(\n[ \t]*\n\s*|\n|(?<=[.!?…])[ \t]+)")
+_WORD_RE = re.compile(r"\S+\s*|\s+")
+
+def _is_paragraph(sep):
+    return sep.count("\n") >= 2
+
+def _split_long(piece, max_chars):
+    """Zu langes Stück an Wortgrenzen teilen → [(teil, leerzeichen dahinter)]."""
+    parts = []
+    current = ""
+    for word in _WORD_RE.findall(piece):
+        while len(word) > max_chars:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(word[:max_chars])
+            word = word[max_chars:]
+        if current and len(current) + len(word) > max_chars:
+            parts.append(current)
+            current = word
+        else:
+            current += word
+    parts.append(current)
+    result = []
+    for part in parts:
+        text = part.rstrip()
+        result.append((text, part[len(text):]))
+    return result
+
+def _pieces(text, max_chars):
+    tokens = _SEPARATOR_RE.split(text)
+    for i in range(0, len(tokens), 2):
+        piece = tokens[i]
+        sep = tokens[i + 1] if i + 1 < len(tokens) else ""
+        if len(piece) <= max_chars:
+            yield piece, sep
+            continue
+        parts = _split_long(piece, max_chars)
+        for j, (part, part_sep) in enumerate(parts):
+            yield part, (part_sep + sep if j == len(parts) - 1 else part_sep)
+
+def split_chunks(text, max_chars=CHUNK_CHARS, keep_paragraphs=True):
+    """→ [(chunk, trenner)]; "".join(c + t) ergibt wieder genau den Originaltext."""
+    chunks = []
+    current, current_sep = None, ""
+    for piece, sep in _pieces(text, max_chars):
+        if current is None:
+            current = piece
+        elif (len(current) + len(current_sep) + len(piece) > max_chars
+              or (keep_paragraphs and _is_paragraph(current_sep))):
+            chunks.append((current, current_sep))
+            current = piece
+        else:
+            current += current_sep + piece
+        current_sep = sep
+    if current is not None:
+        chunks.append((current, current_sep))
+    return chunks
+
+def join_chunks(translated, chunks):
+    """Übersetzte Chunks mit den Original-Trennern wieder zusammensetzen."""
+    return "".join(text + sep for text, (_, sep) in zip(translated, chunks))
+
+def split_message(text, limit=DISCORD_LIMIT):
+    """Text auf mehrere Discord-Nachrichten (je max. limit Zeichen) verteilen."""
+    if len(text) <= limit:
+        return [text]
+    return [chunk for chunk, _ in split_chunks(text, limit, keep_paragraphs=False) if chunk.strip()]
@@ -0,0 +1,196 @@
+# translation_client.py
+
+import os
+import time
+import random
+import asyncio
+from contextlib import asynccontextmanager
+import aiohttp
+from translation_backend import BackendError, REQUEST_TIMEOUT, get_backend
+
+# Gemeinsamer Client für alle Übersetzungen:
+#   - max. TRANSLATION_MAX_IN_FLIGHT gleichzeitige Requests (Semaphore)
+#   - Token-Buckets für Requests/Minute und Tokens/Minute (OPENAI_RPM / OPENAI_TPM)
+#   - Retry mit exponentiellem Backoff + Jitter, Retry-After vom Server hat Vorrang
+# Welches Backend dahinter steckt, entscheidet translation_backend (TRANSLATION_BACKEND).
+MAX_IN_FLIGHT = int(os.environ.get("TRANSLATION_MAX_IN_FLIGHT", "4"))
+RPM = int(os.environ.get("OPENAI_RPM", "3500"))
+TPM = int(os.environ.get("OPENAI_TPM", "90000"))
+MAX_RETRIES = int(os.environ.get("TRANSLATION_MAX_RETRIES", "4"))
+BACKOFF_BASE = float(os.environ.get("TRANSLATION_BACKOFF_BASE", "1.0"))
+BACKOFF_MAX = float(os.environ.get("TRANSLATION_BACKOFF_MAX", "30"))
+# Streaming: max. Pause zwischen zwei Deltas und Gesamtdauer – danach wird der Slot freigegeben
+STREAM_IDLE_TIMEOUT = float(os.environ.get("TRANSLATION_STREAM_IDLE_TIMEOUT", "20"))
+STREAM_TIMEOUT = float(os.environ.get("TRANSLATION_STREAM_TIMEOUT", "120"))
+
+class TranslationError(Exception):
+    """Übersetzung endgültig fehlgeschlagen (nach allen Retries) – darf nicht ins Log/den Cache."""
+
+def estimate_tokens(messages, max_tokens):
+    # Grobe Schätzung (ca. 4 Zeichen pro Token) + maximale Antwortlänge
+    return sum(len(m["content"]) for m in messages) // 4 + max_tokens
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = max(1, per_minute)
+        self.tokens = float(self.capacity)
+        self.rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    async def acquire(self, amount):
+        amount = min(amount, self.capacity)
+        # Lock = Warteschlange in Ankunftsreihenfolge
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def refund(self, amount):
+        self.tokens = min(self.capacity, self.tokens + max(0, amount))
+
+def classify_error(ex):
+    """→ (retry sinnvoll?, Retry-After in Sekunden oder None)"""
+    if isinstance(ex, BackendError):
+        return ex.retryable, ex.retry_after
+    if isinstance(ex, (asyncio.TimeoutError, aiohttp.ClientError)):
+        return True, None
+    return False, None
+
+class TranslationClient:
+    def __init__(self, backend=None, max_in_flight=MAX_IN_FLIGHT, rpm=RPM, tpm=TPM):
+        self.backend = backend or get_backend()
+        self._sem = asyncio.Semaphore(max_in_flight)
+        self.rpm = TokenBucket(rpm)
+        self.tpm = TokenBucket(tpm)
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0, "failed": 0, "queued": 0, "in_flight": 0}
+
+    def is_busy(self, tokens):
+        return self._sem.locked() or self.rpm.wait_time(1) > 0 or self.tpm.wait_time(tokens) > 0
+
+    @asynccontextmanager
+    async def slot(self, tokens, on_queued=None):
+        """Platz im Semaphore + Rate-Limit holen; on_queued(True/False) zeigt Warten an."""
+        queued = self.is_busy(tokens)
+        if queued:
+            self.stats["queued"] += 1
+            await _notify(on_queued, True)
+        try:
+            async with self._sem:
+                await self.rpm.acquire(1)
+                await self.tpm.acquire(tokens)
+                if queued:
+                    queued = False
+                    await _notify(on_queued, False)
+                self.stats["in_flight"] += 1
+                self.stats["requests"] += 1
+                try:
+                    yield
+                finally:
+                    self.stats["in_flight"] -= 1
+        finally:
+            if queued:
+                await _notify(on_queued, False)
+
+    async def _backoff(self, ex, attempt):
+        retryable, retry_after = classify_error(ex)
+        if not retryable or attempt >= MAX_RETRIES:
+            self.stats["failed"] += 1
+            raise TranslationError(str(ex) or ex.__class__.__name__) from ex
+        if isinstance(ex, BackendError) and ex.status == 429:
+            self.stats["rate_limited"] += 1
+        self.stats["retries"] += 1
+        # Full Jitter: zufällig zwischen 0 und der exponentiellen Obergrenze
+        delay = retry_after if retry_after is not None else random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+        await asyncio.sleep(delay)
+
+    @property
+    def model_id(self):
+        """Backend + Modell, z.B. für Cache-Schlüssel."""
+        return f"{self.backend.name}:{self.backend.model}"
+
+    async def complete(self, messages, max_tokens=500, temperature=0.0, on_queued=None):
+        tokens = estimate_tokens(messages, max_tokens)
+        attempt = 0
+        while True:
+            try:
+                async with self.slot(tokens, on_queued):
+                    text, used = await asyncio.wait_for(
+                        self.backend.complete(messages, max_tokens, temperature),
+                        REQUEST_TIMEOUT
+                    )
+                if used:
+                    self.tpm.refund(tokens - used)
+                return text
+            except Exception as ex:
+                await self._backoff(ex, attempt)
+                attempt += 1
+
+    async def stream(self, messages, max_tokens=500, temperature=0.0, on_queued=None):
+        """Liefert Text-Deltas. Retry nur, solange noch nichts angekommen ist.
+        Hängt der Stream (STREAM_IDLE_TIMEOUT ohne Delta) oder dauert zu lange (STREAM_TIMEOUT) → Timeout."""
+        tokens = estimate_tokens(messages, max_tokens)
+        attempt = 0
+        loop = asyncio.get_running_loop()
+        while True:
+            received = False
+            try:
+                async with self.slot(tokens, on_queued):
+                    deltas = self.backend.stream(messages, max_tokens, temperature)
+                    deadline = loop.time() + STREAM_TIMEOUT
+                    try:
+                        while True:
+                            remaining = deadline - loop.time()
+                            if remaining <= 0:
+                                raise asyncio.TimeoutError(f"Stream nach {STREAM_TIMEOUT:g}s abgebrochen")
+                            try:
+                                delta = await asyncio.wait_for(deltas.__anext__(), min(STREAM_IDLE_TIMEOUT, remaining))
+                            except StopAsyncIteration:
+                                break
+                            except asyncio.TimeoutError:
+                                if remaining <= STREAM_IDLE_TIMEOUT:
+                                    raise asyncio.TimeoutError(f"Stream nach {STREAM_TIMEOUT:g}s abgebrochen") from None
+                                raise asyncio.TimeoutError(f"Stream hängt (keine Daten seit {STREAM_IDLE_TIMEOUT:g}s)") from None
+                            received = True
+                            yield delta
+                    finally:
+                        await deltas.aclose()
+                return
+            except Exception as ex:
+                if received:
+                    self.stats["failed"] += 1
+                    raise TranslationError(str(ex) or ex.__class__.__name__) from ex
+                await self._backoff(ex, attempt)
+                attempt += 1
+
+    async def close(self):
+        await self.backend.close()
+
+async def _notify(callback, waiting):
+    if callback is None:
+        return
+    try:
+        await callback(waiting)
+    except Exception as e:
+        print(f"[translation_client] Fehler bei Warteschlangen-Anzeige: {e}")
+
+_client = None
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = TranslationClient()
+    return _client
@@ -0,0 +1,193 @@
+# translation_history.py
+
+import os
+import asyncio
+import bisect
+from array import array
+from datetime import datetime, timedelta
+import utils
+
+# Index über das Übersetzungs-Log (translation_log.jsonl), ohne es je komplett zu laden:
+#   - pro Eintrag nur Offset, Länge und Zeit (UTC-Epoch-Sekunden) in kompakten Arrays
+#   - Posting-Listen (Eintragsnummern) je User, je Profil und je User+Profil
+# Zeit: Feld "ts" (UTC), bei alten Einträgen aus "zeit" (Ortszeit) umgerechnet, ohne Zeit die des Vorgängers.
+# Solange die Zeiten aufsteigen, ist ein Zeitraum = Bisect auf den Zeiten, dann Bisect in der Posting-Liste.
+# Geht eine Zeit zurück (z.B. Ortszeit in der Sommerzeit-Rückstellung), filtert query() linear.
+# Neue Zeilen werden beim nächsten Zugriff inkrementell nachgelesen (nur ab dem letzten Offset).
+PAGE_SIZE = 10
+
+def time_key(zeit):
+    """"2024-05-01 13:37" (Ortszeit) → UTC-Epoch-Sekunden, None wenn unlesbar."""
+    try:
+        local = datetime(int(zeit[0:4]), int(zeit[5:7]), int(zeit[8:10]), int(zeit[11:13]), int(zeit[14:16]))
+    except (TypeError, ValueError):
+        return None
+    return int(local.timestamp())
+
+def day_key(text, end=False):
+    """"01.05.2024" oder "2024-05-01" (Ortszeit) → UTC-Sekunden für Tagesanfang bzw. -ende. ValueError bei Unsinn."""
+    text = text.strip()
+    if "." in text:
+        day, month, year = text.split(".")
+    else:
+        year, month, day = text.split("-")
+    if len(year) != 4:
+        raise ValueError(text)
+    start = datetime(int(year), int(month), int(day))
+    if end:
+        return int((start + timedelta(days=1)).timestamp()) - 1
+    return int(start.timestamp())
+
+def _posting(postings, key):
+    found = postings.get(key)
+    if found is None:
+        found = postings[key] = array("I")
+    return found
+
+class HistoryIndex:
+    def __init__(self, path):
+        self.path = path
+        self._lock = asyncio.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.offsets = array("q")
+        self.lengths = array("I")
+        self.times = array("q")
+        self.by_user = {}
+        self.by_profile = {}
+        self.by_user_profile = {}
+        self.indexed_bytes = 0
+        self.ordered = True  # Zeiten aufsteigend → Zeitraum per Bisect
+        self.max_time = 0
+        self._inode = None
+
+    def _scan_sync(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset()
+            return
+        # Datei ersetzt (Restore) oder gekürzt → komplett neu aufbauen
+        if st.st_ino != self._inode or st.st_size < self.indexed_bytes:
+            self._reset()
+            self._inode = st.st_ino
+        if st.st_size == self.indexed_bytes:
+            return
+        offsets, lengths, times = self.offsets, self.lengths, self.times
+        last_key = self.max_time
+        last_zeit, zeit_key = None, None
+        with open(self.path, "rb") as f:
+            f.seek(self.indexed_bytes)
+            offset = self.indexed_bytes
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # wird gerade geschrieben – beim nächsten Mal
+                length = len(line)
+                try:
+                    entry = utils.loads(line)
+                    user = str(entry.get("user_id"))
+                    profile = entry.get("profile") or ""
+                    ts = entry.get("ts")
+                    zeit = entry.get("zeit")
+                except (ValueError, AttributeError):
+                    offset += length
+                    continue
+                if isinstance(ts, (int, float)):
+                    key = int(ts)
+                else:
+                    # Alte Einträge ohne "ts": viele teilen sich die Minute → Umrechnung nur bei Wechsel
+                    if zeit != last_zeit:
+                        last_zeit, zeit_key = zeit, time_key(zeit)
+                    key = zeit_key
+                if key is None:
+                    key = last_key  # ohne Zeit: das Log wird chronologisch geschrieben
+                elif key < last_key:
+                    self.ordered = False
+                last_key = max(last_key, key)
+                i = len(offsets)
+                offsets.append(offset)
+                lengths.append(length)
+                times.append(key)
+                _posting(self.by_user, user).append(i)
+                _posting(self.by_profile, profile).append(i)
+                _posting(self.by_user_profile, (user, profile)).append(i)
+                offset += length
+        self.indexed_bytes = offset
+        self.max_time = last_key
+
+    async def refresh(self):
+        async with self._lock:
+            await asyncio.to_thread(self._scan_sync)
+
+    async def query(self, user_id=None, profile=None, date_from=None, date_to=None):
+        """→ HistoryResult (nur Eintragsnummern, gelesen wird erst pro Seite)."""
+        await self.refresh()
+        async with self._lock:
+            if user_id is not None and profile is not None:
+                postings = self.by_user_profile.get((str(user_id), profile), array("I"))
+            elif user_id is not None:
+                postings = self.by_user.get(str(user_id), array("I"))
+            elif profile is not None:
+                postings = self.by_profile.get(profile, array("I"))
+            else:
+                postings = range(len(self.offsets))
+            if not self.ordered and (date_from or date_to):
+                # Zeiten nicht sortiert → Bisect wäre falsch, also linear filtern
+                times = self.times
+                lo = date_from or 0
+                hi = date_to if date_to else float("inf")
+                matches = array("I", (i for i in postings if lo <= times[i] <= hi))
+                return HistoryResult(self, matches, 0, len(matches))
+            # Zeitraum → Bereich der Eintragsnummern → Bereich in der Posting-Liste
+            lo = bisect.bisect_left(self.times, date_from) if date_from else 0
+            hi = bisect.bisect_right(self.times, date_to) if date_to else len(self.times)
+            start = bisect.bisect_left(postings, lo)
+            end = bisect.bisect_left(postings, hi)
+            return HistoryResult(self, postings, start, end)
+
+    def profiles(self):
+        return sorted(p for p in self.by_profile if p)
+
+    def _read_sync(self, positions):
+        entries = []
+        with open(self.path, "rb") as f:
+            for offset, length in positions:
+                f.seek(offset)
+                try:
+                    entries.append(utils.loads(f.read(length)))
+                except ValueError:
+                    continue
+        return entries
+
+    async def read(self, positions):
+        """[(offset, länge)] → Einträge; liest nur genau diese Zeilen."""
+        return await asyncio.to_thread(self._read_sync, positions)
+
+class HistoryResult:
+    """Treffer als Ausschnitt [start, end) einer Posting-Liste, neueste zuerst."""
+    def __init__(self, index, postings, start, end):
+        self.index = index
+        # Arrays festhalten – ein Neuaufbau (Restore) ändert diese Treffer nicht mehr
+        self.offsets = index.offsets
+        self.lengths = index.lengths
+        self.postings = postings
+        self.start = start
+        self.end = end
+
+    @property
+    def total(self):
+        return self.end - self.start
+
+    @property
+    def pages(self):
+        return max(1, -(-self.total // PAGE_SIZE))
+
+    async def page(self, number):
+        top = self.end - number * PAGE_SIZE
+        bottom = max(self.start, top - PAGE_SIZE)
+        positions = [
+            (self.offsets[self.postings[i]], self.lengths[self.postings[i]])
+            for i in range(top - 1, bottom - 1, -1)
+        ]
+        return await self.index.read(positions)
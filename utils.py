@@ -3,6 +3,9 @@ import json
 import os
 import aiofiles
 import asyncio
+import sqlite3
+import threading
+import zlib
 from datetime import datetime, timezone
 
 # ========== Rechte-Prüfungen ==========
@@ -12,6 +15,10 @@ def is_admin(member: discord.Member) -> bool:
         return member.guild_permissions.administrator
     return False
 
+def is_authorized(interaction: discord.Interaction) -> bool:
+    """Admin oder vom Rechte-Gate (bot.GuardedTree) über commands_permissions.json freigegeben."""
+    return is_admin(interaction.user) or bool(interaction.extras.get("authorized"))
+
 def has_role(member: discord.Member, role_id: int) -> bool:
     return any(role.id == role_id for role in getattr(member, "roles", []))
 
@@ -33,41 +40,938 @@ def mention_roles(guild: discord.Guild, role_ids: list[int]) -> str:
 
 # ========== JSON-Handling (async) ==========
 
+# Prozessweiter Dokument-Cache: einmal geparste JSON-Dateien bleiben im Speicher.
+# Rausgegeben werden immer Kopien, damit ein Cog das gecachte Objekt nicht verändert.
+_DOC_CACHE = {}
+# Zuletzt tatsächlich gespeicherter Stand je Dokument (für zeilenweise Updates im Backend)
+_PERSISTED = {}
+
+def _cache_key(path: str) -> str:
+    return os.path.normpath(path)
+
+def _copy_doc(obj):
+    # Schneller als copy.deepcopy, reicht für JSON-Daten (dict/list/Skalare)
+    if isinstance(obj, dict):
+        return {k: _copy_doc(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_copy_doc(v) for v in obj]
+    return obj
+
+def invalidate_cache(path: str = None):
+    """Verwirft den Cache für eine Datei (oder komplett), z.B. nach einem Restore."""
+    if path is None:
+        _DOC_CACHE.clear()
+        _PERSISTED.clear()
+        _DIRTY.clear()
+    else:
+        _DOC_CACHE.pop(_cache_key(path), None)
+        _PERSISTED.pop(_cache_key(path), None)
+        _DIRTY.discard(_cache_key(path))
+
+_MISSING = object()
+
+class CorruptDocument(RuntimeError):
+    """Dokument existiert, lässt sich aber nicht lesen – darf nicht als leer behandelt werden."""
+
+async def _load_document(path: str):
+    """Liefert das gecachte Dokument (ohne Kopie!) oder _MISSING."""
+    key = _cache_key(path)
+    if key in _DOC_CACHE:
+        return _DOC_CACHE[key]
+    try:
+        data = await get_backend().read(key)
+    except Exception as e:
+        # Kein stilles "leer" mehr: sonst überschreibt das nächste save_json die echten Daten
+        print(f"[utils.load_json] Fehler beim Lesen von {key}: {e}")
+        raise
+    if data is _MISSING:
+        return _MISSING
+    # Während des Lesens kann jemand gespeichert haben – dann gewinnt der Cache
+    if key not in _DOC_CACHE:
+        _DOC_CACHE[key] = _PERSISTED[key] = data
+    return _DOC_CACHE[key]
+
 async def load_json(path: str, fallback=None):
-    if not os.path.exists(path):
+    doc = await _load_document(path)
+    if doc is _MISSING:
         return fallback if fallback is not None else {}
-    try:
-        async with aiofiles.open(path, "r", encoding="utf-8") as f:
+    return _copy_doc(doc)
+
+async def save_json(path: str, data, expected_version: int = None):
+    key = _cache_key(path)
+    # Optimistische Versionierung: nur speichern, wenn seit dem Laden niemand geschrieben hat
+    if expected_version is not None and _DOC_VERSIONS.get(key, 0) != expected_version:
+        raise VersionConflict(f"{path} wurde zwischenzeitlich geändert (Version {_DOC_VERSIONS.get(key, 0)} statt {expected_version}).")
+    _DOC_VERSIONS[key] = _DOC_VERSIONS.get(key, 0) + 1
+    # Write-through: Cache sofort aktualisieren, dann auf die Platte schreiben
+    _DOC_CACHE[key] = _copy_doc(data)
+    WRITE_STATS["requested"] += 1
+    if WRITE_BEHIND:
+        # Write-behind: nur als "dirty" markieren, der Flusher schreibt gesammelt
+        _DIRTY.add(key)
+        _ensure_flusher()
+        return
+    await _write_document(key)
+
+# ========== Transaktionen (Read-Modify-Write) ==========
+
+# Pro Dokument ein eigener Lock + Versionszähler: gleiche Datei → serialisiert,
+# verschiedene Dateien → laufen parallel.
+_DOC_VERSIONS = {}
+_DOC_LOCKS = {}
+
+class VersionConflict(RuntimeError):
+    """Dokument wurde zwischen Laden und Speichern von jemand anderem geändert."""
+
+def get_version(path: str) -> int:
+    return _DOC_VERSIONS.get(_cache_key(path), 0)
+
+async def load_json_versioned(path: str, fallback=None):
+    """Wie load_json, liefert zusätzlich die Version für save_json(expected_version=...)."""
+    doc = await _load_document(path)
+    version = get_version(path)
+    if doc is _MISSING:
+        return _copy_doc(fallback if fallback is not None else {}), version
+    return _copy_doc(doc), version
+
+def _doc_lock(key: str) -> asyncio.Lock:
+    lock = _DOC_LOCKS.get(key)
+    if lock is None:
+        lock = _DOC_LOCKS[key] = asyncio.Lock()
+    return lock
+
+class JsonTransaction:
+    """
+    async with utils.json_transaction(PATH, {}) as tx:
+        tx.data["x"] = 1
+    Lädt unter dem Dokument-Lock, speichert beim Verlassen (nur wenn geändert
+    und keine Exception aufgetreten ist). tx.data darf auch neu zugewiesen werden.
+    """
+
+    def __init__(self, path: str, fallback=None):
+        self.path = path
+        self.fallback = fallback
+        self.data = None
+        self.version = 0
+        self._original = None
+        self._lock = _doc_lock(_cache_key(path))
+
+    async def __aenter__(self):
+        await self._lock.acquire()
+        try:
+            self.data, self.version = await load_json_versioned(self.path, self.fallback)
+            self._original = _copy_doc(self.data)
+        except BaseException:
+            self._lock.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None and self.data != self._original:
+                await save_json(self.path, self.data, expected_version=self.version)
+        finally:
+            self._lock.release()
+        return False
+
+def json_transaction(path: str, fallback=None) -> JsonTransaction:
+    return JsonTransaction(path, fallback)
+
+# ========== Write-Behind (optional, per .env) ==========
+
+# PERSIST_WRITE_BEHIND=1 → save_json schreibt nicht sofort, sondern fasst Bursts
+# pro Dokument zu einem Schreibvorgang je PERSIST_FLUSH_INTERVAL Sekunden zusammen.
+WRITE_BEHIND = os.environ.get("PERSIST_WRITE_BEHIND", "0").lower() in ("1", "true", "yes", "on")
+FLUSH_INTERVAL = float(os.environ.get("PERSIST_FLUSH_INTERVAL", "2"))
+
+WRITE_STATS = {"requested": 0, "performed": 0}
+_DIRTY = set()
+_WRITE_LOCKS = {}
+_flush_task = None
+
+def _write_lock(key: str) -> asyncio.Lock:
+    lock = _WRITE_LOCKS.get(key)
+    if lock is None:
+        lock = _WRITE_LOCKS[key] = asyncio.Lock()
+    return lock
+
+async def _write_document(key: str) -> bool:
+    """Schreibt den aktuellen Cache-Stand eines Dokuments ins Storage-Backend."""
+    async with _write_lock(key):
+        if key not in _DOC_CACHE:
+            return False
+        # Immer den neuesten Stand schreiben – ältere Zwischenstände sind egal
+        data = _DOC_CACHE[key]
+        try:
+            await get_backend().write(key, data, _PERSISTED.get(key, _MISSING))
+        except Exception as e:
+            print(f"[utils.save_json] Fehler beim Speichern von {key}: {e}")
+            return False
+        _PERSISTED[key] = data
+        WRITE_STATS["performed"] += 1
+        return True
+
+def _ensure_flusher():
+    global _flush_task
+    if _flush_task is None or _flush_task.done():
+        _flush_task = asyncio.get_running_loop().create_task(_flush_loop())
+
+async def _flush_loop():
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL)
+        await flush_all()
+
+async def flush_all():
+    """Schreibt alle noch offenen (dirty) Dokumente sofort weg."""
+    failed = set()
+    for key in list(_DIRTY):
+        _DIRTY.discard(key)
+        try:
+            ok = await _write_document(key)
+        except asyncio.CancelledError:
+            _DIRTY.add(key)
+            raise
+        if not ok and key in _DOC_CACHE:
+            failed.add(key)
+    # Fehlgeschlagene beim nächsten Durchlauf erneut versuchen
+    _DIRTY.update(failed)
+
+async def stop_flusher():
+    """Beendet den Hintergrund-Flusher und schreibt alles Offene weg (Shutdown/Unload)."""
+    global _flush_task
+    task, _flush_task = _flush_task, None
+    # Task aus einem bereits geschlossenen Loop (z.B. nach bot.run) nur noch verwerfen
+    if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await flush_all()
+    journal = get_journal()
+    if journal:
+        await journal.checkpoint(force=True)
+
+def get_write_stats() -> dict:
+    """Angeforderte vs. tatsächlich ausgeführte Schreibvorgänge."""
+    requested = WRITE_STATS["requested"]
+    performed = WRITE_STATS["performed"]
+    pending = len(_DIRTY)
+    journal = get_journal()
+    return {
+        "requested": requested,
+        "performed": performed,
+        "coalesced": max(requested - performed - pending, 0),
+        "pending": pending,
+        "journal": journal.mode if journal else "off",
+        "journal_records": journal.stats["records"] if journal else 0,
+        "journal_fsyncs": journal.stats["fsyncs"] if journal else 0,
+    }
+
+# ========== Serializer ==========
+
+# orjson ist optional: wenn installiert, deutlich schneller beim (De-)Serialisieren,
+# sonst Standard-json. Die Ausgabe ist in beiden Fällen UTF-8 und gegenseitig lesbar.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Dokumente ohne Einrückung speichern (Dateinamen, kommagetrennt, oder "*" für alle)
+COMPACT_DOCS = {
+    name.strip() for name in os.environ.get("PERSIST_COMPACT", "").split(",") if name.strip()
+}
+# Ab dieser Größe (Bytes) wird im Worker-Thread (de-)serialisiert statt im Event-Loop
+SERIALIZE_THREAD_BYTES = int(os.environ.get("PERSIST_SERIALIZE_THREAD_BYTES", str(256 * 1024)))
+# Zuletzt serialisierte Größe je Dokument → Schätzung, ob der nächste Dump in den Thread gehört
+_LAST_SIZE = {}
+
+def dumps(data, compact: bool = False) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+def loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def is_compact(path: str) -> bool:
+    return "*" in COMPACT_DOCS or os.path.basename(path) in COMPACT_DOCS
+
+def set_compact(path: str, enabled: bool = True):
+    """Schaltet den kompakten Speichermodus für ein Dokument ein/aus (greift beim nächsten Schreiben)."""
+    name = os.path.basename(path)
+    if enabled:
+        COMPACT_DOCS.add(name)
+    else:
+        COMPACT_DOCS.discard(name)
+
+async def encode_document(key: str, data, compact: bool | None = None) -> bytes:
+    compact = is_compact(key) if compact is None else compact
+    if _LAST_SIZE.get(key, 0) >= SERIALIZE_THREAD_BYTES:
+        raw = await asyncio.to_thread(dumps, data, compact)
+    else:
+        raw = dumps(data, compact)
+    _LAST_SIZE[key] = len(raw)
+    return raw
+
+async def decode_document(raw):
+    if len(raw) >= SERIALIZE_THREAD_BYTES:
+        return await asyncio.to_thread(loads, raw)
+    return loads(raw)
+
+# ========== Storage-Backends ==========
+
+# PERSIST_BACKEND=json (Standard): ein JSON-File pro Dokument, wird komplett neu geschrieben.
+# PERSIST_BACKEND=sqlite: eine lokale SQLite-Datei (WAL), dict-Dokumente liegen zeilenweise
+# (ein Top-Level-Key = eine Zeile), ein Update schreibt nur die geänderten Zeilen.
+PERSIST_BACKEND = os.environ.get("PERSIST_BACKEND", "json").lower()
+SQLITE_PATH = os.environ.get("PERSIST_SQLITE_PATH", os.path.join("persistent_data", "bot.sqlite3"))
+
+class JsonFileBackend:
+    name = "json"
+
+    async def read(self, key: str):
+        journal = get_journal()
+        if journal:
+            await journal.recover()
+        if not os.path.exists(key):
+            return _MISSING
+        async with aiofiles.open(key, "rb") as f:
             content = await f.read()
-            return json.loads(content)
-    except Exception:
-        return fallback if fallback is not None else {}
+        _LAST_SIZE[key] = len(content)
+        try:
+            return await decode_document(content)
+        except ValueError as e:
+            raise CorruptDocument(f"{key}: {e}") from e
 
-async def save_json(path: str, data):
-    tmp_path = path + ".tmp"
-    try:
+    async def write(self, key: str, data, previous=_MISSING):
+        content = await encode_document(key, data)
+        journal = get_journal()
+        if journal:
+            # Erst den Journal-Eintrag dauerhaft machen, dann die Datei ersetzen
+            seq = await journal.log(key, content)
+            try:
+                await self._replace(key, content)
+            except BaseException:
+                journal.done(seq, key, False)
+                raise
+            journal.done(seq, key, True)
+            await journal.checkpoint()
+        else:
+            await self._replace(key, content)
+
+    async def _replace(self, key: str, content: bytes):
+        tmp_path = key + ".tmp"
         # Ordner anlegen, falls er nicht existiert!
-        folder = os.path.dirname(path)
+        folder = os.path.dirname(key)
         if folder and not os.path.exists(folder):
             os.makedirs(folder, exist_ok=True)
-
-        async with aiofiles.open(tmp_path, "w", encoding="utf-8") as f:
-            await f.write(json.dumps(data, ensure_ascii=False, indent=2))
+        async with aiofiles.open(tmp_path, "wb") as f:
+            await f.write(content)
         # Atomar ersetzen, aber hier synchron (aiofiles.os gibt es nicht!)
-        os.replace(tmp_path, path)
-    except Exception as e:
-        print(f"[utils.save_json] Fehler beim Speichern von {path}: {e}")
+        os.replace(tmp_path, key)
+
+    async def exists(self, key: str) -> bool:
+        return os.path.exists(key)
+
+class SqliteBackend:
+    name = "sqlite"
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn = None
+        # sqlite3-Verbindung wird aus Worker-Threads genutzt → selbst serialisieren
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            folder = os.path.dirname(self.db_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " doc TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL)"  # 'dict' = zeilenweise, 'value' = ganzes Dokument in einer Zeile
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " doc TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " PRIMARY KEY (doc, key)) WITHOUT ROWID"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _read_sync(self, key):
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT kind FROM documents WHERE doc = ?", (key,)).fetchone()
+            if row is None:
+                return _MISSING
+            rows = conn.execute("SELECT key, value FROM entries WHERE doc = ?", (key,)).fetchall()
+        if row[0] == "dict":
+            return {k: loads(v) for k, v in rows}
+        return loads(rows[0][1]) if rows else None
+
+    def _write_sync(self, key, kind, upserts, deletes, replace_all):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT INTO documents (doc, kind) VALUES (?, ?) "
+                    "ON CONFLICT(doc) DO UPDATE SET kind = excluded.kind",
+                    (key, kind)
+                )
+                if replace_all:
+                    conn.execute("DELETE FROM entries WHERE doc = ?", (key,))
+                elif deletes:
+                    conn.executemany("DELETE FROM entries WHERE doc = ? AND key = ?", [(key, k) for k in deletes])
+                if upserts:
+                    conn.executemany(
+                        "INSERT INTO entries (doc, key, value) VALUES (?, ?, ?) "
+                        "ON CONFLICT(doc, key) DO UPDATE SET value = excluded.value",
+                        [(key, k, v) for k, v in upserts]
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    async def read(self, key: str):
+        try:
+            return await asyncio.to_thread(self._read_sync, key)
+        except ValueError as e:
+            raise CorruptDocument(f"{key}: {e}") from e
+
+    async def write(self, key: str, data, previous=_MISSING):
+        # Diff gegen den zuletzt gespeicherten Stand: nur geänderte Top-Level-Keys schreiben
+        if isinstance(data, dict):
+            if isinstance(previous, dict):
+                upserts = [
+                    (k, dumps(v, compact=True).decode("utf-8"))
+                    for k, v in data.items() if k not in previous or previous[k] != v
+                ]
+                deletes = [k for k in previous if k not in data]
+                replace_all = False
+            else:
+                upserts = [(k, dumps(v, compact=True).decode("utf-8")) for k, v in data.items()]
+                deletes = []
+                replace_all = True
+            if not upserts and not deletes and not replace_all:
+                return
+            await asyncio.to_thread(self._write_sync, key, "dict", upserts, deletes, replace_all)
+        else:
+            value = dumps(data, compact=True).decode("utf-8")
+            await asyncio.to_thread(self._write_sync, key, "value", [("", value)], [], True)
+
+    def _exists_sync(self, key):
+        with self._lock:
+            return self._connect().execute("SELECT 1 FROM documents WHERE doc = ?", (key,)).fetchone() is not None
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._exists_sync, key)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+_backend = None
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if PERSIST_BACKEND == "sqlite":
+            _backend = SqliteBackend(SQLITE_PATH)
+        else:
+            if PERSIST_BACKEND != "json":
+                print(f"[utils] Unbekanntes PERSIST_BACKEND '{PERSIST_BACKEND}', nutze JSON-Dateien.")
+            _backend = JsonFileBackend()
+    return _backend
+
+def _is_stream(path: str) -> bool:
+    # *.jsonl sind Append-Only-Streams (siehe unten) und liegen immer als Datei vor
+    return path.endswith(".jsonl")
+
+async def document_exists(path: str) -> bool:
+    if _is_stream(path):
+        return os.path.exists(path)
+    key = _cache_key(path)
+    return key in _DOC_CACHE or await get_backend().exists(key)
+
+def document_file(path: str) -> str | None:
+    """Pfad der Datei, wenn das Dokument aktuell 1:1 als Datei auf der Platte liegt (sonst None)."""
+    if _is_stream(path) or (get_backend().name == "json" and _cache_key(path) not in _DIRTY):
+        return path if os.path.exists(path) else None
+    return None
+
+async def export_document(path: str, dst: str):
+    """Schreibt ein Dokument (egal aus welchem Backend) als JSON-Datei nach dst, z.B. für Backups."""
+    if document_file(path):
+        return await atomic_copy(path, dst)
+    data = await load_json(path)
+    content = await encode_document(_cache_key(path), data)
+    async with aiofiles.open(dst, "wb") as f:
+        await f.write(content)
+
+async def _checkpoint_before_restore(journal) -> bool:
+    """Journal leeren; solange noch Schreibvorgänge (anderer Dokumente) laufen, kurz warten und erneut versuchen."""
+    deadline = asyncio.get_running_loop().time() + RESTORE_CHECKPOINT_TIMEOUT
+    while not await journal.checkpoint(force=True):
+        if asyncio.get_running_loop().time() >= deadline:
+            return False
+        await asyncio.sleep(0.05)
+    return True
+
+async def import_document(src: str, path: str):
+    """Übernimmt eine JSON-Datei (z.B. aus einem Backup) als Dokument ins aktive Backend."""
+    if _is_stream(path) or get_backend().name == "json":
+        key = _cache_key(path)
+        # Dokument-Lock + Schreib-Lock: keine Transaktion und kein Schreibvorgang auf dieses Dokument
+        # läuft parallel, also auch kein neuer Journal-Eintrag dafür
+        async with _doc_lock(key), _write_lock(key):
+            # Alte Journal-Einträge dürfen den Restore beim nächsten Start nicht überschreiben –
+            # klappt der Checkpoint nicht, wird nicht wiederhergestellt
+            journal = get_journal()
+            if journal and not _is_stream(path) and not await _checkpoint_before_restore(journal):
+                print(f"[utils.import_document] Journal ließ sich nicht leeren, Restore von {path} abgebrochen.")
+                return False
+            ok = await atomic_copy(src, path)
+            invalidate_cache(path)
+            # Restore zählt als Änderung (Transaktionen/Indizes, die auf die Version schauen)
+            _DOC_VERSIONS[key] = _DOC_VERSIONS.get(key, 0) + 1
+            return ok
+    async with aiofiles.open(src, "rb") as f:
+        data = await decode_document(await f.read())
+    await save_json(path, data)
+
+async def migrate_json_to_sqlite(folder: str = "persistent_data", overwrite: bool = False) -> int:
+    """
+    Einmal-Import: übernimmt alle *.json-Dateien aus folder ins SQLite-Backend.
+    Bereits vorhandene Dokumente werden nur mit overwrite=True ersetzt.
+    """
+    backend = get_backend()
+    if backend.name != "sqlite" or not os.path.isdir(folder):
+        return 0
+    imported = 0
+    for fname in sorted(os.listdir(folder)):
+        if not fname.endswith(".json"):
+            continue
+        key = _cache_key(os.path.join(folder, fname))
+        if not overwrite and await backend.exists(key):
+            continue
+        try:
+            async with aiofiles.open(key, "rb") as f:
+                data = await decode_document(await f.read())
+        except Exception as e:
+            print(f"[utils.migrate_json_to_sqlite] {fname} übersprungen: {e}")
+            continue
+        await backend.write(key, data)
+        _DOC_CACHE.pop(key, None)
+        _PERSISTED.pop(key, None)
+        imported += 1
+    return imported
+
+# ========== Write-Ahead-Journal (JSON-Backend) ==========
+
+# Jeder Schreibvorgang landet zuerst als vollständiger Redo-Eintrag (fsync!) im Journal,
+# erst danach wird die Dokument-Datei ersetzt und ein Commit-Marker angehängt.
+# Beim Start werden nicht committete Einträge nachgespielt, ein abgerissener letzter
+# Eintrag (Crash während des Journal-Schreibens) wird verworfen.
+#   PERSIST_JOURNAL=on     (Standard) ein fsync pro Schreibvorgang
+#   PERSIST_JOURNAL=group  mehrere Schreibvorgänge teilen sich einen fsync (Group Commit)
+#   PERSIST_JOURNAL=off    kein Journal
+# SQLite bringt mit WAL sein eigenes Journal mit, dort ist das hier immer aus.
+JOURNAL_MODE = os.environ.get("PERSIST_JOURNAL", "on").lower()
+JOURNAL_PATH = os.environ.get("PERSIST_JOURNAL_PATH", os.path.join("persistent_data", "journal.wal"))
+JOURNAL_GROUP_WINDOW = float(os.environ.get("PERSIST_JOURNAL_GROUP_MS", "5")) / 1000
+JOURNAL_MAX_BYTES = int(os.environ.get("PERSIST_JOURNAL_MAX_BYTES", str(4 * 1024 * 1024)))
+# Restore wartet höchstens so lange (Sekunden) auf einen Journal-Checkpoint, sonst wird abgebrochen
+RESTORE_CHECKPOINT_TIMEOUT = float(os.environ.get("PERSIST_RESTORE_CHECKPOINT_TIMEOUT", "5"))
+
+def _journal_frame(seq: int, key: str, raw: bytes) -> bytes:
+    # Kopfzeile "W <seq> <länge> <crc32> <key>", danach die Rohdaten des Dokuments
+    header = b"W %d %d %08x " % (seq, len(raw), zlib.crc32(raw)) + dumps(key, compact=True)
+    return header + b"\n" + raw + b"\n"
+
+def _document_matches(key: str, raw: bytes) -> bool:
+    # Byte-genau statt nur "parst": ein committeter Eintrag, dessen rename den Crash nicht
+    # überlebt hat (Verzeichnis nicht gesynct), hinterlässt die alte, aber gültige Datei
+    try:
+        with open(key, "rb") as f:
+            return f.read() == raw
+    except OSError:
+        return False
+
+def _write_file_sync(key: str, raw: bytes):
+    folder = os.path.dirname(key)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = key + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, key)
+
+def _fsync_path(path: str):
+    try:
+        with open(path, "rb") as f:
+            os.fsync(f.fileno())
+    except OSError:
+        pass
+
+def _recover_journal_sync(path: str) -> int:
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as f:
+        buf = f.read()
+    latest = {}
+    committed = set()
+    pos = 0
+    while pos < len(buf):
+        nl = buf.find(b"\n", pos)
+        if nl == -1:
+            break
+        header = buf[pos:nl].split(b" ", 4)
+        try:
+            if header[0] == b"C":
+                committed.add(int(header[1]))
+                pos = nl + 1
+                continue
+            if header[0] != b"W" or len(header) != 5:
+                break
+            seq, length, crc = int(header[1]), int(header[2]), int(header[3], 16)
+            key = loads(header[4])
+        except (ValueError, IndexError):
+            break
+        raw = buf[nl + 1:nl + 1 + length]
+        if len(raw) < length or zlib.crc32(raw) != crc:
+            break  # Abgerissener Eintrag: wurde nie angewendet → verwerfen (Rollback)
+        latest[key] = (seq, raw)
+        pos = nl + 1 + length + 1
+    replayed = 0
+    for key, (seq, raw) in latest.items():
+        if seq in committed and _document_matches(key, raw):
+            continue
+        _write_file_sync(key, raw)
+        replayed += 1
+    # Alles angewendet → Journal leeren
+    with open(path, "wb") as f:
+        os.fsync(f.fileno())
+    return replayed
+
+class WriteAheadJournal:
+    def __init__(self, path: str, mode: str, group_window: float):
+        self.path = path
+        self.mode = mode
+        self.group_window = group_window
+        self.stats = {"records": 0, "fsyncs": 0, "replayed": 0}
+        self._fh = None
+        self._seq = 0
+        self._bytes = 0
+        self._queue = []      # (frame, future): warten auf den gemeinsamen fsync (group)
+        self._commits = []    # Commit-Marker, gehen mit dem nächsten Schreiben raus
+        self._inflight = 0    # geloggt, aber noch nicht angewendet
+        self._applied = set() # seit dem letzten Checkpoint ersetzte Dateien
+        self._io_lock = asyncio.Lock()
+        self._recover_lock = asyncio.Lock()
+        self._recovered = False
+        self._group_task = None
+
+    async def recover(self) -> int:
+        """Spielt offene Einträge nach (einmal pro Prozess, vor dem ersten Lesen/Schreiben)."""
+        if self._recovered:
+            return 0
+        async with self._recover_lock:
+            if self._recovered:
+                return 0
+            replayed = await asyncio.to_thread(_recover_journal_sync, self.path)
+            self._recovered = True
+            self.stats["replayed"] += replayed
+            return replayed
+
+    def _append_sync(self, data: bytes):
+        if self._fh is None:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._fh = open(self.path, "ab")
+        self._fh.write(data)
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    async def log(self, key: str, raw: bytes) -> int:
+        await self.recover()
+        self._seq += 1
+        seq = self._seq
+        frame = _journal_frame(seq, key, raw)
+        self._inflight += 1
+        try:
+            if self.mode == "group":
+                fut = asyncio.get_running_loop().create_future()
+                self._queue.append((frame, fut))
+                if self._group_task is None:
+                    self._group_task = asyncio.get_running_loop().create_task(self._group_commit())
+                await fut
+            else:
+                async with self._io_lock:
+                    data = b"".join(self._commits) + frame
+                    self._commits.clear()
+                    await asyncio.to_thread(self._append_sync, data)
+                    self._bytes += len(data)
+                    self.stats["fsyncs"] += 1
+        except BaseException:
+            self._inflight -= 1
+            raise
+        self.stats["records"] += 1
+        return seq
+
+    async def _group_commit(self):
+        await asyncio.sleep(self.group_window)
+        async with self._io_lock:
+            batch, self._queue = self._queue, []
+            # Neue Einträge ab hier starten die nächste Runde
+            self._group_task = None
+            data = b"".join(self._commits) + b"".join(frame for frame, _ in batch)
+            self._commits.clear()
+            try:
+                await asyncio.to_thread(self._append_sync, data)
+            except Exception as e:
+                print(f"[utils.journal] Fehler beim Schreiben des Journals: {e}")
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                return
+            self._bytes += len(data)
+            self.stats["fsyncs"] += 1
+        for _, fut in batch:
+            if not fut.done():
+                fut.set_result(None)
+
+    def done(self, seq: int, key: str, ok: bool):
+        self._inflight -= 1
+        if ok:
+            self._commits.append(b"C %d\n" % seq)
+            self._applied.add(key)
+
+    def _checkpoint_sync(self, applied):
+        # Erst die ersetzten Dateien dauerhaft machen, dann darf das Journal weg
+        for key in applied:
+            _fsync_path(key)
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        with open(self.path, "wb") as f:
+            os.fsync(f.fileno())
+
+    async def checkpoint(self, force: bool = False) -> bool:
+        """Leert das Journal, sobald es zu groß ist (oder force) und nichts mehr offen ist."""
+        if not force and self._bytes < JOURNAL_MAX_BYTES:
+            return False
+        async with self._io_lock:
+            if self._inflight or self._queue or not self._recovered:
+                return False
+            applied, self._applied = self._applied, set()
+            try:
+                await asyncio.to_thread(self._checkpoint_sync, applied)
+            except Exception as e:
+                self._applied |= applied
+                print(f"[utils.journal] Fehler beim Checkpoint: {e}")
+                return False
+            self._commits.clear()
+            self._bytes = 0
+            return True
+
+_journal = None
+
+def get_journal() -> WriteAheadJournal | None:
+    global _journal
+    if JOURNAL_MODE == "off" or get_backend().name != "json":
+        return None
+    if _journal is None:
+        mode = JOURNAL_MODE
+        if mode not in ("on", "group"):
+            print(f"[utils] Unbekanntes PERSIST_JOURNAL '{mode}', nutze 'on'.")
+            mode = "on"
+        _journal = WriteAheadJournal(JOURNAL_PATH, mode, JOURNAL_GROUP_WINDOW)
+    return _journal
+
+async def recover_journal() -> int:
+    """Recovery beim Start: nicht abgeschlossene Schreibvorgänge nachspielen → Anzahl."""
+    journal = get_journal()
+    return await journal.recover() if journal else 0
+
+async def check_document(path: str) -> bool:
+    """False, wenn das Dokument existiert, aber beschädigt ist."""
+    try:
+        await get_backend().read(_cache_key(path))
+        return True
+    except CorruptDocument:
+        return False
+
+def quarantine_document(path: str) -> str | None:
+    """Verschiebt eine beschädigte Dokument-Datei beiseite (<datei>.corrupt-<timestamp>)."""
+    key = _cache_key(path)
+    if get_backend().name != "json" or not os.path.exists(key):
+        return None
+    target = f"{key}.corrupt-{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
+    os.replace(key, target)
+    invalidate_cache(path)
+    return target
+
+# ========== Append-Only JSONL-Streams ==========
+
+# Für Logs, die nur wachsen: eine Zeile pro Eintrag, Anhängen kostet O(1)
+# statt die komplette Datei neu zu schreiben.
+
+async def append_jsonl(path: str, entry):
+    line = dumps(entry, compact=True) + b"\n"
+    async with _write_lock(_cache_key(path)):
+        try:
+            folder = os.path.dirname(path)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder, exist_ok=True)
+            async with aiofiles.open(path, "ab") as f:
+                await f.write(line)
+        except Exception as e:
+            print(f"[utils.append_jsonl] Fehler beim Schreiben nach {path}: {e}")
+
+def _repair_jsonl_sync(path):
+    with open(path, "rb+") as f:
+        f.seek(0, 2)
+        end = f.tell()
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        # Abgerissene letzte Zeile (Crash beim Schreiben) abschneiden
+        pos = end
+        while pos > 0:
+            step = min(65536, pos)
+            pos -= step
+            f.seek(pos)
+            idx = f.read(step).rfind(b"\n")
+            if idx != -1:
+                f.truncate(pos + idx + 1)
+                return
+        f.truncate(0)
+
+async def repair_jsonl(path: str):
+    """Schneidet eine unvollständige letzte Zeile ab, damit neue Einträge sauber anschließen."""
+    if os.path.exists(path):
+        async with _write_lock(_cache_key(path)):
+            await asyncio.to_thread(_repair_jsonl_sync, path)
+
+def _tail_jsonl_sync(path, max_bytes):
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        end = f.tell()
+        start = max(0, end - max_bytes)
+        f.seek(start)
+        data = f.read()
+    if start > 0:
+        # Erste (angeschnittene) Zeile verwerfen
+        data = data[data.find(b"\n") + 1:]
+    entries = []
+    for line in data.splitlines():
+        try:
+            entries.append(loads(line))
+        except ValueError:
+            continue
+    return entries
+
+async def tail_jsonl(path: str, max_bytes: int = 8 * 1024 * 1024) -> list:
+    """Liest die letzten max_bytes eines JSONL-Streams (chronologisch, kaputte Zeilen werden übersprungen)."""
+    if not os.path.exists(path):
+        return []
+    return await asyncio.to_thread(_tail_jsonl_sync, path, max_bytes)
 
 # ========== Atomic File Copy (z.B. für Backups) ==========
 
-async def atomic_copy(src: str, dst: str):
+# Kopien laufen im Worker-Thread, blockweise (Kernel-seitig per sendfile, wo verfügbar),
+# in eine .tmp-Datei, die erst danach atomar umbenannt wird → kein halbes Backup bei Absturz.
+COPY_CHUNK_SIZE = 1024 * 1024
+COPY_FSYNC = os.environ.get("PERSIST_COPY_FSYNC", "0").lower() in ("1", "true", "yes", "on")
+COPY_WORKERS = max(1, int(os.environ.get("PERSIST_COPY_WORKERS", "4")))
+
+def _copy_file_sync(src: str, dst: str, fsync: bool):
+    folder = os.path.dirname(dst)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = dst + ".tmp"
     try:
-        async with aiofiles.open(src, "rb") as fsrc:
-            data = await fsrc.read()
-        async with aiofiles.open(dst, "wb") as fdst:
-            await fdst.write(data)
+        with open(src, "rb") as fsrc, open(tmp_path, "wb") as fdst:
+            size = os.fstat(fsrc.fileno()).st_size
+            offset = 0
+            if hasattr(os, "sendfile"):
+                try:
+                    while offset < size:
+                        sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, min(COPY_CHUNK_SIZE * 8, size - offset))
+                        if sent == 0:
+                            break
+                        offset += sent
+                except OSError:
+                    # z.B. Dateisystem ohne sendfile-Support → normal weiterkopieren
+                    fsrc.seek(offset)
+                    fdst.seek(offset)
+            # Rest (oder alles, falls sendfile fehlt bzw. die Datei inzwischen gewachsen ist)
+            fsrc.seek(offset)
+            while chunk := fsrc.read(COPY_CHUNK_SIZE):
+                fdst.write(chunk)
+            if fsync:
+                fdst.flush()
+                os.fsync(fdst.fileno())
+        os.replace(tmp_path, dst)
+        if fsync and folder and hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(folder, os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+async def atomic_copy(src: str, dst: str, fsync: bool | None = None) -> bool:
+    try:
+        await asyncio.to_thread(_copy_file_sync, src, dst, COPY_FSYNC if fsync is None else fsync)
+        return True
     except Exception as e:
         print(f"[utils.atomic_copy] Fehler beim Kopieren {src} -> {dst}: {e}")
+        return False
+
+async def run_bounded(coros, workers: int | None = None) -> list:
+    """Führt Coroutinen parallel aus, aber höchstens `workers` gleichzeitig (Reihenfolge bleibt)."""
+    sem = asyncio.Semaphore(workers or COPY_WORKERS)
+
+    async def _run(coro):
+        async with sem:
+            return await coro
+
+    return await asyncio.gather(*(_run(c) for c in coros))
+
+async def copy_many(pairs, workers: int | None = None, fsync: bool | None = None) -> int:
+    """Kopiert mehrere (src, dst)-Paare parallel → Anzahl erfolgreicher Kopien."""
+    results = await run_bounded((atomic_copy(src, dst, fsync) for src, dst in pairs), workers)
+    return sum(1 for ok in results if ok)
 
 # ========== Sonstige Utilities ==========
 
@@ -109,6 +1013,10 @@ async def send_ephemeral(
     # WICHTIG: Verhindere Doppelübergabe von 'embed'
     if "embed" in kwargs:
         kwargs.pop("embed")
+    # Schon bestätigt (defer) → Antwort als Followup
+    if interaction.response.is_done():
+        await interaction.followup.send(embed=embed, ephemeral=True, **kwargs)
+        return
     # Wenn KEIN text übergeben, lasse content leer (bzw. None)
     await interaction.response.send_message(
         content=None,
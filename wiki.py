@@ -22,13 +22,15 @@ async def get_pages():
     return await utils.load_json(WIKI_PAGES_PATH, {})
 
 async def save_pages(data):
-    await utils.save_json(WIKI_PAGES_PATH, data)
+    async with utils.json_transaction(WIKI_PAGES_PATH, {}) as tx:
+        tx.data = data
 
 async def get_backup():
     return await utils.load_json(WIKI_BACKUP_PATH, {})
 
 async def save_backup(data):
-    await utils.save_json(WIKI_BACKUP_PATH, data)
+    async with utils.json_transaction(WIKI_BACKUP_PATH, {}) as tx:
+        tx.data = data
 
 async def get_main_channel_id():
     return await utils.load_json(WIKI_MAIN_CHANNEL_PATH, 0)
@@ -102,7 +104,7 @@ class WikiCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def wikimain(self, interaction: Interaction, channel: discord.TextChannel):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         await set_main_channel_id(channel.id)
         await self.reload_menu(channel.id)
@@ -114,7 +116,7 @@ class WikiCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def wiki_page(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         channel = interaction.channel
         msgs = [m async for m in channel.history(limit=30)]
@@ -123,12 +125,10 @@ class WikiCog(commands.Cog):
             return await utils.send_error(interaction, "Kein Inhalt gefunden! (Letzte 30 Nachrichten prüfen.)")
         content = text_msg.content.strip()
         title = channel.name
-        pages = await get_pages()
-        backup = await get_backup()
-        pages[title] = content
-        backup[title] = content
-        await save_pages(pages)
-        await save_backup(backup)
+        async with utils.json_transaction(WIKI_PAGES_PATH, {}) as tx:
+            tx.data[title] = content
+        async with utils.json_transaction(WIKI_BACKUP_PATH, {}) as tx:
+            tx.data[title] = content
         try:
             await interaction.user.send(
                 f"Backup deiner Wiki-Seite '{title}':\n```{content[:1800]}```"
@@ -144,7 +144,7 @@ class WikiCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def wiki_delete(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         pages = await get_pages()
         if not pages:
@@ -164,7 +164,7 @@ class WikiCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def wiki_edit(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         pages = await get_pages()
         if not pages:
@@ -184,7 +184,7 @@ class WikiCog(commands.Cog):
     )
     @app_commands.guilds(MY_GUILD)
     async def wiki_backup(self, interaction: Interaction):
-        if not utils.is_admin(interaction.user):
+        if not utils.is_authorized(interaction):
             return await utils.send_permission_denied(interaction)
         backup = await get_backup()
         if not backup:
@@ -212,12 +212,11 @@ class WikiDeleteDropdown(discord.ui.Select):
 
     async def callback(self, interaction: Interaction):
         title = self.values[0]
-        pages = await get_pages()
-        if title not in pages:
+        async with utils.json_transaction(WIKI_PAGES_PATH, {}) as tx:
+            existed = tx.data.pop(title, None) is not None
+        if not existed:
             await utils.send_error(interaction, "Seite nicht gefunden.")
             return
-        del pages[title]
-        await save_pages(pages)
         await self.cog.reload_menu()
         await utils.send_success(interaction, f"Seite **{title}** gelöscht.")
 
@@ -251,9 +250,8 @@ class WikiEditModal(discord.ui.Modal, title="Wiki-Seite bearbeiten"):
         self.add_item(self.content_input)
 
     async def on_submit(self, interaction: Interaction):
-        pages = await get_pages()
-        pages[self.title_] = self.content_input.value
-        await save_pages(pages)
+        async with utils.json_transaction(WIKI_PAGES_PATH, {}) as tx:
+            tx.data[self.title_] = self.content_input.value
         await self.cog.reload_menu()
         await utils.send_success(interaction, f"Inhalt von **{self.title_}** aktualisiert.")
 